@@ -0,0 +1,15 @@
+"""Motor de generación de etiquetas de precios, independiente de la UI de Streamlit."""
+
+from .precios import calcular_precios, formatear_precio, parsear_precio, procesar_precio
+from .render import LabelSpec, draw_wrapped_text, render_label, render_labels
+
+__all__ = [
+    "LabelSpec",
+    "calcular_precios",
+    "draw_wrapped_text",
+    "formatear_precio",
+    "parsear_precio",
+    "procesar_precio",
+    "render_label",
+    "render_labels",
+]
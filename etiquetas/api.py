@@ -0,0 +1,413 @@
+"""Servicio HTTP para generar etiquetas desde otros sistemas (punto de venta, ERP).
+
+Endpoints:
+    GET  /salud
+    GET  /metrics                     métricas en formato Prometheus (ver `metricas`)
+    POST /etiqueta?formato=png|pdf    cuerpo: una especificación JSON (campos de LabelSpec)
+    POST /lote?formato=png|pdf|hoja   cuerpo: {"etiquetas": [...], "estilo": {...}}
+
+`/lote` devuelve un ZIP con una etiqueta por archivo (png o pdf) o, con
+`formato=hoja`, un PDF vectorial con las etiquetas impuestas en hojas A4.
+Las respuestas llevan un ETag derivado del hash de la especificación: si el
+cliente manda el mismo valor en If-None-Match se responde 304 sin dibujar.
+
+El dibujo, y en `/lote` también la validación y el ETag, corren en un pool
+de workers, fuera del loop de asyncio. La cola es
+acotada: con `workers + cola` trabajos en curso, los pedidos nuevos reciben
+503 con Retry-After en vez de acumularse en memoria.
+
+Uso:
+    python -m etiquetas.api --puerto 8502 --workers 4
+
+Para probar sin abrir un puerto:
+    with ServicioEtiquetas(hilos=True) as servicio:
+        r = ClienteLocal(servicio).post("/etiqueta", {"producto": "Yerba", "precio_final": 4599.9})
+"""
+
+import argparse
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import re
+import sys
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from . import metricas
+from .cache import CacheRender, spec_hash
+from .capas import RenderCapas
+from .codigos import SIMBOLOGIAS
+from .exportar import COMPRESION, nombre_archivo
+from .importacion import validar_codigo, validar_fila
+from .imposicion import imponer
+from .paralelo import _calentar
+from .plantillas import listar_plantillas
+
+logger = logging.getLogger(__name__)
+
+HOST = "127.0.0.1"
+PUERTO = 8502
+WORKERS = 2
+# Trabajos que pueden esperar un worker libre antes de responder 503
+COLA = 8
+MAX_CUERPO = 8 * 1024 * 1024
+MAX_LOTE = 5000
+ESCALA_MINIMA = 0.1
+ESCALA_MAXIMA = 3.0
+
+TIPOS = {
+    "png": "image/png",
+    "pdf": "application/pdf",
+    "zip": "application/zip",
+    "json": "application/json; charset=utf-8",
+}
+
+COLOR = re.compile(r"^#[0-9a-fA-F]{6}$")
+
+
+@dataclass
+class Respuesta:
+    estado: int
+    cuerpo: bytes = b""
+    encabezados: dict = field(default_factory=dict)
+
+    def json(self):
+        return json.loads(self.cuerpo)
+
+    def serializar(self, mantener_conexion=True):
+        """Respuesta HTTP/1.1 completa, lista para escribir en el socket."""
+        encabezados = dict(self.encabezados)
+        encabezados["Content-Length"] = str(len(self.cuerpo))
+        encabezados["Connection"] = "keep-alive" if mantener_conexion else "close"
+        lineas = [f"HTTP/1.1 {self.estado} {HTTPStatus(self.estado).phrase}"]
+        lineas += [f"{nombre}: {valor}" for nombre, valor in encabezados.items()]
+        return ("\r\n".join(lineas) + "\r\n\r\n").encode("latin-1") + self.cuerpo
+
+
+def _error(estado, mensaje, **encabezados):
+    cuerpo = json.dumps({"error": mensaje}, ensure_ascii=False).encode("utf-8")
+    return Respuesta(estado, cuerpo, {"Content-Type": TIPOS["json"], **encabezados})
+
+
+def _ocupado():
+    return _error(503, "Servicio ocupado, reintentar en unos segundos", **{"Retry-After": "1"})
+
+
+def spec_desde_json(datos, estilo=None):
+    """Convierte un objeto JSON en un LabelSpec validado.
+
+    Los datos del producto se validan igual que una fila de planilla; los
+    campos de estilo (colores, escala, ajustar_texto, simbologia, plantilla) pueden venir
+    en la etiqueta o en `estilo`, común a todo el lote. Lanza ValueError con
+    un mensaje para el cliente.
+    """
+    if not isinstance(datos, dict):
+        raise ValueError("Cada etiqueta debe ser un objeto JSON")
+    datos = {**(estilo or {}), **datos}
+    spec = validar_fila(datos)
+
+    cambios = {}
+    for campo in ("color_texto", "color_fondo_superior", "color_fondo_inferior", "color_borde_interior", "color_borde_exterior"):
+        if campo in datos:
+            if not isinstance(datos[campo], str) or not COLOR.match(datos[campo]):
+                raise ValueError(f"{campo} debe ser un color #RRGGBB")
+            cambios[campo] = datos[campo]
+    if "escala" in datos:
+        escala = datos["escala"]
+        if isinstance(escala, bool) or not isinstance(escala, (int, float)) or not ESCALA_MINIMA <= escala <= ESCALA_MAXIMA:
+            raise ValueError(f"escala debe ser un número entre {ESCALA_MINIMA} y {ESCALA_MAXIMA}")
+        cambios["escala"] = float(escala)
+    if "ajustar_texto" in datos:
+        if not isinstance(datos["ajustar_texto"], bool):
+            raise ValueError("ajustar_texto debe ser true o false")
+        cambios["ajustar_texto"] = datos["ajustar_texto"]
+    if datos.get("simbologia"):
+        if datos["simbologia"] not in SIMBOLOGIAS:
+            raise ValueError(f"simbologia debe ser una de: {', '.join(SIMBOLOGIAS)}")
+        cambios["simbologia"] = datos["simbologia"]
+    if datos.get("plantilla"):
+        # Solo por nombre: una ruta permitiría leer archivos del servidor
+        if datos["plantilla"] not in listar_plantillas():
+            raise ValueError(f"plantilla debe ser una de: {', '.join(listar_plantillas())}")
+        cambios["plantilla"] = datos["plantilla"]
+
+    spec = replace(spec, **cambios) if cambios else spec
+    validar_codigo(spec)
+    return spec
+
+
+def etag_lote(specs, formato):
+    """ETag de un lote: hash de los hashes de cada etiqueta, en orden."""
+    h = hashlib.sha256(formato.encode())
+    for spec in specs:
+        h.update(spec_hash(spec, "pdf" if formato == "hoja" else formato).encode())
+    return f'"{h.hexdigest()}"'
+
+
+def _coincide(etag, if_none_match):
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Se aceptan ETags débiles (W/"...") y listas separadas por comas
+    return etag in (v.strip().removeprefix("W/") for v in if_none_match.split(","))
+
+
+# Funciones que corren en los workers: a nivel de módulo para poder usarse en procesos
+
+
+@lru_cache(maxsize=1)
+def _cache():
+    """Caché de etiquetas del worker (una por proceso)."""
+    return CacheRender(dibujar=RenderCapas().render_label)
+
+
+def _render_etiqueta(spec, formato):
+    cache = _cache()
+    return cache.render_png(spec) if formato == "png" else cache.render_pdf(spec)
+
+
+def _preparar_lote(etiquetas, estilo, formato):
+    """Valida las etiquetas de un lote y calcula su ETag: (specs, errores, etag)."""
+    specs, errores = [], []
+    for indice, etiqueta in enumerate(etiquetas):
+        try:
+            specs.append(spec_desde_json(etiqueta, estilo))
+        except ValueError as e:
+            errores.append({"indice": indice, "error": str(e)})
+    if errores:
+        return specs, errores, None
+    return specs, errores, etag_lote(specs, formato)
+
+
+def _render_lote(specs, formato):
+    buf = io.BytesIO()
+    if formato == "hoja":
+        imponer(specs, buf)
+        return buf.getvalue()
+    usados = set()
+    with zipfile.ZipFile(buf, "w", compression=COMPRESION[formato]) as zf:
+        for spec in specs:
+            zf.writestr(nombre_archivo(spec.producto, usados, formato), _render_etiqueta(spec, formato))
+    return buf.getvalue()
+
+
+class ServicioEtiquetas:
+    """Atiende los pedidos HTTP ya parseados; no depende del transporte.
+
+    Con `hilos=True` los workers son hilos del mismo proceso (útil para
+    pruebas); si no, procesos, que aprovechan todos los núcleos.
+    """
+
+    def __init__(self, workers=WORKERS, cola=COLA, hilos=False):
+        self.workers = workers
+        self.max_pendientes = workers + cola
+        self.pendientes = 0
+        if hilos:
+            self._pool = ThreadPoolExecutor(max_workers=workers)
+        else:
+            self._pool = ProcessPoolExecutor(max_workers=workers, initializer=_calentar)
+
+    def cerrar(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    async def _ejecutar(self, funcion, *args):
+        """Corre `funcion` en el pool, o devuelve None si la cola está llena."""
+        if self.pendientes >= self.max_pendientes:
+            return None
+        self.pendientes += 1
+        try:
+            # Tiempo total en el pool, medido en este proceso (incluye la espera en la cola)
+            with metricas.etapa(f"api{funcion.__name__}"):
+                return await asyncio.get_running_loop().run_in_executor(self._pool, funcion, *args)
+        finally:
+            self.pendientes -= 1
+
+    async def atender(self, metodo, objetivo, encabezados=None, cuerpo=b""):
+        """Responde un pedido. `encabezados` va con los nombres en minúsculas."""
+        encabezados = encabezados or {}
+        url = urlsplit(objetivo)
+        parametros = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+        if url.path == "/salud":
+            if metodo != "GET":
+                return _error(405, "Método no permitido", Allow="GET")
+            estado = {"estado": "ok", "pendientes": self.pendientes, "capacidad": self.max_pendientes}
+            return Respuesta(200, json.dumps(estado).encode(), {"Content-Type": TIPOS["json"]})
+        if url.path == "/metrics":
+            if metodo != "GET":
+                return _error(405, "Método no permitido", Allow="GET")
+            tipo = "text/plain; version=0.0.4; charset=utf-8"
+            return Respuesta(200, metricas.texto_prometheus().encode("utf-8"), {"Content-Type": tipo})
+        if url.path not in ("/etiqueta", "/lote"):
+            return _error(404, "No encontrado")
+        if metodo != "POST":
+            return _error(405, "Método no permitido", Allow="POST")
+
+        try:
+            datos = json.loads(cuerpo or b"null")
+        except ValueError:
+            return _error(400, "El cuerpo no es JSON válido")
+        formato = parametros.get("formato", "png")
+        if url.path == "/etiqueta":
+            return await self._etiqueta(datos, formato, encabezados)
+        return await self._lote(datos, formato, encabezados)
+
+    async def _responder(self, etag, encabezados, tipo, funcion, *args, **extra):
+        if _coincide(etag, encabezados.get("if-none-match")):
+            return Respuesta(304, b"", {"ETag": etag})
+        datos = await self._ejecutar(funcion, *args)
+        if datos is None:
+            return _ocupado()
+        return Respuesta(200, datos, {"Content-Type": tipo, "ETag": etag, **extra})
+
+    async def _etiqueta(self, datos, formato, encabezados):
+        if formato not in ("png", "pdf"):
+            return _error(400, "formato debe ser png o pdf")
+        try:
+            spec = spec_desde_json(datos)
+        except ValueError as e:
+            return _error(400, str(e))
+        etag = f'"{spec_hash(spec, formato)}"'
+        return await self._responder(etag, encabezados, TIPOS[formato], _render_etiqueta, spec, formato)
+
+    async def _lote(self, datos, formato, encabezados):
+        if formato not in ("png", "pdf", "hoja"):
+            return _error(400, "formato debe ser png, pdf u hoja")
+        if isinstance(datos, list):
+            datos = {"etiquetas": datos}
+        if not isinstance(datos, dict) or not isinstance(datos.get("etiquetas"), list):
+            return _error(400, 'Se esperaba {"etiquetas": [...]}')
+        etiquetas, estilo = datos["etiquetas"], datos.get("estilo") or {}
+        if not etiquetas:
+            return _error(400, "El lote está vacío")
+        if len(etiquetas) > MAX_LOTE:
+            return _error(413, f"Máximo {MAX_LOTE} etiquetas por lote")
+        if not isinstance(estilo, dict):
+            return _error(400, "estilo debe ser un objeto JSON")
+
+        # Con miles de etiquetas validar y calcular el hash lleva tiempo: fuera del event loop
+        preparado = await self._ejecutar(_preparar_lote, etiquetas, estilo, formato)
+        if preparado is None:
+            return _ocupado()
+        specs, errores, etag = preparado
+        if errores:
+            cuerpo = json.dumps({"error": "Hay etiquetas inválidas", "etiquetas": errores}, ensure_ascii=False)
+            return Respuesta(400, cuerpo.encode("utf-8"), {"Content-Type": TIPOS["json"]})
+
+        tipo = TIPOS["pdf"] if formato == "hoja" else TIPOS["zip"]
+        nombre = "etiquetas.pdf" if formato == "hoja" else "etiquetas.zip"
+        return await self._responder(
+            etag, encabezados, tipo, _render_lote, specs, formato,
+            **{"Content-Disposition": f'attachment; filename="{nombre}"'},
+        )
+
+    # Transporte HTTP/1.1 mínimo sobre asyncio
+
+    async def _conexion(self, reader, writer):
+        try:
+            while True:
+                linea = await reader.readline()
+                if not linea:
+                    break
+                try:
+                    metodo, objetivo, version = linea.decode("latin-1").split()
+                except ValueError:
+                    writer.write(_error(400, "Pedido inválido").serializar(False))
+                    break
+                encabezados = {}
+                while True:
+                    linea = await reader.readline()
+                    if linea in (b"\r\n", b"\n", b""):
+                        break
+                    nombre, _, valor = linea.decode("latin-1").partition(":")
+                    encabezados[nombre.strip().lower()] = valor.strip()
+
+                if "transfer-encoding" in encabezados:
+                    writer.write(_error(411, "Se requiere Content-Length").serializar(False))
+                    break
+                try:
+                    largo = int(encabezados.get("content-length") or 0)
+                except ValueError:
+                    writer.write(_error(400, "Content-Length inválido").serializar(False))
+                    break
+                if largo > MAX_CUERPO:
+                    writer.write(_error(413, "Cuerpo demasiado grande").serializar(False))
+                    break
+                cuerpo = await reader.readexactly(largo) if largo else b""
+
+                try:
+                    respuesta = await self.atender(metodo, objetivo, encabezados, cuerpo)
+                except Exception:
+                    # Un error al dibujar (fuente, PIL...) no debe cortar la conexión sin respuesta
+                    logger.exception("Error al atender %s %s", metodo, objetivo)
+                    respuesta = _error(500, "Error interno del servidor")
+                seguir = version == "HTTP/1.1" and encabezados.get("connection", "").lower() != "close"
+                writer.write(respuesta.serializar(seguir))
+                await writer.drain()
+                if not seguir:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def servir(self, host=HOST, puerto=PUERTO):
+        servidor = await asyncio.start_server(self._conexion, host, puerto)
+        async with servidor:
+            await servidor.serve_forever()
+
+
+class ClienteLocal:
+    """Cliente que llama al servicio en el mismo proceso, sin sockets."""
+
+    def __init__(self, servicio):
+        self.servicio = servicio
+
+    def _pedir(self, metodo, ruta, cuerpo, encabezados):
+        encabezados = {k.lower(): v for k, v in (encabezados or {}).items()}
+        return asyncio.run(self.servicio.atender(metodo, ruta, encabezados, cuerpo))
+
+    def get(self, ruta, encabezados=None):
+        return self._pedir("GET", ruta, b"", encabezados)
+
+    def post(self, ruta, datos=None, encabezados=None):
+        return self._pedir("POST", ruta, json.dumps(datos).encode("utf-8"), encabezados)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--cola", type=int, default=COLA, help="trabajos en espera antes de responder 503")
+    parser.add_argument("--metricas", action="store_true", help="registrar métricas por etapa (GET /metrics)")
+    args = parser.parse_args(argv)
+
+    if args.metricas:
+        # Con workers en procesos, las etapas de dibujo quedan en cada worker
+        metricas.activar()
+
+    with ServicioEtiquetas(args.workers, args.cola) as servicio:
+        print(f"Sirviendo etiquetas en http://{args.host}:{args.puerto}", file=sys.stderr)
+        try:
+            asyncio.run(servicio.servir(args.host, args.puerto))
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
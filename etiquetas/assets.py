@@ -0,0 +1,102 @@
+"""Registro de recursos (fuentes, marca de agua, imágenes) compartido por todo el proceso.
+
+Cada par (archivo, tamaño) de fuente y cada marca de agua preparada se carga
+una sola vez; las siguientes etiquetas reutilizan el mismo objeto.
+"""
+
+import io
+import os
+from functools import lru_cache
+
+from PIL import Image, ImageFont
+
+from .metricas import etapa
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FUENTES_DIR = os.path.join(BASE_DIR, "Fuentes")
+
+# Tamaños usados por la etiqueta estándar (grande, mediano, chico)
+TAMANOS_FUENTE = (45, 24, 16)
+
+# Límites de los LRU; alcanzan para todas las fuentes de Fuentes/ en los tamaños estándar
+MAX_FUENTES = 256
+MAX_MARCAS_AGUA = 16
+MAX_IMAGENES = 32
+
+
+@lru_cache(maxsize=MAX_FUENTES)
+def get_font(path, size):
+    """Devuelve la fuente TrueType `path` en el tamaño `size`, cargándola una sola vez."""
+    # Solo se mide la carga real: los aciertos del LRU no llegan hasta acá
+    with etapa("fuentes"):
+        return ImageFont.truetype(path, size)
+
+
+@lru_cache(maxsize=MAX_MARCAS_AGUA)
+def get_marca_agua(path, ancho, alto, alpha):
+    """Devuelve la marca de agua en RGBA, redimensionada y con la transparencia aplicada.
+
+    La imagen devuelta es compartida: usarla solo como origen (p. ej. en `paste`).
+    """
+    with Image.open(path) as original:
+        marca_agua = original.convert("RGBA")
+    marca_agua = marca_agua.resize((ancho, alto))
+    marca_agua.putalpha(alpha)
+    return marca_agua
+
+
+@lru_cache(maxsize=MAX_IMAGENES)
+def imagen_reducida(path, ancho):
+    """PNG de `path` reducido a `ancho` píxeles de ancho (nunca agrandado).
+
+    Para las imágenes fijas de la página: el logo original mide 2526 px y se
+    muestra a menos de 300, así que se reduce una vez y se envía el resultado.
+    Si reducir no achica el archivo se devuelve el original.
+    """
+    with open(path, "rb") as f:
+        original = f.read()
+    with Image.open(io.BytesIO(original)) as img:
+        if img.width <= ancho:
+            return original
+        img = img.convert("RGBA").resize((ancho, round(img.height * ancho / img.width)), Image.LANCZOS)
+    buf = io.BytesIO()
+    img.save(buf, format="PNG", optimize=True)
+    return min(buf.getvalue(), original, key=len)
+
+
+def listar_fuentes(directorio=FUENTES_DIR):
+    """Devuelve las rutas de todos los .ttf dentro de `directorio`, ordenadas."""
+    rutas = []
+    for raiz, _, archivos in os.walk(directorio):
+        for archivo in archivos:
+            if archivo.lower().endswith(".ttf"):
+                rutas.append(os.path.join(raiz, archivo))
+    return sorted(rutas)
+
+
+def preload_fonts(directorio=FUENTES_DIR, tamanos=TAMANOS_FUENTE):
+    """Carga en el registro todas las fuentes de `directorio` en los tamaños dados.
+
+    Devuelve la cantidad de fuentes cargadas.
+    """
+    cargadas = 0
+    for path in listar_fuentes(directorio):
+        for size in tamanos:
+            get_font(path, size)
+            cargadas += 1
+    return cargadas
+
+
+def cache_info():
+    """Estadísticas de los LRU (aciertos, fallos, tamaño actual)."""
+    return {
+        "fuentes": get_font.cache_info(),
+        "marcas_agua": get_marca_agua.cache_info(),
+        "imagenes": imagen_reducida.cache_info(),
+    }
+
+
+def clear_cache():
+    get_font.cache_clear()
+    get_marca_agua.cache_clear()
+    imagen_reducida.cache_clear()
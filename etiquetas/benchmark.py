@@ -0,0 +1,279 @@
+"""Benchmark de las etapas de generación de una etiqueta.
+
+Mide por separado la carga de fuentes, el corte de texto, el dibujo, la marca
+de agua, el redimensionado en distintas escalas, la codificación PNG y la
+escritura de estadísticas con historiales de distinto tamaño. Solo usa las
+fuentes e imágenes del repositorio, así que corre sin conexión.
+
+También mide el arranque de la app: las importaciones del nivel superior de
+streamlit_app.py en un intérprete nuevo y, si Streamlit está instalado, la
+primera ejecución del script y cada rerun (con `streamlit.testing`).
+
+Uso:
+    python -m etiquetas.benchmark --guardar base.json
+    python -m etiquetas.benchmark --comparar base.json --umbral 20
+
+Con --comparar termina con código 1 si alguna etapa es más lenta que la
+base en más del umbral (en porcentaje).
+"""
+
+import argparse
+import ast
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import PIL
+from PIL import Image, ImageDraw, ImageFont
+
+from .assets import BASE_DIR, get_font, get_marca_agua
+from .estadisticas import COLUMNAS_CALIFICACIONES, COLUMNAS_PROVINCIAS, EscritorCSV, agregar_filas
+from .eventos_db import TABLAS, BaseEventos
+from .render import (
+    ALTO,
+    ANCHO,
+    FUENTE,
+    MARCA_AGUA,
+    LabelSpec,
+    _dibujar,
+    dibujar_bordes,
+    dibujar_fondo,
+    draw_wrapped_text,
+    escalar,
+    pegar_marca_agua,
+    png_bytes,
+    render_label,
+    textos_precios,
+)
+from .texto import MedidorTexto
+
+VERSION_FORMATO = 1
+UMBRAL = 20.0
+ESCALAS = (0.5, 1.0, 2.0, 3.0)
+TAMANOS_HISTORIAL = (1000, 10000, 100000)
+APP = os.path.join(BASE_DIR, "streamlit_app.py")
+# Cada medición del arranque lanza un intérprete: se hacen menos repeticiones
+MAX_REPETICIONES_ARRANQUE = 10
+
+SPEC = LabelSpec(
+    producto="Aceite de girasol botella grande edición especial con nombre muy largo",
+    precio_final=1234567.5,
+    iva="10.5%",
+    unidad="Litros",
+    cantidad=1.5,
+)
+
+
+def medir(funcion, repeticiones, preparar=None):
+    """Ejecuta `funcion` `repeticiones` veces y devuelve mediana y mínimo en segundos.
+
+    `preparar`, si se indica, se llama antes de cada repetición fuera del tiempo
+    medido y su resultado se pasa a `funcion`.
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        argumento = preparar() if preparar is not None else None
+        inicio = time.perf_counter()
+        if preparar is not None:
+            funcion(argumento)
+        else:
+            funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return {"mediana": statistics.median(tiempos), "minimo": min(tiempos), "repeticiones": repeticiones}
+
+
+def _lienzo():
+    img = Image.new("RGB", (ANCHO, ALTO), color=SPEC.color_fondo_superior)
+    return img, ImageDraw.Draw(img)
+
+
+def etapas_render(repeticiones):
+    resultados = {}
+    producto = SPEC.producto.upper()
+    font_producto = get_font(FUENTE, 24)
+
+    resultados["fuentes_disco"] = medir(lambda: [ImageFont.truetype(FUENTE, t) for t in (45, 24, 16)], repeticiones)
+    resultados["fuentes_registro"] = medir(lambda: [get_font(FUENTE, t) for t in (45, 24, 16)], repeticiones)
+
+    # Sin caché: un medidor nuevo por repetición
+    resultados["corte_texto_frio"] = medir(
+        lambda m: m.cortar(producto, 235), repeticiones, lambda: MedidorTexto(font_producto)
+    )
+    medidor = MedidorTexto(font_producto)
+    medidor.cortar(producto, 235)
+    resultados["corte_texto_cacheado"] = medir(lambda: medidor.cortar(producto, 235), repeticiones)
+
+    def dibujar(lienzo):
+        img, draw = lienzo
+        dibujar_fondo(draw, SPEC)
+        draw_wrapped_text(draw, producto, font_producto, fill=SPEC.color_texto)
+        for xy, texto, tamano in textos_precios(SPEC):
+            draw.text(xy, texto, fill=SPEC.color_texto, font=get_font(FUENTE, tamano))
+        dibujar_bordes(draw, SPEC)
+
+    resultados["dibujo"] = medir(dibujar, repeticiones, _lienzo)
+    resultados["marca_agua_preparar"] = medir(lambda: get_marca_agua.__wrapped__(MARCA_AGUA, 720, 270, 9), repeticiones)
+    resultados["marca_agua_pegar"] = medir(lambda l: pegar_marca_agua(l[0]), repeticiones, _lienzo)
+
+    base = _dibujar(SPEC)
+    for escala in ESCALAS:
+        resultados[f"escalar_{escala}"] = medir(lambda e=escala: escalar(base, e), repeticiones)
+        escalada = escalar(base, escala)
+        resultados[f"png_{escala}"] = medir(lambda i=escalada: png_bytes(i), repeticiones)
+
+    resultados["render_label"] = medir(lambda: render_label(SPEC), repeticiones)
+    return resultados
+
+
+# Tipo de evento -> (tabla de SQLite, columnas del CSV, fila de ejemplo)
+EVENTOS = {
+    "provincia": ("provincias", COLUMNAS_PROVINCIAS, ("17/10/26", "10:00:00", "Córdoba")),
+    "calificacion": ("calificaciones", COLUMNAS_CALIFICACIONES, ("17/10/26", "10:00:00", "Excelente")),
+}
+
+
+def etapas_estadisticas(repeticiones, tamanos=TAMANOS_HISTORIAL):
+    """Tiempo de agregar un evento con historiales de distintos tamaños."""
+    resultados = {}
+    with tempfile.TemporaryDirectory() as directorio:
+        for tamano in tamanos:
+            base = BaseEventos(os.path.join(directorio, f"eventos_{tamano}.db"))
+            for tipo, (tabla, columnas, fila) in EVENTOS.items():
+                path = os.path.join(directorio, f"{tabla}_{tamano}.csv")
+                agregar_filas(path, columnas, [fila] * tamano)
+                escritor = EscritorCSV(path, columnas, intervalo=0)
+                resultados[f"{tipo}_csv_{tamano}"] = medir(lambda: escritor.agregar(*fila), repeticiones)
+
+                columna = TABLAS[tabla][0]
+                for inicio in range(0, tamano, 10000):
+                    with base._conexion:
+                        base._conexion.executemany(
+                            f"INSERT INTO {tabla} (fecha, hora, {columna}) VALUES (?, ?, ?)",
+                            [("2026-10-17", fila[1], fila[2])] * min(10000, tamano - inicio),
+                        )
+                resultados[f"{tipo}_sqlite_{tamano}"] = medir(lambda: base.agregar(tabla, *fila), repeticiones)
+            base.cerrar()
+    return resultados
+
+
+def importaciones_app(path=APP):
+    """Sentencias import del nivel superior de la app, salvo las de streamlit."""
+    with open(path, encoding="utf-8") as f:
+        arbol = ast.parse(f.read())
+    sentencias = []
+    for nodo in arbol.body:
+        if isinstance(nodo, ast.Import):
+            modulos = [alias.name for alias in nodo.names]
+        elif isinstance(nodo, ast.ImportFrom):
+            modulos = [nodo.module]
+        else:
+            continue
+        if not any(m.split(".")[0] == "streamlit" for m in modulos):
+            sentencias.append(ast.unparse(nodo))
+    return sentencias
+
+
+def etapas_arranque(repeticiones):
+    """Importaciones en frío de la app y, con Streamlit instalado, primera ejecución y rerun."""
+    resultados = {}
+    codigo = "\n".join(
+        ["import time", "inicio = time.perf_counter()", *importaciones_app(), "print(time.perf_counter() - inicio)"]
+    )
+    tiempos = []
+    for _ in range(min(repeticiones, MAX_REPETICIONES_ARRANQUE)):
+        salida = subprocess.run([sys.executable, "-c", codigo], cwd=BASE_DIR, capture_output=True, text=True, check=True)
+        tiempos.append(float(salida.stdout.strip().splitlines()[-1]))
+    resultados["arranque_importaciones"] = {
+        "mediana": statistics.median(tiempos),
+        "minimo": min(tiempos),
+        "repeticiones": len(tiempos),
+    }
+
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        return resultados
+    directorio = os.getcwd()
+    os.chdir(BASE_DIR)
+    try:
+        app = AppTest.from_file(APP, default_timeout=60)
+        resultados["app_primera_ejecucion"] = medir(app.run, 1)
+        resultados["app_rerun"] = medir(app.run, repeticiones)
+    finally:
+        os.chdir(directorio)
+    return resultados
+
+
+def ejecutar(repeticiones=30, estadisticas=True, arranque=True):
+    resultados = etapas_render(repeticiones)
+    if estadisticas:
+        resultados.update(etapas_estadisticas(repeticiones))
+    if arranque:
+        resultados.update(etapas_arranque(repeticiones))
+    return {
+        "version": VERSION_FORMATO,
+        "python": platform.python_version(),
+        "pillow": PIL.__version__,
+        "plataforma": platform.platform(),
+        "resultados": resultados,
+    }
+
+
+def comparar(actual, base, umbral=UMBRAL):
+    """Devuelve la lista de (etapa, base, actual, diferencia %) y las etapas que empeoraron."""
+    filas = []
+    regresiones = []
+    for etapa, medida in actual["resultados"].items():
+        anterior = base["resultados"].get(etapa)
+        if anterior is None:
+            continue
+        diferencia = (medida["mediana"] / anterior["mediana"] - 1) * 100 if anterior["mediana"] else 0.0
+        filas.append((etapa, anterior["mediana"], medida["mediana"], diferencia))
+        if diferencia > umbral:
+            regresiones.append(etapa)
+    return filas, regresiones
+
+
+def _ms(segundos):
+    return f"{segundos * 1000:10.3f} ms"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticiones", type=int, default=30)
+    parser.add_argument("--sin-estadisticas", action="store_true", help="no medir la escritura de estadísticas")
+    parser.add_argument("--sin-arranque", action="store_true", help="no medir el arranque de la app")
+    parser.add_argument("--guardar", metavar="JSON", help="guardar los resultados en este archivo")
+    parser.add_argument("--comparar", metavar="JSON", help="comparar contra una base guardada")
+    parser.add_argument("--umbral", type=float, default=UMBRAL, help="porcentaje de empeoramiento tolerado")
+    args = parser.parse_args(argv)
+
+    actual = ejecutar(args.repeticiones, not args.sin_estadisticas, not args.sin_arranque)
+    if args.guardar:
+        with open(args.guardar, "w", encoding="utf-8") as f:
+            json.dump(actual, f, indent=2, ensure_ascii=False)
+
+    if not args.comparar:
+        for etapa, medida in actual["resultados"].items():
+            print(f"{etapa:28} {_ms(medida['mediana'])}")
+        return 0
+
+    with open(args.comparar, encoding="utf-8") as f:
+        base = json.load(f)
+    filas, regresiones = comparar(actual, base, args.umbral)
+    for etapa, anterior, ahora, diferencia in filas:
+        marca = "  <-- REGRESIÓN" if etapa in regresiones else ""
+        print(f"{etapa:28} {_ms(anterior)} {_ms(ahora)} {diferencia:+7.1f}%{marca}")
+    if regresiones:
+        print(f"{len(regresiones)} etapas empeoraron más de {args.umbral}%", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
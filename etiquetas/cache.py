@@ -0,0 +1,235 @@
+"""Caché de etiquetas ya dibujadas, direccionada por el contenido de la especificación.
+
+La clave es un hash SHA-256 de la especificación normalizada; el valor son los
+bytes PNG finales, así que un acierto evita tanto el dibujo como la
+codificación. Hay un LRU en memoria delante de un nivel opcional en disco.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from .codigos import simbologia_para
+from .plantillas import cargar_plantilla
+from .render import _como_spec, png_bytes, render_label
+from .vectorial import render_pdf
+
+# Cambiar cuando cambie el dibujo de las etiquetas, para invalidar la caché en disco
+VERSION_RENDER = 1
+
+MAX_BYTES_MEMORIA = 64 * 1024 * 1024
+MAX_BYTES_DISCO = 512 * 1024 * 1024
+
+
+def normalizar_spec(spec):
+    """Devuelve un dict con la especificación en forma canónica.
+
+    Dos especificaciones que producen la misma imagen dan el mismo dict: el
+    diseño clásico dibuja el producto en mayúsculas y con los espacios
+    colapsados (una plantilla, solo si sus textos lo hacen; ver
+    `PlanEtiqueta.normalizar_producto`), y los colores no distinguen
+    mayúsculas. La simbología automática del código de
+    barras se resuelve antes de calcular el hash. Con plantilla se agrega la
+    huella de su archivo, así que editar la plantilla invalida la caché.
+    """
+    spec = _como_spec(spec)
+    datos = spec.to_dict()
+    datos["precio_final"] = float(spec.precio_final)
+    datos["escala"] = float(spec.escala)
+    if spec.unidad == "Sin unidades":
+        # La cantidad no se usa si no hay unidad de medida
+        datos["cantidad"] = 1.0
+    else:
+        datos["cantidad"] = float(spec.cantidad)
+    datos["codigo"] = str(spec.codigo).strip()
+    if datos["codigo"] and not spec.simbologia:
+        datos["simbologia"] = simbologia_para(datos["codigo"])
+    if spec.plantilla:
+        plan = cargar_plantilla(spec.plantilla)
+        datos["producto"] = plan.normalizar_producto(spec.producto)
+        datos["_plantilla"] = plan.huella
+    else:
+        datos["producto"] = " ".join(spec.producto.upper().split())
+        # Sin plantilla el hash queda igual que antes de que existieran
+        del datos["plantilla"]
+    for campo, valor in datos.items():
+        if campo.startswith("color_"):
+            datos[campo] = valor.lower()
+    return datos
+
+
+def spec_hash(spec, formato="png"):
+    """Hash hexadecimal de la especificación normalizada y el formato de salida."""
+    datos = normalizar_spec(spec)
+    datos["_formato"] = formato
+    datos["_version"] = VERSION_RENDER
+    clave = json.dumps(datos, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(clave.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class EstadisticasCache:
+    aciertos_memoria: int = 0
+    aciertos_disco: int = 0
+    fallos: int = 0
+
+    @property
+    def tasa_aciertos(self):
+        total = self.aciertos_memoria + self.aciertos_disco + self.fallos
+        return (self.aciertos_memoria + self.aciertos_disco) / total if total else 0.0
+
+
+class CacheRender:
+    """Caché de PNG por hash de especificación, con límite de bytes por nivel.
+
+    Con `directorio=None` solo se usa la memoria. `dibujar` es la función que
+    genera la imagen en caso de fallo (por defecto `render.render_label`).
+    """
+
+    def __init__(self, max_bytes_memoria=MAX_BYTES_MEMORIA, directorio=None, max_bytes_disco=MAX_BYTES_DISCO, dibujar=render_label):
+        self.dibujar = dibujar
+        self.max_bytes_memoria = max_bytes_memoria
+        self.directorio = directorio
+        self.max_bytes_disco = max_bytes_disco
+        self.estadisticas = EstadisticasCache()
+        self._memoria = OrderedDict()
+        self._bytes_memoria = 0
+        self._lock = threading.Lock()
+        self._bytes_disco = 0
+        if directorio is not None:
+            os.makedirs(directorio, exist_ok=True)
+            self._bytes_disco = sum(os.path.getsize(p) for p, _ in self._archivos_disco())
+
+    def __len__(self):
+        return len(self._memoria)
+
+    @property
+    def bytes_memoria(self):
+        return self._bytes_memoria
+
+    # Nivel en memoria
+
+    def _guardar_memoria(self, clave, datos):
+        if len(datos) > self.max_bytes_memoria:
+            return
+        with self._lock:
+            anterior = self._memoria.pop(clave, None)
+            if anterior is not None:
+                self._bytes_memoria -= len(anterior)
+            self._memoria[clave] = datos
+            self._bytes_memoria += len(datos)
+            while self._bytes_memoria > self.max_bytes_memoria:
+                _, descartado = self._memoria.popitem(last=False)
+                self._bytes_memoria -= len(descartado)
+
+    def _leer_memoria(self, clave):
+        with self._lock:
+            datos = self._memoria.get(clave)
+            if datos is not None:
+                self._memoria.move_to_end(clave)
+            return datos
+
+    # Nivel en disco
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, clave[:2], clave)
+
+    def _archivos_disco(self):
+        for raiz, _, archivos in os.walk(self.directorio):
+            for archivo in archivos:
+                if not archivo.endswith(".tmp"):
+                    path = os.path.join(raiz, archivo)
+                    yield path, os.path.getmtime(path)
+
+    def _leer_disco(self, clave):
+        if self.directorio is None:
+            return None
+        try:
+            with open(self._ruta(clave), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _guardar_disco(self, clave, datos):
+        if self.directorio is None or len(datos) > self.max_bytes_disco:
+            return
+        ruta = self._ruta(clave)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        # Escritura atómica: otro proceso nunca ve un archivo a medio escribir
+        fd, temporal = tempfile.mkstemp(dir=os.path.dirname(ruta), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(datos)
+        os.replace(temporal, ruta)
+        with self._lock:
+            self._bytes_disco += len(datos)
+            excedido = self._bytes_disco > self.max_bytes_disco
+        if excedido:
+            self._recortar_disco()
+
+    def _recortar_disco(self):
+        """Borra los archivos más viejos hasta quedar en el 90% del límite."""
+        archivos = sorted(self._archivos_disco(), key=lambda a: a[1])
+        total = sum(os.path.getsize(p) for p, _ in archivos)
+        objetivo = self.max_bytes_disco * 0.9
+        for path, _ in archivos:
+            if total <= objetivo:
+                break
+            try:
+                tamano = os.path.getsize(path)
+                os.remove(path)
+                total -= tamano
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self._bytes_disco = total
+
+    def _contar(self, contador):
+        with self._lock:
+            setattr(self.estadisticas, contador, getattr(self.estadisticas, contador) + 1)
+
+    # API
+
+    def get(self, clave):
+        """Devuelve los bytes guardados para `clave`, o None si no están."""
+        datos = self._leer_memoria(clave)
+        if datos is not None:
+            self._contar("aciertos_memoria")
+            return datos
+        datos = self._leer_disco(clave)
+        if datos is not None:
+            self._contar("aciertos_disco")
+            self._guardar_memoria(clave, datos)
+            return datos
+        self._contar("fallos")
+        return None
+
+    def put(self, clave, datos):
+        self._guardar_memoria(clave, datos)
+        self._guardar_disco(clave, datos)
+
+    def obtener(self, clave, generar):
+        """Devuelve los bytes de `clave`; si no están, los genera con `generar()` y los guarda."""
+        datos = self.get(clave)
+        if datos is None:
+            datos = generar()
+            self.put(clave, datos)
+        return datos
+
+    def render_png(self, spec):
+        """PNG de la etiqueta, dibujándola solo si no está en la caché."""
+        spec = _como_spec(spec)
+        return self.obtener(spec_hash(spec, "png"), lambda: png_bytes(self.dibujar(spec)))
+
+    def render_pdf(self, spec):
+        """PDF vectorial de la etiqueta, generándolo solo si no está en la caché."""
+        spec = _como_spec(spec)
+        return self.obtener(spec_hash(spec, "pdf"), lambda: render_pdf(spec))
+
+    def limpiar(self):
+        with self._lock:
+            self._memoria.clear()
+            self._bytes_memoria = 0
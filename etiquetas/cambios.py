@@ -0,0 +1,283 @@
+"""Modo de cambios de precios: volver a dibujar solo las etiquetas que cambiaron.
+
+Un manifiesto guarda, por producto, el hash de la última etiqueta generada
+(`cache.spec_hash`, que ya normaliza el precio, el nombre y los colores). Al
+subir una lista de precios nueva se compara cada fila contra el manifiesto y
+solo pasan las etiquetas nuevas o con algún dato distinto; el resto se cuenta
+como sin cambios. Los precios se leen con las mismas reglas que el campo
+"Precio Final del Producto" de la UI (`procesar_precio`), así que "$1.234,50"
+y "1234.5" son el mismo precio.
+
+    comparacion = Comparacion(Manifiesto.cargar("manifiesto.json"))
+    exportar_zip(comparacion.filtrar(leer_specs("lista.csv")), "cambios.zip")
+    comparacion.escribir_reporte("cambios.csv")
+    comparacion.manifiesto_nuevo().guardar("manifiesto.json")
+
+Cada producto se identifica por su código de barras o, si no tiene, por el
+nombre normalizado. Los productos del manifiesto que no aparecen en la lista
+nueva se informan como eliminados y no pasan al manifiesto nuevo.
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import tempfile
+from dataclasses import dataclass
+
+from .cache import spec_hash
+from .lienzo import NIVEL_COMPRESION, MemoriaPico
+from .render import _como_spec
+
+# Cambiar si cambia el formato del archivo
+VERSION_MANIFIESTO = 1
+
+NUEVO = "nuevo"
+MODIFICADO = "modificado"
+SIN_CAMBIOS = "sin_cambios"
+ELIMINADO = "eliminado"
+DUPLICADO = "duplicado"
+
+COLUMNAS_REPORTE = ["estado", "producto", "codigo", "precio_anterior", "precio_nuevo", "variacion"]
+
+
+def clave_producto(spec):
+    """Identificador estable del producto: el código de barras o el nombre normalizado."""
+    spec = _como_spec(spec)
+    codigo = str(spec.codigo).strip()
+    if codigo:
+        return f"codigo:{codigo}"
+    return "producto:" + " ".join(spec.producto.upper().split())
+
+
+class Manifiesto:
+    """Último hash dibujado por producto, más el nombre y el precio para el reporte."""
+
+    def __init__(self, entradas=None, formato="png"):
+        self.formato = formato
+        # clave -> {"hash", "producto", "precio_final"}
+        self.entradas = dict(entradas or {})
+
+    def __len__(self):
+        return len(self.entradas)
+
+    def __contains__(self, clave):
+        return clave in self.entradas
+
+    def get(self, clave):
+        return self.entradas.get(clave)
+
+    def to_dict(self):
+        return {"version": VERSION_MANIFIESTO, "formato": self.formato, "entradas": self.entradas}
+
+    @classmethod
+    def from_dict(cls, datos):
+        if not isinstance(datos, dict) or datos.get("version") != VERSION_MANIFIESTO:
+            raise ValueError("El archivo no es un manifiesto de etiquetas válido")
+        return cls(datos.get("entradas", {}), datos.get("formato", "png"))
+
+    def a_bytes(self):
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=1, sort_keys=True).encode("utf-8")
+
+    @classmethod
+    def desde_bytes(cls, datos):
+        try:
+            return cls.from_dict(json.loads(datos))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            raise ValueError("El archivo no es un manifiesto de etiquetas válido") from None
+
+    @classmethod
+    def cargar(cls, path, formato="png"):
+        """Lee el manifiesto de `path`; si no existe devuelve uno vacío (todas las etiquetas son nuevas)."""
+        try:
+            with open(path, "rb") as f:
+                return cls.desde_bytes(f.read())
+        except FileNotFoundError:
+            return cls(formato=formato)
+
+    def guardar(self, path):
+        """Escribe el manifiesto de forma atómica."""
+        directorio = os.path.dirname(os.path.abspath(path))
+        fd, temporal = tempfile.mkstemp(dir=directorio, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(self.a_bytes())
+        os.replace(temporal, path)
+
+
+@dataclass
+class Cambio:
+    """Resultado de comparar un producto contra el manifiesto."""
+
+    estado: str
+    clave: str
+    producto: str
+    precio_anterior: float = None
+    precio_nuevo: float = None
+    hash: str = ""
+    codigo: str = ""
+
+    @property
+    def variacion(self):
+        """Variación porcentual del precio, o None si no hay precio anterior."""
+        if self.precio_anterior is None or self.precio_nuevo is None or not self.precio_anterior:
+            return None
+        return (self.precio_nuevo - self.precio_anterior) / self.precio_anterior * 100
+
+    def fila_reporte(self):
+        variacion = self.variacion
+        return [
+            self.estado,
+            self.producto,
+            self.codigo,
+            "" if self.precio_anterior is None else f"{self.precio_anterior:.2f}",
+            "" if self.precio_nuevo is None else f"{self.precio_nuevo:.2f}",
+            "" if variacion is None else f"{variacion:+.2f}%",
+        ]
+
+
+class Comparacion:
+    """Compara una lista de precios contra un manifiesto a medida que se lee.
+
+    `filtrar` deja pasar solo las etiquetas nuevas o modificadas y registra
+    cada fila en `cambios`; como es un generador, se puede pasar directo a
+    `exportar_zip`, `imponer` o `generar_pdf` sin cargar la lista entera.
+    """
+
+    def __init__(self, manifiesto=None, formato=None):
+        self.manifiesto = manifiesto if manifiesto is not None else Manifiesto()
+        # Un cambio de formato (PNG -> PDF) invalida todo el manifiesto
+        self.formato = formato or self.manifiesto.formato
+        self.cambios = []
+        self._vistos = {}
+
+    def comparar(self, spec):
+        """Cambio correspondiente a `spec` (también lo agrega a `cambios`)."""
+        spec = _como_spec(spec)
+        clave = clave_producto(spec)
+        precio = float(spec.precio_final)
+        codigo = str(spec.codigo).strip()
+        if clave in self._vistos:
+            # La primera fila del producto es la que vale
+            cambio = Cambio(DUPLICADO, clave, spec.producto, self._vistos[clave].precio_nuevo, precio, codigo=codigo)
+            self.cambios.append(cambio)
+            return cambio
+
+        hash_nuevo = spec_hash(spec, self.formato)
+        anterior = self.manifiesto.get(clave) if self.formato == self.manifiesto.formato else None
+        if anterior is None:
+            estado, precio_anterior = NUEVO, None
+        else:
+            precio_anterior = anterior.get("precio_final")
+            estado = SIN_CAMBIOS if anterior.get("hash") == hash_nuevo else MODIFICADO
+        cambio = Cambio(estado, clave, spec.producto, precio_anterior, precio, hash_nuevo, codigo)
+        self._vistos[clave] = cambio
+        self.cambios.append(cambio)
+        return cambio
+
+    def filtrar(self, specs):
+        """Genera solo las especificaciones nuevas o modificadas."""
+        for spec in specs:
+            spec = _como_spec(spec)
+            if self.comparar(spec).estado in (NUEVO, MODIFICADO):
+                yield spec
+
+    def eliminados(self):
+        """Productos del manifiesto que no aparecieron en la lista (llamar después de filtrar)."""
+        return [
+            Cambio(ELIMINADO, clave, entrada.get("producto", ""), entrada.get("precio_final"))
+            for clave, entrada in self.manifiesto.entradas.items()
+            if clave not in self._vistos
+        ]
+
+    def resumen(self):
+        """Cantidad de productos por estado."""
+        resumen = {estado: 0 for estado in (NUEVO, MODIFICADO, SIN_CAMBIOS, DUPLICADO, ELIMINADO)}
+        for cambio in self.cambios + self.eliminados():
+            resumen[cambio.estado] += 1
+        return resumen
+
+    def manifiesto_nuevo(self):
+        """Manifiesto con los hashes de esta lista, para la próxima comparación."""
+        entradas = {
+            clave: {"hash": c.hash, "producto": c.producto, "precio_final": c.precio_nuevo}
+            for clave, c in self._vistos.items()
+        }
+        return Manifiesto(entradas, self.formato)
+
+    def escribir_reporte(self, salida):
+        """Escribe el reporte de cambios en CSV (`salida` es una ruta o un archivo de texto).
+
+        Primero los productos modificados, nuevos, eliminados y duplicados;
+        al final los que no cambiaron.
+        """
+        orden = {MODIFICADO: 0, NUEVO: 1, ELIMINADO: 2, DUPLICADO: 3, SIN_CAMBIOS: 4}
+        cambios = sorted(self.cambios + self.eliminados(), key=lambda c: orden[c.estado])
+        if isinstance(salida, str):
+            with open(salida, "w", newline="", encoding="utf-8") as f:
+                return self.escribir_reporte(f)
+        writer = csv.writer(salida, lineterminator="\n")
+        writer.writerow(COLUMNAS_REPORTE)
+        writer.writerows(c.fila_reporte() for c in cambios)
+        return len(cambios)
+
+    def reporte_bytes(self):
+        buf = io.StringIO()
+        self.escribir_reporte(buf)
+        # Con BOM para que Excel reconozca los acentos
+        return buf.getvalue().encode("utf-8-sig")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("lista", help="lista de precios (CSV o Excel)")
+    parser.add_argument("--manifiesto", required=True, help="manifiesto JSON; se crea si no existe")
+    parser.add_argument("--salida", required=True, help="ZIP (o PDF con --hoja) con las etiquetas que cambiaron")
+    parser.add_argument("--reporte", help="CSV con el detalle de los cambios")
+    parser.add_argument("--formato", choices=["png", "pdf"], default="png")
+    parser.add_argument("--hoja", action="store_true", help="imponer las etiquetas en hojas A4 en lugar de un ZIP")
+    parser.add_argument("--plantilla", default="", help="diseño de etiqueta (ver plantillas/)")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--nivel-compresion", type=int, default=NIVEL_COMPRESION, choices=range(10), metavar="0-9",
+                        help="compresión de los PNG: más bajo usa menos CPU y genera archivos más grandes")
+    parser.add_argument("--simular", action="store_true", help="solo informar los cambios, sin dibujar ni guardar")
+    args = parser.parse_args(argv)
+
+    # pandas se importa solo al leer la planilla
+    from .importacion import leer_specs, revisar_lista
+
+    formato = "pdf" if args.hoja else args.formato
+    comparacion = Comparacion(Manifiesto.cargar(args.manifiesto, formato), formato)
+    estilo = {"plantilla": args.plantilla} if args.plantilla else {}
+    # Los errores de la lista se informan antes de empezar a dibujar
+    for error in revisar_lista(args.lista, **estilo):
+        print(f"Fila {error.fila}: {error.mensaje}", file=sys.stderr)
+    specs = comparacion.filtrar(leer_specs(args.lista, **estilo))
+    with MemoriaPico() as memoria:
+        if args.simular:
+            cantidad = sum(1 for _ in specs)
+        elif args.hoja:
+            from .imposicion import imponer
+
+            cantidad = imponer(specs, args.salida)
+        else:
+            from .exportar import exportar_zip
+
+            cantidad = exportar_zip(
+                specs, args.salida, formato=args.formato, workers=args.workers, nivel_compresion=args.nivel_compresion
+            )
+
+    if args.reporte:
+        comparacion.escribir_reporte(args.reporte)
+    if not args.simular:
+        # Solo después de exportar: si algo falla, la próxima corrida vuelve a dibujarlas
+        comparacion.manifiesto_nuevo().guardar(args.manifiesto)
+    resumen = comparacion.resumen()
+    print(", ".join(f"{estado}: {n}" for estado, n in resumen.items()))
+    print(f"{cantidad} etiquetas {'a dibujar' if args.simular else 'dibujadas'}, {memoria}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""Dibujo incremental de etiquetas a partir de capas cacheadas.
+
+La etiqueta se compone de cuatro capas: fondo (las dos franjas de color),
+texto y código de barras, bordes y marca de agua. Cada capa se cachea según
+los datos de los que depende, así que un cambio en la UI solo regenera la
+capa afectada:
+
+- cambiar un color de fondo regenera solo el fondo;
+- cambiar el producto o el precio regenera solo la máscara de ese texto;
+- cambiar el color del texto reutiliza las máscaras y solo las vuelve a pegar;
+- mover la escala solo redimensiona la etiqueta ya compuesta.
+
+El texto se guarda como máscaras de cobertura ("L") independientes del color;
+pegar el color con esa máscara da el mismo resultado, píxel a píxel, que
+`draw.text` sobre la imagen.
+"""
+
+import threading
+from collections import OrderedDict
+
+from PIL import Image, ImageDraw
+
+from .assets import get_font
+from .metricas import etapa
+from .plantillas import cargar_plantilla
+from .render import (
+    ALTO,
+    ANCHO,
+    ANCHO_PRODUCTO,
+    FUENTE,
+    _como_spec,
+    dibujar_bordes,
+    dibujar_fondo,
+    escalar,
+    pegar_codigo,
+    pegar_marca_agua,
+    texto_producto,
+    textos_precios,
+)
+from .texto import INTERLINEADO, medidor
+
+MAX_ENTRADAS = 32
+
+
+class _LRU:
+    """Diccionario acotado en cantidad de entradas, seguro entre hilos."""
+
+    def __init__(self, maximo):
+        self.maximo = maximo
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, clave, generar):
+        with self._lock:
+            valor = self._datos.get(clave)
+            if valor is not None:
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return valor
+            self.fallos += 1
+        # Generar fuera del lock para no frenar a otras sesiones
+        valor = generar()
+        with self._lock:
+            self._datos[clave] = valor
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.maximo:
+                self._datos.popitem(last=False)
+        return valor
+
+    def __len__(self):
+        return len(self._datos)
+
+
+def _mascara(dibujar):
+    """Dibuja con `dibujar(draw)` sobre una máscara vacía y la recorta a la zona con tinta.
+
+    Devuelve (máscara, (x, y)) o None si no se dibujó nada.
+    """
+    mascara = Image.new("L", (ANCHO, ALTO), 0)
+    dibujar(ImageDraw.Draw(mascara))
+    caja = mascara.getbbox()
+    if caja is None:
+        return None
+    return mascara.crop(caja), caja[:2]
+
+
+def _mascaras_producto(producto, tamano):
+    font = get_font(FUENTE, tamano)
+    medidas = medidor(font)
+    lineas = medidas.cortar(producto, ANCHO_PRODUCTO)
+    return tuple(
+        _mascara(lambda d, i=i, linea=linea: d.text((30, 25 + 8 + i * (medidas.alto(linea) + INTERLINEADO)), linea, font=font, fill=255))
+        for i, linea in enumerate(lineas)
+    )
+
+
+class RenderCapas:
+    """Renderer que reutiliza las capas de la etiqueta entre llamadas.
+
+    Las imágenes cacheadas se comparten: nunca se modifican, cada composición
+    trabaja sobre una copia del fondo.
+    """
+
+    def __init__(self, max_entradas=MAX_ENTRADAS):
+        self._fondos = _LRU(max_entradas)
+        self._textos = _LRU(max_entradas * 4)
+        self._compuestas = _LRU(max_entradas)
+        self._escaladas = _LRU(max_entradas)
+
+    def estadisticas(self):
+        """Aciertos y fallos por capa."""
+        return {
+            nombre: (lru.aciertos, lru.fallos)
+            for nombre, lru in (
+                ("fondo", self._fondos),
+                ("texto", self._textos),
+                ("compuesta", self._compuestas),
+                ("escalada", self._escaladas),
+            )
+        }
+
+    def fondo(self, spec):
+        def generar():
+            img = Image.new("RGB", (ANCHO, ALTO), color=spec.color_fondo_superior)
+            dibujar_fondo(ImageDraw.Draw(img), spec)
+            return img
+
+        return self._fondos.obtener((spec.color_fondo_superior, spec.color_fondo_inferior), generar)
+
+    def mascaras_texto(self, spec, textos=None):
+        """Máscaras del nombre del producto y de cada línea de precio, en orden de dibujo."""
+        producto, tamano = texto_producto(spec)
+        # Una máscara por línea: si las líneas se superponen, pegarlas en orden
+        # redondea igual que `draw.text` línea por línea
+        mascaras = list(
+            self._textos.obtener(("producto", producto, tamano), lambda: _mascaras_producto(producto, tamano))
+        )
+        for xy, texto, tamano in textos if textos is not None else textos_precios(spec):
+            mascaras.append(
+                self._textos.obtener(
+                    (xy, texto, tamano),
+                    lambda: _mascara(lambda d: d.text(xy, texto, fill=255, font=get_font(FUENTE, tamano))),
+                )
+            )
+        return [m for m in mascaras if m is not None]
+
+    @staticmethod
+    def _clave(spec, textos):
+        return (
+            spec.color_fondo_superior,
+            spec.color_fondo_inferior,
+            spec.producto.upper(),
+            spec.ajustar_texto,
+            tuple(textos),
+            spec.color_texto,
+            spec.color_borde_exterior,
+            spec.color_borde_interior,
+            str(spec.codigo).strip(),
+            spec.simbologia,
+        )
+
+    def componer(self, spec, textos=None):
+        """Etiqueta completa en tamaño base, sin escalar."""
+        textos = textos if textos is not None else textos_precios(spec)
+
+        def generar():
+            with etapa("dibujo"):
+                img = self.fondo(spec).copy()
+                for mascara, (x, y) in self.mascaras_texto(spec, textos):
+                    img.paste(spec.color_texto, (x, y, x + mascara.width, y + mascara.height), mascara)
+                # Las imágenes de los códigos ya se cachean en `codigos`
+                pegar_codigo(img, spec)
+                # Los bordes son rectángulos sin suavizado: redibujarlos cuesta menos que pegar una capa
+                dibujar_bordes(ImageDraw.Draw(img), spec)
+            pegar_marca_agua(img)
+            return img
+
+        return self._compuestas.obtener(self._clave(spec, textos), generar)
+
+    def render_label(self, spec):
+        """Igual que `render.render_label`, reutilizando las capas cacheadas.
+
+        La imagen devuelta puede estar compartida con otras llamadas: no modificarla.
+        """
+        spec = _como_spec(spec)
+        if spec.plantilla:
+            # Las plantillas ya cachean su capa estática por colores
+            return cargar_plantilla(spec.plantilla).render(spec)
+        textos = textos_precios(spec)
+        clave = self._clave(spec, textos) + (spec.escala,)
+        return self._escaladas.obtener(clave, lambda: escalar(self.componer(spec, textos), spec.escala))
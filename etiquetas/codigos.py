@@ -0,0 +1,171 @@
+"""Códigos de barras para las etiquetas (EAN-13, Code 128 y Code 39).
+
+La codificación de barras la hace python-barcode; el dibujo lo hacemos acá,
+con las mismas barras para la versión PNG y la PDF vectorial, y con la fuente
+de la etiqueta para el texto legible.
+
+Las imágenes se cachean por (simbología, datos, module_width, module_height,
+write_text), así que reimprimir el mismo SKU no vuelve a generar el código.
+"""
+
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+
+import barcode
+from PIL import Image, ImageDraw
+
+from .assets import FUENTES_DIR, get_font
+
+SIMBOLOGIAS = ("ean13", "code128", "code39")
+
+# 1 px = 0,1 mm: un módulo de 0,2 mm son 2 px
+PX_POR_MM = 10
+MODULO_ANCHO = 0.2
+MODULO_ALTO = 8.0
+# Zona en blanco a cada lado, en módulos (EAN-13 pide al menos 7 a la derecha y 11 a la izquierda)
+ZONA_SILENCIO = 11
+FUENTE_CODIGO = os.path.join(FUENTES_DIR, "Inter", "Inter-Medium.ttf")
+TAMANO_TEXTO = 14
+SEPARACION_TEXTO = 2
+
+MAX_CODIGOS = 1024
+
+
+def digito_verificador_ean13(doce):
+    """Dígito verificador de los primeros 12 dígitos de un EAN-13."""
+    suma = sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(doce[:12]))
+    return (10 - suma % 10) % 10
+
+
+def validar_ean13(codigo):
+    """True si `codigo` tiene 13 dígitos y el verificador es correcto."""
+    codigo = str(codigo).strip()
+    return len(codigo) == 13 and codigo.isdigit() and int(codigo[12]) == digito_verificador_ean13(codigo)
+
+
+def validar_ean13_lote(codigos):
+    """Valida muchos EAN-13 de una vez; devuelve un array de bool del mismo largo.
+
+    Pensado para revisar una lista de precios completa antes de generar etiquetas.
+    """
+    # numpy tarda en importarse y la UI no lo necesita para una sola etiqueta
+    import numpy as np
+
+    # Sin largo fijo en el dtype: "U13" recortaría los códigos más largos antes de validarlos
+    codigos = np.asarray([str(c).strip() for c in codigos], dtype=str)
+    validos = (np.char.str_len(codigos) == 13) & np.char.isdigit(codigos)
+    if not validos.any():
+        return validos
+    candidatos = codigos[validos]
+    digitos = candidatos.astype("U13").view(np.uint32).reshape(-1, 13) - ord("0")
+    pesos = np.array([1, 3] * 6, dtype=np.uint32)
+    verificador = (10 - (digitos[:, :12] @ pesos) % 10) % 10
+    resultado = verificador == digitos[:, 12]
+    # Dígitos no ASCII (isdigit los acepta): mismo criterio que validar_ean13
+    for i in np.flatnonzero((digitos > 9).any(axis=1)):
+        resultado[i] = validar_ean13(candidatos[i])
+    validos[validos] = resultado
+    return validos
+
+
+def simbologia_para(codigo):
+    """EAN-13 si el código son 13 dígitos, Code 128 para cualquier otro SKU."""
+    codigo = str(codigo).strip()
+    return "ean13" if len(codigo) == 13 and codigo.isdigit() else "code128"
+
+
+@lru_cache(maxsize=MAX_CODIGOS)
+def modulos(simbologia, datos):
+    """Devuelve (módulos, texto legible): la secuencia de '1' (barra) y '0' (espacio) y el código completo.
+
+    Lanza ValueError si los datos no son válidos para la simbología; un EAN-13
+    con verificador incorrecto también es un error (python-barcode lo corregiría
+    en silencio).
+    """
+    if simbologia not in SIMBOLOGIAS:
+        raise ValueError(f"Simbología no soportada: {simbologia}")
+    if simbologia == "ean13" and not validar_ean13(datos):
+        raise ValueError(f"EAN-13 inválido: {datos!r}")
+    try:
+        codigo = barcode.get_barcode_class(simbologia)(datos)
+        return "".join(codigo.build()), codigo.get_fullcode()
+    except barcode.errors.BarcodeError as e:
+        raise ValueError(f"Código {simbologia} inválido: {datos!r} ({e})") from None
+
+
+@dataclass(frozen=True)
+class SimboloCodigo:
+    """Geometría de un código ya codificado, en píxeles (1 px = 0,1 mm).
+
+    La comparten la versión PNG y la vectorial para que las barras queden iguales.
+    """
+
+    secuencia: str
+    texto: str
+    modulo: int
+    alto_barras: int
+    alto_texto: int
+
+    @property
+    def margen(self):
+        return ZONA_SILENCIO * self.modulo
+
+    @property
+    def ancho(self):
+        return len(self.secuencia) * self.modulo + 2 * self.margen
+
+    @property
+    def alto(self):
+        return self.alto_barras + self.alto_texto
+
+    def barras(self):
+        """Rectángulos de las barras como (x, ancho), con x desde el borde izquierdo."""
+        tramos = []
+        inicio = None
+        for i, m in enumerate(self.secuencia + "0"):
+            if m == "1" and inicio is None:
+                inicio = i
+            elif m != "1" and inicio is not None:
+                tramos.append((self.margen + inicio * self.modulo, (i - inicio) * self.modulo))
+                inicio = None
+        return tramos
+
+
+@lru_cache(maxsize=MAX_CODIGOS)
+def simbolo(simbologia, datos, module_width=MODULO_ANCHO, module_height=MODULO_ALTO, write_text=True):
+    """Codifica `datos` y devuelve su SimboloCodigo."""
+    secuencia, texto = modulos(simbologia, datos)
+    alto_texto = 0
+    if write_text:
+        ascendente, descendente = get_font(FUENTE_CODIGO, TAMANO_TEXTO).getmetrics()
+        alto_texto = SEPARACION_TEXTO + ascendente + descendente
+    return SimboloCodigo(
+        secuencia=secuencia,
+        texto=texto if write_text else "",
+        modulo=max(1, round(module_width * PX_POR_MM)),
+        alto_barras=max(1, round(module_height * PX_POR_MM)),
+        alto_texto=alto_texto,
+    )
+
+
+@lru_cache(maxsize=MAX_CODIGOS)
+def imagen_codigo(simbologia, datos, module_width=MODULO_ANCHO, module_height=MODULO_ALTO, write_text=True):
+    """Imagen RGB del código (barras negras sobre blanco, con zona de silencio).
+
+    La imagen se comparte entre llamadas: usarla solo como origen de `paste`.
+    """
+    s = simbolo(simbologia, datos, module_width, module_height, write_text)
+    img = Image.new("RGB", (s.ancho, s.alto), "white")
+    draw = ImageDraw.Draw(img)
+    for x, ancho in s.barras():
+        draw.rectangle([x, 0, x + ancho - 1, s.alto_barras - 1], fill="black")
+    if write_text:
+        font = get_font(FUENTE_CODIGO, TAMANO_TEXTO)
+        draw.text((s.ancho / 2, s.alto_barras + SEPARACION_TEXTO), s.texto, font=font, fill="black", anchor="ma")
+    return img
+
+
+def cache_info():
+    """Estado de las cachés de códigos (para diagnóstico)."""
+    return {"modulos": modulos.cache_info(), "simbolo": simbolo.cache_info(), "imagen": imagen_codigo.cache_info()}
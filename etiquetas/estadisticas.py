@@ -0,0 +1,154 @@
+"""Registro de estadísticas de uso (provincias y calificaciones) en CSV.
+
+Cada evento se agrega al final del archivo, sin leerlo ni reescribirlo, y con
+un lock de archivo para que varias sesiones o procesos no pierdan filas. Las
+escrituras se agrupan en un hilo de fondo que vacía la cola cada `intervalo`
+segundos.
+"""
+
+import atexit
+import csv
+import logging
+import os
+import queue
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from .metricas import etapa
+
+logger = logging.getLogger(__name__)
+
+# Esquema de los CSV existentes en DATA_DIR
+COLUMNAS_CALIFICACIONES = ["Fecha", "Hora", "Evaluación"]
+COLUMNAS_PROVINCIAS = ["Fecha", "Hora", "Provincia"]
+
+# Segundos entre escrituras del hilo de fondo
+INTERVALO_FLUSH = 1.0
+
+
+def _bloquear(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+
+def _desbloquear(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def agregar_filas(path, columnas, filas):
+    """Agrega `filas` al final del CSV bajo un lock exclusivo.
+
+    Si el archivo no existe o está vacío, escribe primero el encabezado.
+    """
+    carpeta = os.path.dirname(path)
+    if carpeta:
+        os.makedirs(carpeta, exist_ok=True)
+    with etapa("estadisticas_csv"), open(path, "a", newline="", encoding="utf-8") as f:
+        _bloquear(f)
+        try:
+            f.seek(0, os.SEEK_END)
+            writer = csv.writer(f, lineterminator="\n")
+            if f.tell() == 0:
+                writer.writerow(columnas)
+            writer.writerows(filas)
+            f.flush()
+        finally:
+            _desbloquear(f)
+
+
+class EscritorCSV:
+    """Escritor de eventos en un CSV de solo agregado.
+
+    `agregar` solo encola el evento; un hilo de fondo escribe los eventos
+    pendientes en un único bloque cada `intervalo` segundos o cuando se juntan
+    `max_lote`. Con `intervalo=0` cada evento se escribe en el momento.
+    """
+
+    def __init__(self, path, columnas, intervalo=INTERVALO_FLUSH, max_lote=500):
+        self.path = path
+        self.columnas = list(columnas)
+        self.intervalo = intervalo
+        self.max_lote = max_lote
+        self._cola = queue.Queue()
+        self._lock = threading.Lock()
+        self._hilo = None
+        self._cerrado = False
+        # Crear el archivo con su encabezado si todavía no existe
+        agregar_filas(self.path, self.columnas, [])
+        atexit.register(self.cerrar)
+
+    def agregar(self, *valores):
+        if len(valores) != len(self.columnas):
+            raise ValueError(f"Se esperaban {len(self.columnas)} valores: {', '.join(self.columnas)}")
+        if self.intervalo <= 0 or self._cerrado:
+            agregar_filas(self.path, self.columnas, [valores])
+            return
+        self._cola.put(valores)
+        self._iniciar_hilo()
+
+    def _iniciar_hilo(self):
+        if self._hilo is not None:
+            return
+        with self._lock:
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._bucle, name=f"EscritorCSV({self.path})", daemon=True)
+                self._hilo.start()
+
+    def _bucle(self):
+        while not self._cerrado:
+            try:
+                primero = self._cola.get(timeout=self.intervalo)
+            except queue.Empty:
+                continue
+            # Agrupar los eventos que lleguen durante el resto del intervalo
+            lote = [primero]
+            fin = time.monotonic() + self.intervalo
+            while len(lote) < self.max_lote:
+                restante = fin - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    lote.append(self._cola.get(timeout=restante))
+                except queue.Empty:
+                    break
+            self._escribir(lote)
+
+    def _pendientes(self):
+        lote = []
+        while True:
+            try:
+                lote.append(self._cola.get_nowait())
+            except queue.Empty:
+                return lote
+
+    def _escribir(self, lote):
+        if not lote:
+            return
+        try:
+            agregar_filas(self.path, self.columnas, lote)
+        except OSError:
+            logger.exception("No se pudieron guardar %d eventos en %s", len(lote), self.path)
+
+    def flush(self):
+        """Escribe ya todos los eventos encolados."""
+        self._escribir(self._pendientes())
+
+    def cerrar(self):
+        """Detiene el hilo de fondo y escribe lo pendiente."""
+        self._cerrado = True
+        if self._hilo is not None:
+            self._hilo.join(timeout=self.intervalo + 1)
+        self.flush()
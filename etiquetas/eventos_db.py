@@ -0,0 +1,201 @@
+"""Base SQLite opcional para los eventos de provincia y calificación.
+
+Alternativa a los CSV de DATA_DIR cuando el historial crece: los eventos se
+guardan en una base local en modo WAL, con índices por fecha y provincia, y
+las estadísticas habituales se resuelven con consultas agregadas en lugar de
+cargar todo el historial en pandas.
+
+Las fechas se guardan en formato ISO (aaaa-mm-dd) para poder filtrar por
+rango; las funciones aceptan tanto ese formato como el dd/mm/aa de los CSV.
+"""
+
+import csv
+import datetime
+import os
+import sqlite3
+import threading
+
+from .metricas import etapa
+
+# Tabla -> (columna del valor en SQLite, columna en el CSV)
+TABLAS = {
+    "provincias": ("provincia", "Provincia"),
+    "calificaciones": ("evaluacion", "Evaluación"),
+}
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS provincias (
+    id INTEGER PRIMARY KEY,
+    fecha TEXT NOT NULL,
+    hora TEXT NOT NULL,
+    provincia TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_provincias_fecha ON provincias (fecha, provincia);
+CREATE INDEX IF NOT EXISTS idx_provincias_provincia_fecha ON provincias (provincia, fecha);
+
+CREATE TABLE IF NOT EXISTS calificaciones (
+    id INTEGER PRIMARY KEY,
+    fecha TEXT NOT NULL,
+    hora TEXT NOT NULL,
+    evaluacion TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_calificaciones_fecha ON calificaciones (fecha, evaluacion);
+
+CREATE TABLE IF NOT EXISTS migraciones (
+    archivo TEXT PRIMARY KEY,
+    filas INTEGER NOT NULL,
+    fecha TEXT NOT NULL
+);
+"""
+
+# Filas por INSERT al migrar
+LOTE_MIGRACION = 5000
+
+
+def fecha_iso(fecha):
+    """Convierte "17/10/26" (formato de los CSV) a "2026-10-17"; deja igual las fechas ISO."""
+    if isinstance(fecha, (datetime.date, datetime.datetime)):
+        return fecha.strftime("%Y-%m-%d")
+    fecha = str(fecha).strip()
+    if "/" in fecha:
+        return datetime.datetime.strptime(fecha, "%d/%m/%y").strftime("%Y-%m-%d")
+    return fecha
+
+
+class BaseEventos:
+    """Acceso a la base de eventos; una conexión compartida protegida por un lock."""
+
+    def __init__(self, path):
+        self.path = path
+        carpeta = os.path.dirname(path)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conexion = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA synchronous=NORMAL")
+        self._conexion.executescript(_ESQUEMA)
+
+    def cerrar(self):
+        with self._lock:
+            self._conexion.close()
+
+    def _consultar(self, sql, parametros=()):
+        with self._lock:
+            return self._conexion.execute(sql, parametros).fetchall()
+
+    def agregar(self, tabla, fecha, hora, valor):
+        """Registra un evento en `tabla` ("provincias" o "calificaciones")."""
+        columna = TABLAS[tabla][0]
+        with self._lock, self._conexion:
+            self._conexion.execute(
+                f"INSERT INTO {tabla} (fecha, hora, {columna}) VALUES (?, ?, ?)",
+                (fecha_iso(fecha), hora, valor),
+            )
+
+    def escritor(self, tabla):
+        """Devuelve un objeto con la misma interfaz `agregar(fecha, hora, valor)` que EscritorCSV."""
+        return EscritorSQLite(self, tabla)
+
+    @staticmethod
+    def _filtro_fechas(desde, hasta):
+        condiciones, parametros = [], []
+        if desde is not None:
+            condiciones.append("fecha >= ?")
+            parametros.append(fecha_iso(desde))
+        if hasta is not None:
+            condiciones.append("fecha <= ?")
+            parametros.append(fecha_iso(hasta))
+        where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+        return where, parametros
+
+    def descargas_por_provincia_y_dia(self, desde=None, hasta=None, provincia=None):
+        """Lista de (fecha, provincia, descargas), ordenada por fecha y provincia."""
+        where, parametros = self._filtro_fechas(desde, hasta)
+        if provincia is not None:
+            where = f"{where} AND provincia = ?" if where else "WHERE provincia = ?"
+            parametros.append(provincia)
+        return self._consultar(
+            f"SELECT fecha, provincia, COUNT(*) FROM provincias {where} "
+            "GROUP BY fecha, provincia ORDER BY fecha, provincia",
+            parametros,
+        )
+
+    def descargas_por_provincia(self, desde=None, hasta=None):
+        """Dict provincia -> descargas en el rango, de mayor a menor."""
+        where, parametros = self._filtro_fechas(desde, hasta)
+        filas = self._consultar(
+            f"SELECT provincia, COUNT(*) AS n FROM provincias {where} GROUP BY provincia ORDER BY n DESC",
+            parametros,
+        )
+        return dict(filas)
+
+    def distribucion_calificaciones(self, desde=None, hasta=None):
+        """Dict evaluación -> cantidad de calificaciones en el rango."""
+        where, parametros = self._filtro_fechas(desde, hasta)
+        filas = self._consultar(
+            f"SELECT evaluacion, COUNT(*) FROM calificaciones {where} GROUP BY evaluacion",
+            parametros,
+        )
+        return dict(filas)
+
+    def distribucion_calificaciones_semana(self, hoy=None):
+        """Distribución de calificaciones desde el lunes de la semana de `hoy`."""
+        hoy = hoy or datetime.date.today()
+        lunes = hoy - datetime.timedelta(days=hoy.weekday())
+        return self.distribucion_calificaciones(desde=lunes, hasta=hoy)
+
+    def migrar_csv(self, data_dir):
+        """Importa una sola vez los CSV existentes de `data_dir`.
+
+        Cada archivo se registra en la tabla `migraciones`, así que volver a
+        llamar a esta función no duplica eventos. Devuelve un dict
+        tabla -> filas importadas en esta llamada.
+        """
+        importadas = {}
+        for tabla, (columna, columna_csv) in TABLAS.items():
+            path = os.path.join(data_dir, f"{tabla}.csv")
+            if not os.path.exists(path):
+                continue
+            nombre = os.path.abspath(path)
+            with self._lock:
+                if self._conexion.execute("SELECT 1 FROM migraciones WHERE archivo = ?", (nombre,)).fetchone():
+                    continue
+            total = 0
+            sql = f"INSERT INTO {tabla} (fecha, hora, {columna}) VALUES (?, ?, ?)"
+            with open(path, newline="", encoding="utf-8") as f, self._lock, self._conexion:
+                lote = []
+                for fila in csv.DictReader(f):
+                    lote.append((fecha_iso(fila["Fecha"]), fila["Hora"], fila[columna_csv]))
+                    if len(lote) >= LOTE_MIGRACION:
+                        self._conexion.executemany(sql, lote)
+                        total += len(lote)
+                        lote = []
+                self._conexion.executemany(sql, lote)
+                total += len(lote)
+                self._conexion.execute(
+                    "INSERT INTO migraciones (archivo, filas, fecha) VALUES (?, ?, ?)",
+                    (nombre, total, datetime.datetime.now().isoformat(timespec="seconds")),
+                )
+            importadas[tabla] = total
+        return importadas
+
+
+class EscritorSQLite:
+    """Adaptador para usar la base con la interfaz de EscritorCSV."""
+
+    def __init__(self, base, tabla):
+        if tabla not in TABLAS:
+            raise ValueError(f"Tabla desconocida: {tabla}")
+        self.base = base
+        self.tabla = tabla
+
+    def agregar(self, fecha, hora, valor):
+        with etapa("estadisticas_sqlite"):
+            self.base.agregar(self.tabla, fecha, hora, valor)
+
+    def flush(self):
+        pass
+
+    def cerrar(self):
+        pass
@@ -0,0 +1,62 @@
+"""Exportación de muchas etiquetas a un archivo ZIP, escrito a medida que se dibujan.
+
+Cada etiqueta se agrega al ZIP apenas está lista y se descarta, así que en
+memoria solo quedan una etiqueta y el directorio central del ZIP (un registro
+chico por archivo). La salida puede ser un archivo o cualquier stream binario,
+aunque no admita `seek`.
+"""
+
+import itertools
+import re
+import unicodedata
+import zipfile
+
+from .lienzo import NIVEL_COMPRESION, medir_lote
+from .paralelo import render_paralelo
+from .render import _como_spec
+
+# Formatos ya comprimidos: comprimirlos otra vez gasta CPU sin ganar espacio
+COMPRESION = {
+    "png": zipfile.ZIP_STORED,
+    "pdf": zipfile.ZIP_STORED,
+}
+
+LARGO_MAXIMO_NOMBRE = 60
+
+
+def nombre_archivo(producto, usados, extension):
+    """Nombre de archivo seguro a partir del nombre del producto, sin repetir los de `usados`.
+
+    "Yerba Mate 1/2 kg" -> "yerba_mate_1_2_kg.png"; si ya existe, "yerba_mate_1_2_kg_2.png".
+    """
+    base = unicodedata.normalize("NFKD", producto).encode("ascii", "ignore").decode()
+    base = re.sub(r"[^a-z0-9]+", "_", base.lower()).strip("_")[:LARGO_MAXIMO_NOMBRE].rstrip("_")
+    base = base or "etiqueta"
+    nombre = f"{base}.{extension}"
+    contador = 1
+    while nombre in usados:
+        contador += 1
+        nombre = f"{base}_{contador}.{extension}"
+    usados.add(nombre)
+    return nombre
+
+
+def exportar_zip(specs, salida, formato="png", workers=1, nivel_compresion=NIVEL_COMPRESION):
+    """Dibuja cada especificación y la agrega al ZIP `salida` (ruta o stream binario).
+
+    Con `workers` > 1 el dibujo se reparte en varios procesos.
+    `nivel_compresion` (0 a 9) es el de los PNG: más bajo, menos CPU y
+    archivos más grandes. Devuelve la cantidad de etiquetas escritas.
+    """
+    specs, para_nombres = itertools.tee(_como_spec(spec) for spec in specs)
+    usados = set()
+    cantidad = 0
+    compresion = COMPRESION.get(formato, zipfile.ZIP_DEFLATED)
+    resultados = render_paralelo(specs, workers=workers, formato=formato, nivel_compresion=nivel_compresion)
+    with medir_lote(f"zip_{formato}") as memoria, zipfile.ZipFile(salida, "w", compression=compresion) as zf:
+        # Los resultados salen en orden, a la par de las especificaciones
+        for (_, datos), spec in zip(resultados, para_nombres):
+            zf.writestr(nombre_archivo(spec.producto, usados, formato), datos)
+            cantidad += 1
+        memoria.etiquetas = cantidad
+    return cantidad
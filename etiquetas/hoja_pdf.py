@@ -0,0 +1,237 @@
+"""Hojas PDF con muchas etiquetas, escritas de forma incremental.
+
+Cada etiqueta se comprime y se escribe en el archivo apenas se dibuja; en
+memoria solo quedan los offsets de los objetos ya escritos, así que el consumo
+no crece con la cantidad de filas de la lista de precios.
+
+`Plancha` es la disposición de las etiquetas en la hoja (celdas, márgenes y
+encaje de cada etiqueta en su celda); la usan esta hoja de imágenes y la
+imposición vectorial de `imposicion`.
+"""
+
+import zlib
+from dataclasses import dataclass, replace
+
+from .lienzo import lienzo_local, medir_lote
+from .plantillas import cargar_plantilla
+from .render import ALTO, ANCHO, _como_spec
+
+# Tamaños de página en puntos PDF (1/72 de pulgada)
+CM = 72 / 2.54
+A4 = (595.28, 841.89)
+LETTER = (612.0, 792.0)
+
+# Objetos con número fijo; el resto se numera a medida que se escribe
+_OBJ_CATALOGO = 1
+_OBJ_PAGINAS = 2
+
+
+def _num(valor):
+    """Formatea un número para el contenido PDF, sin ceros de más."""
+    return ("%.3f" % valor).rstrip("0").rstrip(".")
+
+
+class HojaPDF:
+    """Escritor PDF mínimo para páginas compuestas solo por imágenes RGB.
+
+    `salida` es cualquier archivo binario abierto para escritura; no hace
+    falta que admita `seek`, por lo que puede ser una respuesta HTTP.
+    """
+
+    def __init__(self, salida, pagina=A4, nivel_compresion=6):
+        self.salida = salida
+        self.ancho_pagina, self.alto_pagina = pagina
+        self.nivel_compresion = nivel_compresion
+        self._posicion = 0
+        self._offsets = {}
+        self._siguiente = _OBJ_PAGINAS + 1
+        self._paginas = []
+        self._cerrado = False
+        self._escribir(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    @property
+    def cantidad_paginas(self):
+        return len(self._paginas)
+
+    def _escribir(self, datos):
+        self.salida.write(datos)
+        self._posicion += len(datos)
+
+    def _reservar(self):
+        num = self._siguiente
+        self._siguiente += 1
+        return num
+
+    def _objeto(self, num, diccionario, stream=None):
+        self._offsets[num] = self._posicion
+        if stream is None:
+            self._escribir(b"%d 0 obj\n%s\nendobj\n" % (num, diccionario))
+        else:
+            self._escribir(b"%d 0 obj\n%s\nstream\n" % (num, diccionario))
+            self._escribir(stream)
+            self._escribir(b"\nendstream\nendobj\n")
+
+    def agregar_imagen(self, img):
+        """Escribe la imagen como XObject y devuelve su número de objeto."""
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        datos = zlib.compress(img.tobytes(), self.nivel_compresion)
+        num = self._reservar()
+        self._objeto(
+            num,
+            b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceRGB "
+            b"/BitsPerComponent 8 /Filter /FlateDecode /Length %d >>" % (img.width, img.height, len(datos)),
+            datos,
+        )
+        return num
+
+    def agregar_pagina(self, colocaciones):
+        """Agrega una página con imágenes ya escritas.
+
+        `colocaciones` es una lista de (num_imagen, x, y, ancho, alto) en puntos,
+        con el origen en la esquina inferior izquierda de la página.
+        """
+        recursos = []
+        contenido = []
+        for i, (num, x, y, ancho, alto) in enumerate(colocaciones):
+            recursos.append(b"/Im%d %d 0 R" % (i, num))
+            contenido.append(
+                ("q %s 0 0 %s %s %s cm /Im%d Do Q" % (_num(ancho), _num(alto), _num(x), _num(y), i)).encode()
+            )
+        datos = zlib.compress(b"\n".join(contenido), self.nivel_compresion)
+        num_contenido = self._reservar()
+        self._objeto(num_contenido, b"<< /Filter /FlateDecode /Length %d >>" % len(datos), datos)
+
+        num_pagina = self._reservar()
+        self._objeto(
+            num_pagina,
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %s %s] /Resources << /XObject << %s >> >> /Contents %d 0 R >>"
+            % (
+                _OBJ_PAGINAS,
+                _num(self.ancho_pagina).encode(),
+                _num(self.alto_pagina).encode(),
+                b" ".join(recursos),
+                num_contenido,
+            ),
+        )
+        self._paginas.append(num_pagina)
+
+    def cerrar(self):
+        """Escribe el árbol de páginas, la tabla xref y el trailer."""
+        if self._cerrado:
+            return
+        self._cerrado = True
+        kids = b" ".join(b"%d 0 R" % num for num in self._paginas)
+        self._objeto(_OBJ_PAGINAS, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self._paginas)))
+        self._objeto(_OBJ_CATALOGO, b"<< /Type /Catalog /Pages %d 0 R >>" % _OBJ_PAGINAS)
+
+        inicio_xref = self._posicion
+        total = self._siguiente
+        lineas = [b"xref\n0 %d\n" % total, b"0000000000 65535 f \n"]
+        for num in range(1, total):
+            lineas.append(b"%010d 00000 n \n" % self._offsets[num])
+        self._escribir(b"".join(lineas))
+        self._escribir(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (total, _OBJ_CATALOGO, inicio_xref))
+
+
+# Margen de redondeo al contar celdas: con el ancho calculado por
+# `Plancha.por_columnas` la cuenta exacta puede dar 1.9999999
+_EPSILON = 1e-9
+
+
+@dataclass(frozen=True)
+class Plancha:
+    """Disposición de etiquetas en una hoja. Todas las medidas en puntos PDF."""
+
+    pagina: tuple = A4
+    margen: float = 1 * CM
+    separacion_x: float = 0.3 * CM
+    separacion_y: float = 0.3 * CM
+    ancho_etiqueta: float = 9 * CM
+    alto_etiqueta: float = 9 * CM * ALTO / ANCHO
+
+    @classmethod
+    def por_columnas(cls, pagina=A4, columnas=2, margen=CM, separacion=0.3 * CM, tamano=(ANCHO, ALTO)):
+        """Plancha con `columnas` celdas por fila que ocupan todo el ancho útil, en la proporción de `tamano`."""
+        ancho = (pagina[0] - 2 * margen - (columnas - 1) * separacion) / columnas
+        return cls(pagina, margen, separacion, separacion, ancho, ancho * tamano[1] / tamano[0])
+
+    @classmethod
+    def para_plantilla(cls, nombre, ancho_etiqueta=9 * CM, **opciones):
+        """Plancha con celdas en la proporción de la plantilla `nombre`."""
+        ancho, alto = cargar_plantilla(nombre).tamano
+        return cls(ancho_etiqueta=ancho_etiqueta, alto_etiqueta=ancho_etiqueta * alto / ancho, **opciones)
+
+    @property
+    def columnas(self):
+        util = self.pagina[0] - 2 * self.margen + self.separacion_x
+        return int(util / (self.ancho_etiqueta + self.separacion_x) + _EPSILON)
+
+    @property
+    def filas(self):
+        util = self.pagina[1] - 2 * self.margen + self.separacion_y
+        return int(util / (self.alto_etiqueta + self.separacion_y) + _EPSILON)
+
+    @property
+    def por_pagina(self):
+        return self.columnas * self.filas
+
+    def posiciones(self):
+        """(x, y) de la esquina inferior izquierda de cada celda, de arriba hacia abajo y de izquierda a derecha."""
+        if self.por_pagina < 1:
+            raise ValueError("La etiqueta no entra en la hoja con esos márgenes")
+        ancho_pagina, alto_pagina = self.pagina
+        posiciones = []
+        for fila in range(self.filas):
+            y = alto_pagina - self.margen - self.alto_etiqueta - fila * (self.alto_etiqueta + self.separacion_y)
+            for columna in range(self.columnas):
+                posiciones.append((self.margen + columna * (self.ancho_etiqueta + self.separacion_x), y))
+        return posiciones
+
+    def encajar(self, tamano):
+        """(dx, dy, ancho, alto) para centrar una etiqueta de `tamano` en la celda sin deformarla."""
+        escala = min(self.ancho_etiqueta / tamano[0], self.alto_etiqueta / tamano[1])
+        ancho, alto = tamano[0] * escala, tamano[1] * escala
+        return (self.ancho_etiqueta - ancho) / 2, (self.alto_etiqueta - alto) / 2, ancho, alto
+
+
+def generar_pdf(specs, salida, pagina=A4, columnas=2, margen=CM, separacion=0.3 * CM, plancha=None):
+    """Dibuja cada especificación y la agrega a una hoja PDF paginada.
+
+    Sin `plancha`, las celdas salen de repartir el ancho útil de `pagina`
+    entre `columnas`. Las etiquetas se procesan de a una; devuelve la
+    cantidad de etiquetas escritas.
+    """
+    if plancha is None:
+        plancha = Plancha.por_columnas(pagina, columnas, margen, separacion)
+    posiciones = plancha.posiciones()
+    cantidad = 0
+    colocaciones = []
+    # Cada plantilla puede tener otra proporción
+    encajes = {}
+    # La imagen se comprime apenas se dibuja: alcanza con un lienzo reutilizado
+    lienzo = lienzo_local()
+    with medir_lote("hoja_imagenes") as memoria, HojaPDF(salida, plancha.pagina) as hoja:
+        for spec in specs:
+            # Siempre en tamaño base: el tamaño impreso lo define la plancha
+            img = lienzo.render_label(replace(_como_spec(spec), escala=1.0))
+            num = hoja.agregar_imagen(img)
+            if img.size not in encajes:
+                encajes[img.size] = plancha.encajar(img.size)
+            dx, dy, ancho, alto = encajes[img.size]
+            x, y = posiciones[len(colocaciones)]
+            colocaciones.append((num, x + dx, y + dy, ancho, alto))
+            cantidad += 1
+            if len(colocaciones) == len(posiciones):
+                hoja.agregar_pagina(colocaciones)
+                colocaciones = []
+        if colocaciones or not hoja.cantidad_paginas:
+            hoja.agregar_pagina(colocaciones)
+        memoria.etiquetas = cantidad
+    return cantidad
@@ -0,0 +1,316 @@
+"""Importación masiva de listas de precios desde CSV o Excel.
+
+Columnas reconocidas (sin importar mayúsculas ni acentos):
+    producto, precio_final, iva, unidad, cantidad, codigo
+
+Solo `producto` y `precio_final` son obligatorias. Los precios escritos como
+texto se interpretan con las mismas reglas que el campo "Precio Final del
+Producto" de la UI ("$1.234,50" -> 1234.5). Las cantidades son un decimal
+simple con "," o "." como separador ("1,5" o "1.5"); un valor ambiguo como
+"1.500" es un error de la fila. La columna
+`codigo` (EAN o SKU) agrega un código de barras; un EAN-13 con el dígito
+verificador incorrecto o un código que no entra en la etiqueta (o en la
+zona de la plantilla) es un error de la fila, antes de dibujar nada.
+
+`revisar_lista` valida la planilla entera sin dibujar, para mostrar todos
+los errores antes de empezar a generar; `leer_specs` la lee de nuevo.
+"""
+
+import itertools
+import math
+import os
+import re
+import unicodedata
+from dataclasses import dataclass, replace
+
+import pandas as pd
+
+from .codigos import digito_verificador_ean13, modulos, simbologia_para, validar_ean13, validar_ean13_lote
+from .plantillas import cargar_plantilla
+from .precios import parsear_precio
+from .render import LabelSpec, codigo_etiqueta
+
+COLUMNAS_OBLIGATORIAS = ["producto", "precio_final"]
+
+# Nombres alternativos de columnas habituales en listas de precios
+ALIAS_COLUMNAS = {
+    "descripcion": "producto",
+    "articulo": "producto",
+    "precio": "precio_final",
+    "precio_final_del_producto": "precio_final",
+    "alicuota": "iva",
+    "alicuota_iva": "iva",
+    "cant": "cantidad",
+    "ean": "codigo",
+    "ean13": "codigo",
+    "ean_13": "codigo",
+    "sku": "codigo",
+    "codigo_de_barras": "codigo",
+    "codigo_barras": "codigo",
+    "cod_barras": "codigo",
+}
+
+ALIAS_IVA = {
+    "21%": "21%", "21": "21%", "0.21": "21%", "0,21": "21%",
+    "10.5%": "10.5%", "10,5%": "10.5%", "10.5": "10.5%", "10,5": "10.5%", "0.105": "10.5%", "0,105": "10.5%",
+    "exento": "Exento", "0%": "Exento", "0": "Exento",
+}
+
+ALIAS_UNIDADES = {
+    "": "Sin unidades", "sin unidades": "Sin unidades", "u": "Sin unidades", "un": "Sin unidades", "unidad": "Sin unidades",
+    "kg": "Kilogramos", "kilo": "Kilogramos", "kilos": "Kilogramos", "kilogramo": "Kilogramos", "kilogramos": "Kilogramos",
+    "l": "Litros", "lt": "Litros", "lts": "Litros", "litro": "Litros", "litros": "Litros",
+}
+
+# Mismo mínimo que el campo "Cantidad" de la UI
+CANTIDAD_MINIMA = 0.1
+# Cantidad escrita como texto: dígitos con a lo sumo un separador decimal
+PATRON_CANTIDAD = re.compile(r"(\d+)(?:[.,](\d+))?")
+
+
+@dataclass
+class ErrorFila:
+    """Fila de la planilla que no pudo convertirse en etiqueta."""
+
+    fila: int
+    mensaje: str
+
+
+def _normalizar_columna(nombre):
+    nombre = unicodedata.normalize("NFKD", str(nombre)).encode("ascii", "ignore").decode()
+    nombre = "_".join(nombre.strip().lower().split())
+    return ALIAS_COLUMNAS.get(nombre, nombre)
+
+
+def _vacio(valor):
+    if valor is None:
+        return True
+    if isinstance(valor, float) and math.isnan(valor):
+        return True
+    return isinstance(valor, str) and not valor.strip()
+
+
+def _numero(valor):
+    """Convierte una celda a float: los números se usan tal cual, el texto con las reglas de la UI."""
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        numero = float(valor)
+    else:
+        numero = parsear_precio(str(valor))
+    if not math.isfinite(numero):
+        raise ValueError
+    return numero
+
+
+def _cantidad(valor):
+    """Convierte una celda de cantidad a float.
+
+    A diferencia de los precios, "." no es separador de miles: "1.5" y "1,5"
+    son 1.5. Con tres decimales ("1.500", "2,250") no se sabe si el separador
+    es de miles o decimal, y se rechaza salvo que la parte entera sea 0.
+    """
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        numero = float(valor)
+        if not math.isfinite(numero):
+            raise ValueError
+        return numero
+    texto = str(valor).strip()
+    coincidencia = PATRON_CANTIDAD.fullmatch(texto)
+    if coincidencia is None:
+        raise ValueError
+    entera, decimales = coincidencia.groups()
+    if decimales is not None and len(decimales) == 3 and int(entera) != 0:
+        raise ValueError
+    return float(entera if decimales is None else f"{entera}.{decimales}")
+
+
+def _texto_codigo(valor):
+    """Texto del código de barras; los números de Excel llegan como int o float."""
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    return str(valor).strip()
+
+
+def _error_ean13(codigo):
+    return f"EAN-13 con dígito verificador incorrecto: {codigo} (debería terminar en {digito_verificador_ean13(codigo)})"
+
+
+def _codigo(valor):
+    codigo = _texto_codigo(valor)
+    simbologia = simbologia_para(codigo)
+    if simbologia == "ean13" and not validar_ean13(codigo):
+        raise ValueError(_error_ean13(codigo))
+    # Code 128 solo admite caracteres ASCII
+    modulos(simbologia, codigo)
+    return codigo
+
+
+def validar_fila(datos):
+    """Convierte un dict con las columnas normalizadas en un LabelSpec.
+
+    Lanza ValueError con un mensaje para el usuario si algún dato es inválido.
+    """
+    producto = datos.get("producto")
+    if _vacio(producto):
+        raise ValueError("Falta el nombre del producto")
+
+    precio = datos.get("precio_final")
+    if _vacio(precio):
+        raise ValueError("Falta el precio final")
+    try:
+        precio_final = _numero(precio)
+    except ValueError:
+        raise ValueError(f"Precio inválido: {precio!r}") from None
+    if precio_final < 0:
+        raise ValueError(f"Precio negativo: {precio!r}")
+
+    iva = "21%"
+    if "iva" in datos:
+        valor = "" if _vacio(datos["iva"]) else str(datos["iva"]).strip().lower().replace(" ", "")
+        if valor not in ALIAS_IVA:
+            raise ValueError(f"Alícuota de IVA inválida: {datos['iva']!r}")
+        iva = ALIAS_IVA[valor]
+
+    unidad = "Sin unidades"
+    if "unidad" in datos and not _vacio(datos["unidad"]):
+        valor = str(datos["unidad"]).strip().lower().rstrip(".")
+        if valor not in ALIAS_UNIDADES:
+            raise ValueError(f"Unidad inválida: {datos['unidad']!r}")
+        unidad = ALIAS_UNIDADES[valor]
+
+    cantidad = 1.0
+    if unidad != "Sin unidades":
+        valor = datos.get("cantidad")
+        if not _vacio(valor):
+            try:
+                cantidad = _cantidad(valor)
+            except ValueError:
+                raise ValueError(f"Cantidad inválida: {valor!r} (usar un decimal como 1,5)") from None
+            if cantidad < CANTIDAD_MINIMA:
+                raise ValueError(f"La cantidad debe ser al menos {CANTIDAD_MINIMA}")
+
+    codigo = ""
+    if "codigo" in datos and not _vacio(datos["codigo"]):
+        codigo = _codigo(datos["codigo"])
+
+    return LabelSpec(
+        producto=str(producto).strip(),
+        precio_final=precio_final,
+        iva=iva,
+        unidad=unidad,
+        cantidad=cantidad,
+        codigo=codigo,
+    )
+
+
+def validar_codigo(spec, plan=None):
+    """Lanza ValueError si el código de barras de `spec` no entra donde se va a dibujar.
+
+    Es el mismo control que se hace al dibujar: el ancho de la franja del
+    diseño clásico o de la zona de código de la plantilla (`plan`, o la de
+    `spec.plantilla` si no se pasa).
+    """
+    if plan is None and spec.plantilla:
+        plan = cargar_plantilla(spec.plantilla)
+    if plan is not None:
+        plan.validar(spec)
+    else:
+        codigo_etiqueta(spec)
+
+
+def _es_excel(archivo, nombre):
+    if nombre is None:
+        nombre = getattr(archivo, "name", archivo if isinstance(archivo, str) else "")
+    extension = os.path.splitext(str(nombre))[1].lower()
+    if extension == ".xls":
+        # pandas necesita xlrd para el formato viejo de Excel y no es una dependencia
+        raise ValueError("El formato .xls no está soportado: guardar la planilla como .xlsx o CSV")
+    return extension == ".xlsx"
+
+
+def leer_filas(archivo, nombre=None, chunksize=1000):
+    """Itera (número de fila, dict) de una planilla CSV o Excel.
+
+    Los CSV se leen por bloques de `chunksize` filas, con el separador
+    detectado automáticamente. El número de fila es el de la planilla
+    (la fila 1 es el encabezado).
+    """
+    if _es_excel(archivo, nombre):
+        bloques = [pd.read_excel(archivo, dtype=object)]
+    else:
+        bloques = pd.read_csv(
+            archivo, dtype=str, keep_default_na=False, sep=None, engine="python", chunksize=chunksize
+        )
+
+    fila = 2
+    for bloque in bloques:
+        bloque.columns = [_normalizar_columna(c) for c in bloque.columns]
+        faltantes = [c for c in COLUMNAS_OBLIGATORIAS if c not in bloque.columns]
+        if faltantes:
+            raise ValueError(f"Faltan columnas obligatorias: {', '.join(faltantes)}")
+        for registro in bloque.to_dict("records"):
+            yield fila, registro
+            fila += 1
+
+
+def _plan_estilo(estilo):
+    # Una plantilla inexistente es un error de todo el lote, no de cada fila
+    return cargar_plantilla(estilo["plantilla"]) if estilo.get("plantilla") else None
+
+
+def _spec_fila(datos, estilo, plan):
+    spec = validar_fila(datos)
+    if estilo:
+        spec = replace(spec, **estilo)
+    validar_codigo(spec, plan)
+    return spec
+
+
+def revisar_lista(archivo, nombre=None, chunksize=1000, **estilo):
+    """Valida la planilla completa sin dibujar y devuelve la lista de ErrorFila.
+
+    Los EAN-13 de cada bloque se validan juntos con `validar_ean13_lote`; el
+    resto de cada fila, con las mismas reglas que `leer_specs`. Lanza
+    ValueError si la planilla entera es inválida (faltan columnas, formato).
+    Para generar después hay que volver el archivo al principio.
+    """
+    plan = _plan_estilo(estilo)
+    errores = []
+    filas = leer_filas(archivo, nombre, chunksize)
+    while True:
+        bloque = list(itertools.islice(filas, chunksize))
+        if not bloque:
+            return errores
+        # Índice en el bloque -> EAN-13 a validar
+        codigos = {}
+        for i, (_, datos) in enumerate(bloque):
+            if not _vacio(datos.get("codigo")):
+                codigo = _texto_codigo(datos["codigo"])
+                if simbologia_para(codigo) == "ean13":
+                    codigos[i] = codigo
+        validos = dict(zip(codigos, validar_ean13_lote(codigos.values()))) if codigos else {}
+        for i, (fila, datos) in enumerate(bloque):
+            if not validos.get(i, True):
+                errores.append(ErrorFila(fila, _error_ean13(codigos[i])))
+                continue
+            try:
+                _spec_fila(datos, estilo, plan)
+            except ValueError as e:
+                errores.append(ErrorFila(fila, str(e)))
+
+
+def leer_specs(archivo, nombre=None, errores=None, chunksize=1000, **estilo):
+    """Genera un LabelSpec por cada fila válida de la planilla.
+
+    Las filas inválidas se omiten y, si se pasa la lista `errores`, se agregan
+    a ella como ErrorFila. `estilo` permite fijar colores y escala comunes a
+    todas las etiquetas (por ejemplo color_texto="#000000").
+    """
+    plan = _plan_estilo(estilo)
+    for fila, datos in leer_filas(archivo, nombre, chunksize):
+        try:
+            spec = _spec_fila(datos, estilo, plan)
+        except ValueError as e:
+            if errores is not None:
+                errores.append(ErrorFila(fila, str(e)))
+            continue
+        yield spec
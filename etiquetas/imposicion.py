@@ -0,0 +1,74 @@
+"""Imposición de etiquetas vectoriales en hojas A4 o Carta para imprimir.
+
+Dada una hoja (tamaño, márgenes y separación entre etiquetas) y el tamaño de
+cada etiqueta, calcula cuántas entran por página, cuántas páginas hacen falta
+y las dibuja en grilla con `vectorial.dibujar_etiqueta`. La fuente se incluye
+una sola vez y solo con los glifos usados, y la marca de agua es un único
+XObject compartido por todas las etiquetas del documento, así que una hoja de
+500 etiquetas sigue siendo chica.
+
+La geometría de la hoja (`Plancha`) es la misma de `hoja_pdf`. A diferencia
+de esa hoja de imágenes, que escribe cada etiqueta apenas la dibuja,
+reportlab arma el documento en memoria y lo escribe recién en `save()`: la
+memoria crece con la cantidad de páginas (alrededor de 1,5 MiB cada 1000
+etiquetas, porque cada etiqueta son unos pocos cientos de bytes de
+operaciones de dibujo). Se acepta porque el PDF vectorial es cientos de veces
+más chico que el de imágenes (0,6 MiB contra 130 MiB para 4000 etiquetas);
+para listas de cientos de miles conviene partirlas o usar `hoja_pdf`.
+"""
+
+from reportlab.pdfgen import canvas as rl_canvas
+
+from .hoja_pdf import A4, LETTER, Plancha
+from .lienzo import medir_lote
+from .plantillas import tamano_base
+from .render import _como_spec
+from .vectorial import dibujar_etiqueta
+
+HOJAS = {"A4": A4, "Carta": LETTER}
+
+
+def paginar(specs, por_pagina):
+    """Agrupa un iterable de especificaciones en listas de `por_pagina`."""
+    pagina = []
+    for spec in specs:
+        pagina.append(spec)
+        if len(pagina) == por_pagina:
+            yield pagina
+            pagina = []
+    if pagina:
+        yield pagina
+
+
+def imponer(specs, salida, plancha=Plancha(), progreso=None):
+    """Dibuja las etiquetas en grilla sobre tantas páginas como hagan falta.
+
+    `salida` es una ruta o un archivo binario. `progreso(pagina, etiquetas)`, si
+    se indica, se llama al terminar cada página. Devuelve la cantidad de
+    etiquetas dibujadas.
+    """
+    posiciones = plancha.posiciones()
+    # Cada plantilla puede tener otra proporción
+    encajes = {}
+
+    c = rl_canvas.Canvas(salida, pagesize=plancha.pagina, invariant=1, pageCompression=1)
+    cantidad = 0
+    numero = 0
+    with medir_lote("hoja_vectorial") as memoria:
+        for numero, pagina in enumerate(paginar(specs, plancha.por_pagina), start=1):
+            for spec, (x, y) in zip(pagina, posiciones):
+                spec = _como_spec(spec)
+                if spec.plantilla not in encajes:
+                    encajes[spec.plantilla] = plancha.encajar(tamano_base(spec))
+                dx, dy, ancho, _ = encajes[spec.plantilla]
+                dibujar_etiqueta(c, spec, x + dx, y + dy, ancho)
+            cantidad += len(pagina)
+            c.showPage()
+            if progreso is not None:
+                progreso(numero, cantidad)
+        if numero == 0:
+            # Un PDF necesita al menos una página
+            c.showPage()
+        c.save()
+        memoria.etiquetas = cantidad
+    return cantidad
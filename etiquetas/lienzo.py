@@ -0,0 +1,225 @@
+"""Dibujo de lotes grandes reutilizando el lienzo y el buffer de salida.
+
+`render_label` crea por etiqueta una imagen nueva, una copia redimensionada
+(aunque la escala sea 1) y un BytesIO para el PNG. En un lote de miles de
+etiquetas eso es memoria que se pide y se libera todo el tiempo. `Lienzo`
+mantiene una imagen por tamaño y un buffer de salida, y por etiqueta solo:
+
+- pega el fondo ya compuesto (las dos franjas), cacheado por colores;
+- dibuja los textos y el código de barras;
+- redibuja los bordes y pega la marca de agua encima, en el mismo orden que
+  el diseño clásico (un nombre largo puede llegar hasta el borde, y la marca
+  de agua semitransparente tiene que quedar sobre el texto para que el
+  resultado sea el mismo píxel a píxel);
+- codifica el PNG en el buffer reutilizado, con el nivel de compresión
+  elegido (0 a 9: menos CPU contra archivos más chicos).
+
+Con el nivel por defecto (6, el de zlib y PIL) los bytes son idénticos a los
+de `render.render_png`.
+
+`MemoriaPico` mide el pico de memoria residente de un lote; `medir_lote` lo
+publica en el log y en las métricas (`lote_memoria_pico_bytes`).
+"""
+
+import contextlib
+import io
+import logging
+import sys
+import threading
+from collections import OrderedDict
+
+from PIL import Image, ImageDraw
+
+from . import metricas
+from .metricas import etapa
+from .plantillas import cargar_plantilla
+from .render import ALTO, ANCHO, _como_spec, _dibujar, dibujar_fondo, escalar
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Nivel de compresión PNG por defecto: el mismo que usa PIL
+NIVEL_COMPRESION = 6
+# Fondos cacheados (uno por combinación de colores)
+MAX_FONDOS = 4
+
+
+class Lienzo:
+    """Renderer de lotes con lienzo y buffer reutilizados.
+
+    No es seguro entre hilos: usar uno por hilo (ver `lienzo_local`). La
+    imagen que devuelve `dibujar` es el propio lienzo y se sobrescribe en la
+    etiqueta siguiente.
+    """
+
+    def __init__(self, nivel_compresion=NIVEL_COMPRESION):
+        if not 0 <= nivel_compresion <= 9:
+            raise ValueError("El nivel de compresión PNG va de 0 a 9")
+        self.nivel_compresion = nivel_compresion
+        self._lienzos = {}
+        self._fondos = OrderedDict()
+        self._salida = io.BytesIO()
+
+    def _lienzo(self, tamano):
+        img = self._lienzos.get(tamano)
+        if img is None:
+            img = self._lienzos[tamano] = Image.new("RGB", tamano)
+        return img
+
+    def fondo(self, spec):
+        """Franjas de fondo con los colores de `spec` (compartido: no modificar)."""
+        clave = (spec.color_fondo_superior, spec.color_fondo_inferior)
+        img = self._fondos.get(clave)
+        if img is None:
+            img = Image.new("RGB", (ANCHO, ALTO), color=spec.color_fondo_superior)
+            dibujar_fondo(ImageDraw.Draw(img), spec)
+            self._fondos[clave] = img
+            if len(self._fondos) > MAX_FONDOS:
+                self._fondos.popitem(last=False)
+        else:
+            self._fondos.move_to_end(clave)
+        return img
+
+    def dibujar(self, spec):
+        """Etiqueta en tamaño base, dibujada sobre el lienzo reutilizado."""
+        spec = _como_spec(spec)
+        if spec.plantilla:
+            plan = cargar_plantilla(spec.plantilla)
+            return plan.dibujar(spec, lienzo=self._lienzo(plan.tamano))
+        img = self._lienzo((ANCHO, ALTO))
+        img.paste(self.fondo(spec))
+        return _dibujar(spec, img)
+
+    def render_label(self, spec):
+        """Etiqueta escalada; con escala 1 es el mismo lienzo, sin copiarlo."""
+        spec = _como_spec(spec)
+        img = self.dibujar(spec)
+        # Redimensionar siempre crea una imagen nueva: solo si hace falta
+        return img if spec.escala == 1 else escalar(img, spec.escala)
+
+    def png(self, spec):
+        """PNG de la etiqueta, codificado en el buffer reutilizado."""
+        img = self.render_label(spec)
+        salida = self._salida
+        # Sin truncar: achicar el BytesIO liberaría su memoria
+        salida.seek(0)
+        with etapa("png"):
+            img.save(salida, format="PNG", compress_level=self.nivel_compresion)
+        largo = salida.tell()
+        with salida.getbuffer() as datos:
+            return datos[:largo].tobytes()
+
+
+_locales = threading.local()
+
+
+def lienzo_local(nivel_compresion=NIVEL_COMPRESION):
+    """Lienzo del hilo actual para ese nivel de compresión (se crea la primera vez)."""
+    lienzos = getattr(_locales, "lienzos", None)
+    if lienzos is None:
+        lienzos = _locales.lienzos = {}
+    lienzo = lienzos.get(nivel_compresion)
+    if lienzo is None:
+        lienzo = lienzos[nivel_compresion] = Lienzo(nivel_compresion)
+    return lienzo
+
+
+def render_png(spec, nivel_compresion=NIVEL_COMPRESION):
+    """Como `render.render_png`, con el lienzo del hilo y el nivel de compresión indicado."""
+    return lienzo_local(nivel_compresion).png(spec)
+
+
+def _leer_status():
+    """VmRSS y VmHWM (pico) del proceso en bytes, desde /proc; None si no hay /proc."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            valores = dict(linea.split(":", 1) for linea in f if linea.startswith(("VmRSS", "VmHWM")))
+    except OSError:
+        return None
+    return {clave: int(valor.split()[0]) * 1024 for clave, valor in valores.items()}
+
+
+def _pico_rusage():
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KiB; macOS, bytes
+    return pico if sys.platform == "darwin" else pico * 1024
+
+
+class MemoriaPico:
+    """Pico de memoria residente (RSS) del proceso durante un bloque `with`.
+
+    En Linux el pico se reinicia al entrar (escribiendo 5 en
+    /proc/self/clear_refs), así que `pico` es el máximo dentro del bloque y
+    `reiniciado` queda en True. En otros sistemas es el máximo desde que
+    arrancó el proceso. `incremento` es cuánto subió el pico respecto de la
+    memoria al entrar. Si hay mediciones anidadas solo la exterior reinicia
+    el pico. Es por proceso: no incluye los workers de `paralelo`, y con
+    varios lotes a la vez en distintos hilos el pico es el de todos.
+    """
+
+    _activas = 0
+    _reiniciado = False
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self.inicial = None
+        self.pico = None
+        self.reiniciado = False
+        # Lo completa quien mide, para el informe
+        self.etiquetas = None
+
+    def __enter__(self):
+        with MemoriaPico._lock:
+            exterior = MemoriaPico._activas == 0
+            MemoriaPico._activas += 1
+            if exterior:
+                try:
+                    with open("/proc/self/clear_refs", "w", encoding="ascii") as f:
+                        f.write("5")
+                    MemoriaPico._reiniciado = True
+                except OSError:
+                    MemoriaPico._reiniciado = False
+            self.reiniciado = MemoriaPico._reiniciado
+        status = _leer_status()
+        self.inicial = status["VmRSS"] if status else _pico_rusage()
+        return self
+
+    def __exit__(self, *exc):
+        with MemoriaPico._lock:
+            MemoriaPico._activas -= 1
+        status = _leer_status()
+        self.pico = status["VmHWM"] if status and self.reiniciado else _pico_rusage()
+        return False
+
+    @property
+    def incremento(self):
+        if self.pico is None or self.inicial is None:
+            return None
+        return max(0, self.pico - self.inicial)
+
+    def __str__(self):
+        if self.pico is None:
+            return "pico de memoria no disponible"
+        desde = "" if self.reiniciado else " (desde el inicio del proceso)"
+        return f"pico de memoria {self.pico / 2**20:.1f} MiB{desde}, +{self.incremento / 2**20:.1f} MiB en el lote"
+
+
+@contextlib.contextmanager
+def medir_lote(tipo):
+    """Mide el pico de memoria de un lote y lo informa en el log y en las métricas.
+
+    Devuelve el MemoriaPico; quien llama puede fijar `memoria.etiquetas`.
+    """
+    with MemoriaPico() as memoria:
+        yield memoria
+    if memoria.pico is not None:
+        metricas.fijar("lote_memoria_pico_bytes", memoria.pico, lote=tipo)
+    if memoria.etiquetas is not None:
+        metricas.fijar("lote_etiquetas", memoria.etiquetas, lote=tipo)
+    logger.info("Lote %s de %s etiquetas: %s", tipo, memoria.etiquetas, memoria)
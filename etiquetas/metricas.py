@@ -0,0 +1,240 @@
+"""Métricas opcionales del camino de dibujo, en formato de texto de Prometheus.
+
+Registra un histograma de duración por etapa (carga de fuentes, corte de
+texto, dibujo, marca de agua, escalado, PNG y escritura de estadísticas),
+contadores de descargas por provincia y el pico de memoria del último lote de
+cada tipo. Las etapas pueden anidarse: "dibujo" incluye el corte de texto y la
+carga de fuentes que ocurran dentro.
+
+Desactivadas (lo normal), `etapa()` devuelve siempre el mismo contexto vacío y
+`contar()` retorna enseguida: el costo es una comparación por llamada.
+
+    from etiquetas import metricas
+    metricas.activar()
+    with metricas.etapa("png"):
+        ...
+    print(metricas.texto_prometheus())
+
+Las métricas son por proceso: los workers de `paralelo` no las reportan.
+"""
+
+import atexit
+import contextlib
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PREFIJO = "etiquetas"
+# Límites superiores de los buckets, en segundos
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+INTERVALO_VOLCADO = 15.0
+
+AYUDA = {
+    "etapa_segundos": "Duración de cada etapa del dibujo de etiquetas",
+    "descargas_total": "Etiquetas descargadas por provincia",
+    "lote_memoria_pico_bytes": "Pico de memoria residente del último lote, por tipo de lote",
+    "lote_etiquetas": "Etiquetas del último lote, por tipo de lote",
+}
+
+_NULO = contextlib.nullcontext()
+_activo = False
+
+
+class Histograma:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.cuentas = [0] * len(buckets)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        for i, limite in enumerate(self.buckets):
+            if valor <= limite:
+                self.cuentas[i] += 1
+                break
+        self.suma += valor
+        self.total += 1
+
+
+class Registro:
+    """Histogramas por etapa y contadores con etiquetas, seguros entre hilos."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._etapas = {}
+        self._contadores = {}
+        self._valores = {}
+
+    def observar(self, etapa, segundos):
+        with self._lock:
+            histograma = self._etapas.get(etapa)
+            if histograma is None:
+                histograma = self._etapas[etapa] = Histograma()
+            histograma.observar(segundos)
+
+    def contar(self, nombre, cantidad=1, **etiquetas):
+        clave = (nombre, tuple(sorted(etiquetas.items())))
+        with self._lock:
+            self._contadores[clave] = self._contadores.get(clave, 0) + cantidad
+
+    def fijar(self, nombre, valor, **etiquetas):
+        clave = (nombre, tuple(sorted(etiquetas.items())))
+        with self._lock:
+            self._valores[clave] = valor
+
+    def limpiar(self):
+        with self._lock:
+            self._etapas.clear()
+            self._contadores.clear()
+            self._valores.clear()
+
+    def texto_prometheus(self):
+        """Exposición en formato de texto de Prometheus (versión 0.0.4)."""
+        with self._lock:
+            etapas = {k: (list(h.cuentas), h.suma, h.total, h.buckets) for k, h in self._etapas.items()}
+            contadores = dict(self._contadores)
+            valores = dict(self._valores)
+
+        lineas = []
+        nombre = f"{PREFIJO}_etapa_segundos"
+        lineas += [f"# HELP {nombre} {AYUDA['etapa_segundos']}", f"# TYPE {nombre} histogram"]
+        for etapa in sorted(etapas):
+            cuentas, suma, total, buckets = etapas[etapa]
+            acumulado = 0
+            for limite, cuenta in zip(buckets, cuentas):
+                acumulado += cuenta
+                lineas.append(f'{nombre}_bucket{{etapa="{_escapar(etapa)}",le="{limite}"}} {acumulado}')
+            lineas.append(f'{nombre}_bucket{{etapa="{_escapar(etapa)}",le="+Inf"}} {total}')
+            lineas.append(f'{nombre}_sum{{etapa="{_escapar(etapa)}"}} {suma!r}')
+            lineas.append(f'{nombre}_count{{etapa="{_escapar(etapa)}"}} {total}')
+
+        for tipo, series in (("counter", contadores), ("gauge", valores)):
+            por_nombre = {}
+            for (metrica, etiquetas), valor in series.items():
+                por_nombre.setdefault(metrica, []).append((etiquetas, valor))
+            for metrica in sorted(por_nombre):
+                nombre = f"{PREFIJO}_{metrica}"
+                if metrica in AYUDA:
+                    lineas.append(f"# HELP {nombre} {AYUDA[metrica]}")
+                lineas.append(f"# TYPE {nombre} {tipo}")
+                for etiquetas, valor in sorted(por_nombre[metrica]):
+                    texto = ",".join(f'{k}="{_escapar(v)}"' for k, v in etiquetas)
+                    lineas.append(f"{nombre}{{{texto}}} {valor}" if texto else f"{nombre} {valor}")
+        return "\n".join(lineas) + "\n"
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+REGISTRO = Registro()
+
+
+class _Cronometro:
+    __slots__ = ("nombre", "inicio")
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        REGISTRO.observar(self.nombre, time.perf_counter() - self.inicio)
+        return False
+
+
+def activar(activo=True):
+    global _activo
+    _activo = activo
+
+
+def activas():
+    return _activo
+
+
+def etapa(nombre):
+    """Contexto que mide la duración de una etapa (no hace nada si las métricas están desactivadas)."""
+    if not _activo:
+        return _NULO
+    return _Cronometro(nombre)
+
+
+def contar(nombre, cantidad=1, **etiquetas):
+    """Incrementa el contador `nombre` con esas etiquetas (p. ej. provincia="Salta")."""
+    if _activo:
+        REGISTRO.contar(nombre, cantidad, **etiquetas)
+
+
+def fijar(nombre, valor, **etiquetas):
+    """Fija el valor actual de `nombre` (un gauge), p. ej. el pico de memoria del último lote."""
+    if _activo:
+        REGISTRO.fijar(nombre, valor, **etiquetas)
+
+
+def texto_prometheus():
+    return REGISTRO.texto_prometheus()
+
+
+def volcar(path):
+    """Escribe las métricas en `path` de forma atómica (para el textfile collector de node_exporter)."""
+    directorio = os.path.dirname(os.path.abspath(path))
+    fd, temporal = tempfile.mkstemp(dir=directorio, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(texto_prometheus())
+    os.replace(temporal, path)
+
+
+def volcar_periodicamente(path, intervalo=INTERVALO_VOLCADO):
+    """Vuelca las métricas a `path` cada `intervalo` segundos en un hilo de fondo, y al salir."""
+
+    def bucle():
+        while True:
+            time.sleep(intervalo)
+            volcar(path)
+
+    threading.Thread(target=bucle, name="volcado-metricas", daemon=True).start()
+    atexit.register(volcar, path)
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        cuerpo = texto_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+
+def servir(puerto, host="127.0.0.1"):
+    """Expone GET /metrics en un hilo de fondo y devuelve el servidor."""
+    servidor = ThreadingHTTPServer((host, puerto), _Manejador)
+    threading.Thread(target=servidor.serve_forever, name="servidor-metricas", daemon=True).start()
+    return servidor
+
+
+def configurar_desde_entorno(entorno=os.environ):
+    """Activa las métricas según ETIQUETAS_METRICAS_PUERTO y/o ETIQUETAS_METRICAS_ARCHIVO.
+
+    Devuelve True si quedaron activas.
+    """
+    puerto = entorno.get("ETIQUETAS_METRICAS_PUERTO")
+    archivo = entorno.get("ETIQUETAS_METRICAS_ARCHIVO")
+    if not puerto and not archivo:
+        return False
+    activar()
+    if puerto:
+        servir(int(puerto))
+    if archivo:
+        volcar_periodicamente(archivo)
+    return True
@@ -0,0 +1,102 @@
+"""Render de lotes grandes de etiquetas en varios procesos.
+
+El dibujo y la codificación PNG con PIL usan CPU; con un solo proceso se usa
+un solo núcleo. `render_paralelo` reparte las especificaciones en bloques
+entre un pool de procesos, cada uno con sus fuentes y su marca de agua ya
+cargadas, y devuelve los resultados a medida que terminan.
+
+    for indice, png in render_paralelo(specs, workers=16):
+        ...
+"""
+
+import itertools
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from .assets import get_font, get_marca_agua
+from .lienzo import NIVEL_COMPRESION, render_png
+from .render import FUENTE, MARCA_AGUA, _como_spec
+from .vectorial import render_pdf
+
+TAMANO_BLOQUE = 64
+# Bloques en vuelo por worker: acota la memoria si el consumidor es más lento
+BLOQUES_POR_WORKER = 2
+
+# Formato de salida -> función que recibe un LabelSpec y devuelve bytes.
+# Los PNG se dibujan con el lienzo reutilizado de cada proceso (ver `lienzo`)
+FORMATOS = {
+    "png": render_png,
+    "pdf": render_pdf,
+}
+
+
+def _calentar():
+    """Carga en el proceso las fuentes y la marca de agua que usa toda etiqueta."""
+    for tamano in (45, 24, 16):
+        get_font(FUENTE, tamano)
+    get_marca_agua(MARCA_AGUA, 720, 270, 9)
+
+
+def _render_bloque(bloque, formato, nivel_compresion=NIVEL_COMPRESION):
+    if formato == "png":
+        return [(indice, render_png(spec, nivel_compresion)) for indice, spec in bloque]
+    render = FORMATOS[formato]
+    return [(indice, render(spec)) for indice, spec in bloque]
+
+
+def _bloques(specs, tamano):
+    numeradas = ((i, _como_spec(spec)) for i, spec in enumerate(specs))
+    while True:
+        bloque = list(itertools.islice(numeradas, tamano))
+        if not bloque:
+            return
+        yield bloque
+
+
+def render_paralelo(
+    specs, workers=None, formato="png", tamano_bloque=TAMANO_BLOQUE, ordenado=True, nivel_compresion=NIVEL_COMPRESION
+):
+    """Genera (índice, bytes) por cada especificación de `specs`.
+
+    `specs` puede ser cualquier iterable (se consume de a bloques). Con
+    `ordenado=True` los resultados salen en el orden de entrada; si no, a
+    medida que cada bloque termina. Con `workers=1` se dibuja en el proceso
+    actual, sin pool. `nivel_compresion` (0 a 9) es el de los PNG.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato desconocido: {formato}")
+    workers = workers or os.cpu_count() or 1
+    bloques = _bloques(specs, tamano_bloque)
+
+    if workers == 1:
+        _calentar()
+        for bloque in bloques:
+            yield from _render_bloque(bloque, formato, nivel_compresion)
+        return
+
+    maximo_en_vuelo = workers * BLOQUES_POR_WORKER
+    with ProcessPoolExecutor(max_workers=workers, initializer=_calentar) as pool:
+        pendientes = []
+        for bloque in itertools.islice(bloques, maximo_en_vuelo):
+            pendientes.append(pool.submit(_render_bloque, bloque, formato, nivel_compresion))
+
+        try:
+            while pendientes:
+                if ordenado:
+                    listos = [pendientes.pop(0)]
+                else:
+                    terminados, _ = wait(pendientes, return_when=FIRST_COMPLETED)
+                    listos = [f for f in pendientes if f in terminados]
+                    pendientes = [f for f in pendientes if f not in terminados]
+
+                for futuro in listos:
+                    resultados = futuro.result()
+                    # Reponer un bloque por cada uno que termina
+                    siguiente = next(bloques, None)
+                    if siguiente is not None:
+                        pendientes.append(pool.submit(_render_bloque, siguiente, formato, nivel_compresion))
+                    yield from resultados
+        finally:
+            # Si el consumidor corta antes, no dibujar los bloques que faltan
+            for futuro in pendientes:
+                futuro.cancel()
@@ -0,0 +1,510 @@
+"""Plantillas declarativas de etiquetas (JSON o YAML) compiladas a planes de dibujo.
+
+Una plantilla define el tamaño base, las franjas de color, los textos (con
+fuente de Fuentes/, tamaño, posición y campos como {precio_final}), la zona
+del código de barras, los bordes y la marca de agua. Los colores son "#RRGGBB"
+o el nombre de un campo de color de LabelSpec (p. ej. "color_fondo_inferior").
+
+    plan = cargar_plantilla("gondola")
+    img = plan.render(LabelSpec(producto="Yerba 1kg", precio_final=4599.9))
+
+La plantilla se compila una sola vez por archivo (se recompila si cambia): las
+fuentes quedan cargadas, los campos de cada texto ya extraídos y los textos
+fijos guardados como máscaras. Cada plan además cachea su capa estática
+(fondo, franjas y textos fijos) por combinación de colores, así que dibujar una
+etiqueta solo agrega los textos con datos, el código, los bordes y la marca
+de agua.
+
+`plantillas/estandar.json` reproduce, píxel a píxel, el diseño clásico de
+`render.render_label`.
+"""
+
+import hashlib
+import json
+import os
+import string
+import threading
+from dataclasses import dataclass, field, fields, replace
+from functools import lru_cache
+
+from PIL import Image, ImageDraw
+
+from .assets import BASE_DIR, FUENTES_DIR, get_font, get_marca_agua
+from .codigos import imagen_codigo
+from .precios import calcular_precios, formatear_precio
+from .render import ALTO, ANCHO, LabelSpec, _como_spec, codigo_etiqueta, escalar
+from .texto import INTERLINEADO, ajustar, medidor
+
+PLANTILLAS_DIR = os.path.join(BASE_DIR, "plantillas")
+EXTENSIONES = (".json", ".yaml", ".yml")
+
+# Campos que pueden usarse entre llaves en los textos
+CAMPOS = ("producto", "precio_final", "precio_sin_iva", "precio_por_cantidad", "iva", "unidad", "cantidad", "codigo")
+COLORES = tuple(f.name for f in fields(LabelSpec) if f.name.startswith("color_"))
+ALINEACIONES = {"izquierda": "la", "centro": "ma", "derecha": "ra"}
+
+MAX_PLANTILLAS = 32
+# Capas estáticas por plan (una por combinación de colores)
+MAX_CAPAS = 16
+
+
+def _color(valor, donde):
+    if isinstance(valor, str) and (valor in COLORES or (valor.startswith("#") and len(valor) == 7)):
+        return valor
+    raise ValueError(f"{donde}: color inválido {valor!r} (usar #RRGGBB o uno de {', '.join(COLORES)})")
+
+
+def _resolver_color(valor, spec):
+    return getattr(spec, valor) if valor in COLORES else valor
+
+
+def _caja(valor, donde):
+    if not isinstance(valor, (list, tuple)) or len(valor) != 4:
+        raise ValueError(f"{donde}: 'caja' debe ser [x0, y0, x1, y1]")
+    return tuple(int(v) for v in valor)
+
+
+def _par(valor, donde, nombre):
+    if not isinstance(valor, (list, tuple)) or len(valor) != 2:
+        raise ValueError(f"{donde}: '{nombre}' debe ser [x, y]")
+    return tuple(int(v) for v in valor)
+
+
+def _fuente(relativa, donde):
+    path = os.path.join(FUENTES_DIR, relativa)
+    if not os.path.isfile(path):
+        raise ValueError(f"{donde}: no existe la fuente {relativa!r} en Fuentes/")
+    return path
+
+
+def _mascara(tamano, dibujar):
+    """Máscara de cobertura recortada a la zona con tinta, como (máscara, (x, y)), o None."""
+    mascara = Image.new("L", tamano, 0)
+    dibujar(ImageDraw.Draw(mascara))
+    caja = mascara.getbbox()
+    if caja is None:
+        return None
+    return mascara.crop(caja), caja[:2]
+
+
+@dataclass(frozen=True)
+class Rectangulo:
+    caja: tuple
+    color: str
+
+
+@dataclass(frozen=True)
+class Borde:
+    caja: tuple
+    ancho: int
+    color: str
+
+
+@dataclass(frozen=True)
+class Texto:
+    """Texto ya compilado: fuente resuelta y campos extraídos del formato."""
+
+    formato: str
+    campos: tuple
+    pos: tuple
+    path: str
+    tamano: int
+    color: str
+    alineacion: str = "izquierda"
+    mayusculas: bool = False
+    # Con `ancho` el texto se corta en líneas (o, con `una_linea`, se achica
+    # para entrar). Con `tamano_minimo` se achica hasta entrar en ancho x alto:
+    # siempre, o solo si la etiqueta pide ajustar_texto ("opcional")
+    ancho: int = None
+    alto: int = None
+    tamano_minimo: int = None
+    ajustar: str = "opcional"
+    una_linea: bool = False
+    # Distancia entre líneas como factor del tamaño; sin él, el espaciado clásico
+    interlineado: float = None
+    unidades: tuple = None
+    mascara: tuple = field(default=None, compare=False)
+
+    @property
+    def fijo(self):
+        """Igual en todas las etiquetas: va en la capa estática."""
+        return not self.campos and self.unidades is None
+
+    @property
+    def ancla(self):
+        return ALINEACIONES[self.alineacion]
+
+    def contenido(self, valores):
+        texto = self.formato.format_map(valores) if self.campos else self.formato.format()
+        return texto.upper() if self.mayusculas else texto
+
+    def _entra(self, texto, tamano):
+        if self.una_linea:
+            return get_font(self.path, tamano).getlength(texto) <= self.ancho
+        m = medidor(get_font(self.path, tamano))
+        lineas = m.cortar(texto, self.ancho)
+        if "" in lineas or any(m.ancho(l) > self.ancho for l in lineas):
+            return False
+        return self.alto is None or len(lineas) * round(tamano * self.interlineado) <= self.alto
+
+    def tamano_para(self, spec, texto):
+        if self.tamano_minimo is None or self.ancho is None:
+            return self.tamano
+        if self.ajustar == "opcional" and not spec.ajustar_texto:
+            return self.tamano
+        if self.interlineado is None and not self.una_linea:
+            # Mismo criterio que el diseño clásico
+            return ajustar(texto, self.path, self.tamano, self.ancho, self.alto, self.tamano_minimo).tamano
+        for tamano in range(self.tamano, self.tamano_minimo, -1):
+            if self._entra(texto, tamano):
+                return tamano
+        return self.tamano_minimo
+
+    def lineas(self, texto, tamano):
+        """Líneas a dibujar como lista de ((x, y), línea)."""
+        if self.ancho is None or self.una_linea:
+            return [(self.pos, texto)]
+        medidas = medidor(get_font(self.path, tamano))
+        x, y = self.pos
+        resultado = []
+        for i, linea in enumerate(medidas.cortar(texto, self.ancho)):
+            if self.interlineado is None:
+                # Espaciado clásico: cada línea se corre según su propio alto
+                resultado.append(((x, y + i * (medidas.alto(linea) + INTERLINEADO)), linea))
+            else:
+                resultado.append(((x, y + i * round(tamano * self.interlineado)), linea))
+        return resultado
+
+    def dibujar(self, draw, texto, tamano, fill):
+        font = get_font(self.path, tamano)
+        for xy, linea in self.lineas(texto, tamano):
+            draw.text(xy, linea, fill=fill, font=font, anchor=self.ancla)
+
+
+@dataclass(frozen=True)
+class ZonaCodigo:
+    pos: tuple
+    ancho: int
+    alto_barras: float
+    texto: bool = True
+    alineacion: str = "izquierda"
+
+    def ubicar(self, spec):
+        """(simbología, datos, módulo, x, y) del código de `spec`, o None si no lleva."""
+        codigo = codigo_etiqueta(spec, self.ancho, self.alto_barras, self.texto)
+        if codigo is None:
+            return None
+        simbologia, datos, modulo = codigo
+        x, y = self.pos
+        if self.alineacion != "izquierda":
+            libre = self.ancho - imagen_codigo(simbologia, datos, modulo, self.alto_barras, self.texto).width
+            x += libre // 2 if self.alineacion == "centro" else libre
+        return simbologia, datos, modulo, x, y
+
+
+@dataclass(frozen=True)
+class MarcaAgua:
+    imagen: str
+    tamano: tuple
+    alpha: int
+    margen: tuple
+
+
+class PlanEtiqueta:
+    """Plantilla compilada: todo lo que no depende de la etiqueta ya está resuelto."""
+
+    def __init__(self, nombre, titulo, tamano, fondo, rectangulos, textos, codigo, bordes, marca_agua, huella):
+        self.nombre = nombre
+        self.titulo = titulo
+        self.tamano = tamano
+        self.fondo = fondo
+        self.rectangulos = rectangulos
+        self.textos = textos
+        self.codigo = codigo
+        self.bordes = bordes
+        self.marca_agua = marca_agua
+        # Hash del contenido de la plantilla, para invalidar cachés si cambia
+        self.huella = huella
+        self._capas = {}
+        self._lock = threading.Lock()
+
+    def normalizar_producto(self, producto):
+        """Forma canónica de `producto` para el hash: solo cambia lo que no altera el dibujo.
+
+        Va en mayúsculas si todos los textos que lo usan son `mayusculas`, y con
+        los espacios colapsados si todos se cortan en líneas (el corte separa
+        por palabras); si no, queda tal cual.
+        """
+        textos = [t for t in self.textos if "producto" in t.campos]
+        if all(t.mayusculas for t in textos):
+            producto = producto.upper()
+        if all(t.ancho is not None and not t.una_linea for t in textos):
+            producto = " ".join(producto.split())
+        return producto
+
+    @property
+    def ancho(self):
+        return self.tamano[0]
+
+    @property
+    def alto(self):
+        return self.tamano[1]
+
+    def _colores_estaticos(self, spec):
+        colores = [self.fondo] + [r.color for r in self.rectangulos] + [t.color for t in self.textos if t.fijo]
+        return tuple(_resolver_color(c, spec) for c in colores)
+
+    def capa_estatica(self, spec):
+        """Fondo, franjas y textos fijos con los colores de `spec` (compartida: no modificar)."""
+        clave = self._colores_estaticos(spec)
+        with self._lock:
+            capa = self._capas.get(clave)
+        if capa is not None:
+            return capa
+
+        img = Image.new("RGB", self.tamano, color=_resolver_color(self.fondo, spec))
+        draw = ImageDraw.Draw(img)
+        for r in self.rectangulos:
+            draw.rectangle(r.caja, fill=_resolver_color(r.color, spec))
+        for t in self.textos:
+            if t.fijo and t.mascara is not None:
+                mascara, (x, y) = t.mascara
+                img.paste(_resolver_color(t.color, spec), (x, y, x + mascara.width, y + mascara.height), mascara)
+
+        with self._lock:
+            if len(self._capas) >= MAX_CAPAS:
+                self._capas.clear()
+            self._capas[clave] = img
+        return img
+
+    def valores(self, spec):
+        """Valores de los campos de texto para `spec`, ya formateados."""
+        precios = calcular_precios(spec.precio_final, spec.iva, spec.unidad, spec.cantidad)
+        final, sin_iva, por_cantidad = (formatear_precio(p) for p in precios)
+        return {
+            "producto": spec.producto,
+            "precio_final": final,
+            "precio_sin_iva": sin_iva,
+            "precio_por_cantidad": por_cantidad,
+            "iva": spec.iva,
+            "unidad": spec.unidad,
+            "cantidad": f"{spec.cantidad:g}",
+            "codigo": str(spec.codigo).strip(),
+        }
+
+    def textos_variables(self, spec):
+        """Textos con datos que lleva `spec`, como lista de (Texto, contenido, tamaño)."""
+        valores = self.valores(spec)
+        resultado = []
+        for t in self.textos:
+            if t.fijo or (t.unidades is not None and spec.unidad not in t.unidades):
+                continue
+            contenido = t.contenido(valores)
+            resultado.append((t, contenido, t.tamano_para(spec, contenido)))
+        return resultado
+
+    def validar(self, spec):
+        """Lanza ValueError si la etiqueta no puede dibujarse con esta plantilla (p. ej. el código no entra)."""
+        if self.codigo is not None:
+            self.codigo.ubicar(_como_spec(spec))
+
+    def dibujar(self, spec, lienzo=None):
+        """Etiqueta en el tamaño base de la plantilla, sin escalar.
+
+        Con `lienzo` (una imagen RGB del tamaño de la plantilla) se dibuja
+        sobre ella en lugar de copiar la capa estática.
+        """
+        spec = _como_spec(spec)
+        if lienzo is None:
+            img = self.capa_estatica(spec).copy()
+        else:
+            img = lienzo
+            img.paste(self.capa_estatica(spec))
+        draw = ImageDraw.Draw(img)
+        for t, contenido, tamano in self.textos_variables(spec):
+            t.dibujar(draw, contenido, tamano, _resolver_color(t.color, spec))
+        if self.codigo is not None:
+            ubicacion = self.codigo.ubicar(spec)
+            if ubicacion is not None:
+                simbologia, datos, modulo, x, y = ubicacion
+                img.paste(imagen_codigo(simbologia, datos, modulo, self.codigo.alto_barras, self.codigo.texto), (x, y))
+        for b in self.bordes:
+            draw.rectangle(b.caja, outline=_resolver_color(b.color, spec), width=b.ancho)
+        if self.marca_agua is not None:
+            m = self.marca_agua
+            marca = get_marca_agua(os.path.join(BASE_DIR, m.imagen), m.tamano[0], m.tamano[1], m.alpha)
+            img.paste(marca, (img.width - marca.width - m.margen[0], img.height - marca.height - m.margen[1]), marca)
+        return img
+
+    def render(self, spec):
+        """Etiqueta dibujada y escalada según `spec.escala`."""
+        spec = _como_spec(spec)
+        return escalar(self.dibujar(spec), spec.escala)
+
+
+def _compilar_texto(datos, fuente_base, donde):
+    if "texto" not in datos or "pos" not in datos or "tamano" not in datos:
+        raise ValueError(f"{donde}: cada texto necesita 'texto', 'pos' y 'tamano'")
+    formato = str(datos["texto"])
+    try:
+        campos = tuple(nombre for _, nombre, _, _ in string.Formatter().parse(formato) if nombre is not None)
+    except ValueError as e:
+        raise ValueError(f"{donde}: formato inválido {formato!r} ({e})") from None
+    desconocidos = [c for c in campos if c not in CAMPOS]
+    if desconocidos:
+        raise ValueError(f"{donde}: campos desconocidos {', '.join(desconocidos)} (disponibles: {', '.join(CAMPOS)})")
+    alineacion = datos.get("alineacion", "izquierda")
+    if alineacion not in ALINEACIONES:
+        raise ValueError(f"{donde}: alineacion debe ser una de {', '.join(ALINEACIONES)}")
+    una_linea = bool(datos.get("una_linea", False))
+    if "ancho" in datos and not una_linea and alineacion != "izquierda":
+        raise ValueError(f"{donde}: los textos de varias líneas se alinean a la izquierda")
+    ajuste = datos.get("ajustar", "opcional")
+    if ajuste not in ("opcional", "siempre"):
+        raise ValueError(f"{donde}: ajustar debe ser 'opcional' o 'siempre'")
+    unidades = datos.get("unidades")
+
+    texto = Texto(
+        formato=formato,
+        campos=campos,
+        pos=_par(datos["pos"], donde, "pos"),
+        path=_fuente(datos.get("fuente", fuente_base), donde),
+        tamano=int(datos["tamano"]),
+        color=_color(datos.get("color", "color_texto"), donde),
+        alineacion=alineacion,
+        mayusculas=bool(datos.get("mayusculas", False)),
+        ancho=int(datos["ancho"]) if "ancho" in datos else None,
+        alto=int(datos["alto"]) if "alto" in datos else None,
+        tamano_minimo=int(datos["tamano_minimo"]) if "tamano_minimo" in datos else None,
+        ajustar=ajuste,
+        una_linea=una_linea,
+        interlineado=float(datos["interlineado"]) if "interlineado" in datos else None,
+        unidades=tuple(unidades) if unidades is not None else None,
+    )
+    # Carga la fuente ahora (falla acá si el archivo no es una fuente válida)
+    get_font(texto.path, texto.tamano)
+    return texto
+
+
+def compilar(datos, nombre="plantilla", huella=""):
+    """Compila el dict de una plantilla en un PlanEtiqueta. Lanza ValueError si es inválida."""
+    if not isinstance(datos, dict):
+        raise ValueError(f"{nombre}: la plantilla debe ser un objeto")
+    if "tamano" not in datos:
+        raise ValueError(f"{nombre}: falta 'tamano'")
+    tamano = _par(datos["tamano"], nombre, "tamano")
+    fuente_base = datos.get("fuente", "Inter/Inter-Medium.ttf")
+
+    rectangulos = tuple(
+        Rectangulo(_caja(r.get("caja"), f"{nombre}: rectangulos[{i}]"), _color(r.get("color"), f"{nombre}: rectangulos[{i}]"))
+        for i, r in enumerate(datos.get("rectangulos", []))
+    )
+    bordes = tuple(
+        Borde(
+            _caja(b.get("caja"), f"{nombre}: bordes[{i}]"),
+            int(b.get("ancho", 1)),
+            _color(b.get("color", "color_borde_interior"), f"{nombre}: bordes[{i}]"),
+        )
+        for i, b in enumerate(datos.get("bordes", []))
+    )
+
+    textos = []
+    for i, t in enumerate(datos.get("textos", [])):
+        texto = _compilar_texto(t, fuente_base, f"{nombre}: textos[{i}]")
+        if texto.fijo:
+            # Los textos fijos se dibujan una sola vez como máscara, sin color
+            mascara = _mascara(tamano, lambda d, texto=texto: texto.dibujar(d, texto.contenido({}), texto.tamano, 255))
+            texto = replace(texto, mascara=mascara)
+        textos.append(texto)
+
+    codigo = None
+    if datos.get("codigo"):
+        c = datos["codigo"]
+        donde = f"{nombre}: codigo"
+        if c.get("alineacion", "izquierda") not in ALINEACIONES:
+            raise ValueError(f"{donde}: alineacion debe ser una de {', '.join(ALINEACIONES)}")
+        codigo = ZonaCodigo(
+            pos=_par(c.get("pos"), donde, "pos"),
+            ancho=int(c.get("ancho", tamano[0])),
+            alto_barras=float(c.get("alto_barras", 6.5)),
+            texto=bool(c.get("texto", True)),
+            alineacion=c.get("alineacion", "izquierda"),
+        )
+
+    marca_agua = None
+    if datos.get("marca_agua"):
+        m = datos["marca_agua"]
+        donde = f"{nombre}: marca_agua"
+        if not os.path.isfile(os.path.join(BASE_DIR, m.get("imagen", ""))):
+            raise ValueError(f"{donde}: no existe la imagen {m.get('imagen')!r}")
+        marca_agua = MarcaAgua(
+            imagen=m["imagen"],
+            tamano=_par(m.get("tamano"), donde, "tamano"),
+            alpha=int(m.get("alpha", 255)),
+            margen=_par(m.get("margen", [0, 0]), donde, "margen"),
+        )
+
+    return PlanEtiqueta(
+        nombre=nombre,
+        titulo=datos.get("titulo", nombre),
+        tamano=tamano,
+        fondo=_color(datos.get("fondo", "color_fondo_superior"), f"{nombre}: fondo"),
+        rectangulos=rectangulos,
+        textos=tuple(textos),
+        codigo=codigo,
+        bordes=bordes,
+        marca_agua=marca_agua,
+        huella=huella,
+    )
+
+
+def ruta_plantilla(nombre):
+    """Ruta del archivo de la plantilla: un nombre de plantillas/ ("gondola") o una ruta."""
+    if os.path.isfile(nombre):
+        return os.path.abspath(nombre)
+    for extension in EXTENSIONES:
+        path = os.path.join(PLANTILLAS_DIR, nombre + extension)
+        if os.path.isfile(path):
+            return path
+    raise ValueError(f"No existe la plantilla {nombre!r}")
+
+
+def leer_plantilla(path):
+    """Lee el archivo JSON o YAML de una plantilla y devuelve (dict, bytes originales)."""
+    with open(path, "rb") as f:
+        contenido = f.read()
+    if path.lower().endswith((".yaml", ".yml")):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError("Para usar plantillas YAML hay que instalar PyYAML") from None
+        return yaml.safe_load(contenido), contenido
+    return json.loads(contenido), contenido
+
+
+@lru_cache(maxsize=MAX_PLANTILLAS)
+def _compilar_archivo(path, modificado):
+    datos, contenido = leer_plantilla(path)
+    nombre = os.path.splitext(os.path.basename(path))[0]
+    return compilar(datos, nombre, hashlib.sha256(contenido).hexdigest())
+
+
+def cargar_plantilla(nombre):
+    """Plan compilado de la plantilla `nombre`; se compila una vez por versión del archivo."""
+    path = ruta_plantilla(nombre)
+    return _compilar_archivo(path, os.stat(path).st_mtime_ns)
+
+
+def listar_plantillas(directorio=PLANTILLAS_DIR):
+    """Nombres de las plantillas incluidas, ordenados."""
+    return sorted(
+        os.path.splitext(archivo)[0] for archivo in os.listdir(directorio) if archivo.lower().endswith(EXTENSIONES)
+    )
+
+
+def tamano_base(spec):
+    """Tamaño (ancho, alto) de la etiqueta sin escalar, según su plantilla."""
+    spec = _como_spec(spec)
+    if spec.plantilla:
+        return cargar_plantilla(spec.plantilla).tamano
+    return ANCHO, ALTO
@@ -0,0 +1,41 @@
+"""Cálculo y formato de precios según la alícuota de IVA (Ley N° 23.349)."""
+
+# Opciones tal como se muestran en los selectores de la UI
+IVAS = ["21%", "10.5%", "Exento"]
+UNIDADES = ["Sin unidades", "Kilogramos", "Litros"]
+
+
+def procesar_precio(texto):
+    """Normaliza un precio ingresado como "$1.234,50" al formato "1234.50"."""
+    texto = texto.strip()
+    return texto.replace("$", "").replace(".", "").replace(",,", ",").replace(",", ".")
+
+
+def parsear_precio(texto):
+    """Devuelve el precio como float; lanza ValueError si el texto no es un número válido."""
+    return float(procesar_precio(texto))
+
+
+def calcular_precios(precio_final, iva, unidad="Sin unidades", cantidad=1.0):
+    """Devuelve (precio final, precio sin IVA, precio por unidad de medida)."""
+    # Calcular precio sin IVA
+    if iva == "21%":
+        precio_sin_iva = precio_final / 1.21
+    elif iva == "10.5%":
+        precio_sin_iva = precio_final / 1.105
+    else:  # Exento
+        precio_sin_iva = precio_final
+
+    # SI TIENE KG O L
+    if unidad != "Sin unidades":
+        precio_cantidad = precio_final / cantidad
+    else:
+        precio_cantidad = 0
+
+    return precio_final, precio_sin_iva, precio_cantidad
+
+
+def formatear_precio(valor):
+    """Formatea un número al estilo es-AR: 1234567.5 -> "1.234.567,50"."""
+    texto = '{:,.2f}'.format(valor).replace(',', ' ')
+    return texto.replace(".", ",").replace(" ", ".")
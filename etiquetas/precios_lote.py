@@ -0,0 +1,114 @@
+"""Cálculo de precios por columnas para listas completas.
+
+Equivale a aplicar `calcular_precios` y `formatear_precio` fila por fila,
+pero con operaciones de NumPy sobre todo el catálogo de una vez.
+"""
+
+import numpy as np
+
+from .precios import formatear_precio
+
+_ESPACIO, _COMA, _PUNTO, _CERO, _MENOS = (ord(c) for c in " ,.0-")
+
+# Por encima de este valor los centavos ya no son exactos en float64
+_MAXIMO_EXACTO = 1e13
+
+
+def calcular_precios_lote(precio_final, iva="21%", unidad="Sin unidades", cantidad=1.0):
+    """Calcula precio sin IVA y precio por unidad de medida para muchos productos.
+
+    Acepta arrays de NumPy, Series o escalares (que se repiten para todas las
+    filas). Devuelve (precio_final, precio_sin_iva, precio_cantidad) como arrays
+    float64, con los mismos resultados que `calcular_precios`.
+    """
+    precio_final = np.asarray(precio_final, dtype=np.float64)
+    iva = np.asarray(iva)
+    unidad = np.asarray(unidad)
+    cantidad = np.asarray(cantidad, dtype=np.float64)
+
+    precio_sin_iva = np.select(
+        [iva == "21%", iva == "10.5%"],
+        [precio_final / 1.21, precio_final / 1.105],
+        default=precio_final,
+    )
+    con_unidad = np.broadcast_to(unidad != "Sin unidades", precio_final.shape)
+    precio_cantidad = np.zeros_like(precio_final)
+    np.divide(precio_final, cantidad, out=precio_cantidad, where=con_unidad)
+    return precio_final, np.broadcast_to(precio_sin_iva, precio_final.shape), precio_cantidad
+
+
+def formatear_precios(valores):
+    """Formatea un array de números al estilo es-AR, igual que `formatear_precio`.
+
+    Los dígitos se arman en una matriz de bytes en lugar de formatear cada
+    valor en Python. Los pocos valores donde el redondeo a centavos es ambiguo
+    en float64 (empates en ,xx5), los no finitos y los muy grandes se formatean
+    con `formatear_precio` para que el resultado sea idéntico.
+    Devuelve un array de objetos str.
+    """
+    valores = np.asarray(valores, dtype=np.float64).ravel()
+    n = len(valores)
+    with np.errstate(invalid="ignore"):
+        escalado = np.abs(valores) * 100
+        fraccion = escalado - np.floor(escalado)
+        dudoso = ~np.isfinite(valores) | (np.abs(valores) >= _MAXIMO_EXACTO) | (np.abs(fraccion - 0.5) < 1e-6)
+    centavos = np.where(dudoso, 0, np.rint(escalado)).astype(np.int64)
+    enteros = centavos // 100
+
+    digitos = len(str(int(enteros.max()))) if n else 1
+    # signo + dígitos + separadores de miles + ",dd"
+    ancho = 1 + digitos + (digitos - 1) // 3 + 3
+    buf = np.full((n, ancho), _ESPACIO, dtype=np.uint8)
+    buf[:, ancho - 3] = _COMA
+    buf[:, ancho - 2] = _CERO + (centavos // 10) % 10
+    buf[:, ancho - 1] = _CERO + centavos % 10
+
+    # Dígitos enteros de derecha a izquierda, con un punto cada tres
+    fin = ancho - 4
+    cantidad_digitos = np.ones(n, dtype=np.int64)
+    potencia = 1
+    for k in range(digitos):
+        columna = fin - k - k // 3
+        if k:
+            presente = enteros >= potencia
+            cantidad_digitos += presente
+            if k % 3 == 0:
+                buf[:, columna + 1] = np.where(presente, _PUNTO, _ESPACIO)
+            buf[:, columna] = np.where(presente, _CERO + (enteros // potencia) % 10, _ESPACIO)
+        else:
+            buf[:, columna] = _CERO + enteros % 10
+        potencia *= 10
+
+    # El formato original conserva el signo incluso en "-0,00"
+    negativo = np.signbit(valores) & ~dudoso
+    if negativo.any():
+        previos = cantidad_digitos[negativo] - 1
+        buf[np.flatnonzero(negativo), fin - previos - previos // 3 - 1] = _MENOS
+
+    textos = np.char.lstrip(buf.view(f"S{ancho}").ravel()).astype(str).astype(object)
+    for i in np.flatnonzero(dudoso):
+        textos[i] = formatear_precio(valores[i])
+    return textos
+
+
+def precios_lista(df):
+    """Agrega a una lista de precios las columnas calculadas y formateadas.
+
+    `df` debe tener la columna `precio_final` y puede tener `iva`, `unidad` y
+    `cantidad` (con los valores de la UI: "21%", "Kilogramos", etc.). Devuelve
+    un DataFrame nuevo con precio_sin_iva, precio_cantidad y las columnas de
+    texto precio_final_texto, precio_sin_iva_texto y precio_cantidad_texto.
+    """
+    precio_final, precio_sin_iva, precio_cantidad = calcular_precios_lote(
+        df["precio_final"].to_numpy(dtype=np.float64),
+        df["iva"].to_numpy() if "iva" in df else "21%",
+        df["unidad"].to_numpy() if "unidad" in df else "Sin unidades",
+        df["cantidad"].to_numpy(dtype=np.float64) if "cantidad" in df else 1.0,
+    )
+    return df.assign(
+        precio_sin_iva=precio_sin_iva,
+        precio_cantidad=precio_cantidad,
+        precio_final_texto=formatear_precios(precio_final),
+        precio_sin_iva_texto=formatear_precios(precio_sin_iva),
+        precio_cantidad_texto=formatear_precios(precio_cantidad),
+    )
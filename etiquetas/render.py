@@ -0,0 +1,235 @@
+"""Dibujo de etiquetas con PIL, sin dependencias de Streamlit.
+
+Uso:
+    from etiquetas import LabelSpec, render_label
+    img = render_label(LabelSpec(producto="Yerba 1kg", precio_final=4599.9))
+"""
+
+import io
+import os
+from dataclasses import asdict, dataclass, fields
+
+from PIL import Image, ImageDraw
+
+from .assets import BASE_DIR, FUENTES_DIR, get_font, get_marca_agua
+from .codigos import imagen_codigo, simbolo, simbologia_para
+from .metricas import etapa
+from .precios import calcular_precios, formatear_precio
+from .texto import INTERLINEADO, MedidorTexto, ajustar, medidor
+
+# Rutas relativas a la raíz del repositorio, para poder importar desde cualquier directorio
+FUENTE = os.path.join(FUENTES_DIR, "Inter", "Inter-Medium.ttf")
+MARCA_AGUA = os.path.join(BASE_DIR, "imgs", "CAME_baja-solo.jpg")
+
+# Tamaño base de la etiqueta (antes de aplicar la escala)
+ANCHO = 720
+ALTO = 300
+
+# Columna del nombre del producto: desde y=33 hasta la franja inferior (y=190)
+ANCHO_PRODUCTO = 235
+ALTO_PRODUCTO = 190 - (25 + 8)
+TAMANO_PRODUCTO = 24
+TAMANO_PRODUCTO_MINIMO = 12
+
+# Código de barras en la franja inferior, alineado con el nombre del producto
+X_CODIGO = 30
+Y_CODIGO = 196
+ANCHO_CODIGO = 690 - X_CODIGO
+ALTO_BARRAS = 6.5
+# Ancho de módulo en mm: se usa el primero con el que el código entra en la franja
+MODULOS_CODIGO = (0.2, 0.1)
+
+
+@dataclass(frozen=True)
+class LabelSpec:
+    """Datos necesarios para dibujar una etiqueta."""
+
+    producto: str
+    precio_final: float
+    iva: str = "21%"
+    unidad: str = "Sin unidades"
+    cantidad: float = 1.0
+    color_texto: str = "#000000"
+    color_fondo_superior: str = "#F5F5F5"
+    color_fondo_inferior: str = "#FFFFFF"
+    color_borde_interior: str = "#000000"
+    color_borde_exterior: str = "#FFFFFF"
+    escala: float = 1.0
+    ajustar_texto: bool = False
+    codigo: str = ""
+    # Vacía: EAN-13 si el código son 13 dígitos, Code 128 si no
+    simbologia: str = ""
+    # Vacía: el diseño clásico de este módulo; si no, una plantilla de `plantillas`
+    plantilla: str = ""
+
+    @classmethod
+    def from_dict(cls, datos):
+        """Crea una especificación a partir de un dict, ignorando claves desconocidas."""
+        nombres = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in datos.items() if k in nombres})
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def _como_spec(spec):
+    if isinstance(spec, LabelSpec):
+        return spec
+    return LabelSpec.from_dict(spec)
+
+
+def draw_wrapped_text(draw= None, text= None, font= None, max_width = 235, x = 30, y = 25+8, fill = None):
+    # Las medidas de palabras y líneas se cachean por fuente
+    medidas = medidor(font) or MedidorTexto(font)
+    lines = medidas.cortar(text, max_width)
+
+    # Dibujar las líneas en la imagen
+    for i, l in enumerate(lines):
+        line_height = medidas.alto(l)
+        draw.text((x, y + i * (line_height + INTERLINEADO)), l, font=font, fill=fill)
+
+
+def texto_producto(spec):
+    """Nombre del producto tal como se dibuja y tamaño de fuente a usar.
+
+    Con `ajustar_texto` la fuente se achica hasta que el nombre entra en la columna.
+    """
+    texto = spec.producto.upper()
+    if not spec.ajustar_texto:
+        return texto, TAMANO_PRODUCTO
+    medida = ajustar(texto, FUENTE, TAMANO_PRODUCTO, ANCHO_PRODUCTO, ALTO_PRODUCTO, TAMANO_PRODUCTO_MINIMO)
+    return texto, medida.tamano
+
+
+def textos_precios(spec):
+    """Textos de la columna de precios como lista de ((x, y), texto, tamaño de fuente)."""
+    precios = calcular_precios(spec.precio_final, spec.iva, spec.unidad, spec.cantidad)
+    lista_variables = [formatear_precio(p) for p in precios]
+
+    textos = [
+        ((320, 25 + 8), "Precio final al consumidor", 16),
+        ((320, 48 + 8), f"${lista_variables[0]}", 45),
+        ((320, 109 + 8), f"Precio sin impuestos nacionales (IVA) ${lista_variables[1]}", 16),
+    ]
+    if spec.unidad == "Kilogramos":
+        textos.append(((320, 130 + 8), f"Precio al consumidor por kilogramo ${lista_variables[2]}", 16))
+    elif spec.unidad == "Litros":
+        textos.append(((320, 130 + 8), f"Precio al consumidor por litro ${lista_variables[2]}", 16))
+    return textos
+
+
+def codigo_etiqueta(spec, ancho=ANCHO_CODIGO, alto_barras=ALTO_BARRAS, write_text=True):
+    """Parámetros del código de barras como (simbología, datos, ancho de módulo), o None si no lleva.
+
+    Lanza ValueError si el código es inválido o no entra en `ancho` píxeles.
+    """
+    datos = str(spec.codigo).strip()
+    if not datos:
+        return None
+    simbologia = spec.simbologia or simbologia_para(datos)
+    for modulo in MODULOS_CODIGO:
+        if simbolo(simbologia, datos, modulo, alto_barras, write_text).ancho <= ancho:
+            return simbologia, datos, modulo
+    raise ValueError(f"El código {datos!r} es demasiado largo para la etiqueta")
+
+
+def pegar_codigo(img, spec):
+    """Pega el código de barras (si la etiqueta tiene uno) en la franja inferior."""
+    codigo = codigo_etiqueta(spec)
+    if codigo is not None:
+        simbologia, datos, modulo = codigo
+        img.paste(imagen_codigo(simbologia, datos, modulo, ALTO_BARRAS), (X_CODIGO, Y_CODIGO))
+
+
+def dibujar_fondo(draw, spec):
+    """Fondo inferior sobre una imagen ya creada con el color del fondo superior."""
+    draw.rectangle([0, 190, 720, 300], fill=spec.color_fondo_inferior)
+
+
+def dibujar_bordes(draw, spec):
+    # Dibujar borde exterior
+    draw.rectangle([0, 0, 719, 299], outline=spec.color_borde_exterior, width=10)
+    # Dibujar borde interior
+    draw.rectangle([10, 10, 709, 289], outline=spec.color_borde_interior, width=2)
+
+
+def pegar_marca_agua(img):
+    """Pega la marca de agua (transparencia 9 de 255) abajo a la derecha."""
+    with etapa("marca_agua"):
+        marca_agua = get_marca_agua(MARCA_AGUA, 720, 270, 9)
+        pos_x = img.width - marca_agua.width - 10
+        pos_y = img.height - marca_agua.height - 10
+        img.paste(marca_agua, (pos_x, pos_y), marca_agua)
+
+
+def _dibujar(spec, img=None):
+    """Dibuja la etiqueta en su tamaño base (720x300), sin escalar.
+
+    Con `img` (una imagen RGB de 720x300 que ya tiene las dos franjas de
+    fondo) dibuja sobre ella en lugar de crear una nueva.
+    """
+    with etapa("dibujo"):
+        if img is None:
+            # Crear imagen
+            img = Image.new("RGB", (ANCHO, ALTO), color=spec.color_fondo_superior)
+            draw = ImageDraw.Draw(img)
+            dibujar_fondo(draw, spec)
+        else:
+            draw = ImageDraw.Draw(img)
+
+        # Dibujar texto
+        producto, tamano = texto_producto(spec)
+        draw_wrapped_text(draw, producto, get_font(FUENTE, tamano), fill=spec.color_texto)
+        for xy, texto, tamano in textos_precios(spec):
+            draw.text(xy, texto, fill=spec.color_texto, font=get_font(FUENTE, tamano))
+        pegar_codigo(img, spec)
+
+        dibujar_bordes(draw, spec)
+    pegar_marca_agua(img)
+    return img
+
+
+def escalar(img, escala):
+    """Redimensiona la etiqueta según el factor de escala elegido."""
+    nuevo_ancho = int(img.width * escala)
+    nuevo_alto = int(img.height * escala)
+    with etapa("escalado"):
+        return img.resize((nuevo_ancho, nuevo_alto))
+
+
+def tamano_escalado(escala):
+    """Tamaño (ancho, alto) final de una etiqueta con la escala dada."""
+    return int(ANCHO * escala), int(ALTO * escala)
+
+
+def png_bytes(img):
+    """Codifica la imagen como PNG y devuelve los bytes."""
+    buf = io.BytesIO()
+    with etapa("png"):
+        img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def render_label(spec):
+    """Dibuja una etiqueta y la devuelve como imagen PIL ya escalada.
+
+    `spec` puede ser un LabelSpec o un dict con los mismos campos.
+    """
+    spec = _como_spec(spec)
+    if spec.plantilla:
+        # plantillas importa este módulo
+        from .plantillas import cargar_plantilla
+
+        return cargar_plantilla(spec.plantilla).render(spec)
+    return escalar(_dibujar(spec), spec.escala)
+
+
+def render_png(spec):
+    """Dibuja una etiqueta y la devuelve codificada como PNG."""
+    return png_bytes(render_label(spec))
+
+
+def render_labels(specs):
+    """Generador que dibuja una etiqueta por cada especificación, de a una por vez."""
+    for spec in specs:
+        yield render_label(spec)
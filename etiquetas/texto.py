@@ -0,0 +1,195 @@
+"""Medición y corte de líneas de texto con medidas cacheadas por fuente.
+
+El corte original medía con `draw.textbbox` cada prefijo candidato de la línea
+(O(palabras²) en caracteres medidos) y después volvía a medir cada línea
+final. Acá cada palabra se mide una sola vez por fuente y el ancho de una
+línea se calcula sumando avances:
+
+    ancho = avances de las palabras previas + espacios + borde derecho de la
+            última palabra - borde izquierdo de la primera
+
+Cuando el ancho calculado queda a menos de `_TOLERANCIA` píxeles del máximo,
+la decisión se confirma midiendo la línea real, así que los cortes son
+siempre los mismos que los del algoritmo original. El alto de cada línea
+también sale de las cajas de sus palabras.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+
+from .assets import MAX_FUENTES, get_font
+from .metricas import etapa
+
+# Modo de fuente que usa ImageDraw sobre imágenes RGB y L
+_MODO = "L"
+_TOLERANCIA = 1.0
+# Separación extra entre líneas, en píxeles
+INTERLINEADO = 9
+
+MAX_PALABRAS = 20000
+MAX_LINEAS = 5000
+
+
+class _Memo:
+    """Diccionario acotado (LRU) para medidas."""
+
+    def __init__(self, maximo):
+        self.maximo = maximo
+        self._datos = OrderedDict()
+
+    def obtener(self, clave, calcular):
+        valor = self._datos.get(clave)
+        if valor is None:
+            valor = calcular()
+            self._datos[clave] = valor
+            if len(self._datos) > self.maximo:
+                self._datos.popitem(last=False)
+        return valor
+
+
+class MedidorTexto:
+    """Medidas cacheadas de palabras y líneas para una fuente."""
+
+    def __init__(self, font):
+        self.font = font
+        self._lock = threading.Lock()
+        self._palabras = _Memo(MAX_PALABRAS)
+        self._lineas = _Memo(MAX_LINEAS)
+        self.espacio = font.getlength(" ", _MODO)
+
+    def palabra(self, palabra):
+        """(avance, izquierda, arriba, derecha, abajo) de una palabra."""
+        with self._lock:
+            return self._palabras.obtener(palabra, lambda: self._medir_palabra(palabra))
+
+    def _medir_palabra(self, palabra):
+        return (self.font.getlength(palabra, _MODO),) + tuple(self.font.getbbox(palabra, _MODO))
+
+    def caja_real(self, linea):
+        """Caja medida por FreeType, igual a `draw.textbbox((0, 0), linea, font)`."""
+        with self._lock:
+            return self._lineas.obtener(linea, lambda: tuple(self.font.getbbox(linea, _MODO)))
+
+    def caja(self, linea):
+        """Caja de la línea calculada a partir de las medidas de sus palabras."""
+        palabras = linea.split(" ")
+        if not linea or any(not p for p in palabras):
+            # Línea vacía o con espacios repetidos: medirla directamente
+            return self.caja_real(linea)
+        medidas = [self.palabra(p) for p in palabras]
+        avance = sum(m[0] for m in medidas[:-1]) + self.espacio * (len(medidas) - 1)
+        return (
+            medidas[0][1],
+            min(m[2] for m in medidas),
+            int(avance + medidas[-1][3]),
+            max(m[4] for m in medidas),
+        )
+
+    def ancho(self, linea):
+        caja = self.caja(linea)
+        return caja[2] - caja[0]
+
+    def alto(self, linea):
+        caja = self.caja(linea)
+        return caja[3] - caja[1]
+
+    def cortar(self, texto, max_width):
+        """Corta `texto` en líneas de hasta `max_width` píxeles, como `draw_wrapped_text`.
+
+        Una palabra más ancha que `max_width` queda sola en su línea; si es la
+        primera, el resultado empieza con una línea vacía, igual que el original.
+        """
+        with etapa("corte_texto"):
+            return self._cortar(texto, max_width)
+
+    def _cortar(self, texto, max_width):
+        lines = []
+        line = []
+        avance = 0.0  # desde el origen de la línea hasta donde empezaría la próxima palabra
+        izquierda = 0
+        for word in texto.split():
+            avance_palabra, izq, _, der, _ = self.palabra(word)
+            ancho = avance + der - izquierda if line else der - izq
+            if abs(ancho - max_width) <= _TOLERANCIA:
+                caja = self.caja_real(" ".join(line + [word]))
+                ancho = caja[2] - caja[0]
+
+            if ancho <= max_width:
+                if not line:
+                    izquierda = izq
+                line.append(word)
+                avance += avance_palabra + self.espacio
+            else:
+                lines.append(" ".join(line))
+                line = [word]
+                avance = avance_palabra + self.espacio
+                izquierda = izq
+        if line:
+            lines.append(" ".join(line))
+        return lines
+
+
+@lru_cache(maxsize=MAX_FUENTES)
+def _medidor(path, size):
+    return MedidorTexto(get_font(path, size))
+
+
+def medidor(font):
+    """Medidor compartido para una fuente TrueType, o None si la fuente no tiene archivo."""
+    path = getattr(font, "path", None)
+    if not isinstance(path, str):
+        return None
+    return _medidor(path, font.size)
+
+
+@dataclass(frozen=True)
+class MedidaTexto:
+    """Resultado de medir un texto sin dibujarlo."""
+
+    lineas: tuple
+    tamano: int
+    ancho: int
+    alto: int
+    entra: bool
+
+
+def medir(texto, path, tamano, max_width, max_alto=None):
+    """Mide cómo quedaría `texto` cortado en líneas, sin dibujar nada.
+
+    `alto` es la distancia desde la `y` donde se dibuja hasta el último píxel
+    con tinta. `entra` es False si alguna palabra no entra en `max_width` o si
+    `alto` supera `max_alto` (cuando se indica).
+    """
+    m = _medidor(path, tamano)
+    lineas = m.cortar(texto, max_width)
+    anchos = [m.ancho(l) for l in lineas]
+    # Cada línea se dibuja en y + i * (alto de esa línea + INTERLINEADO)
+    alto = max((i * (m.alto(l) + INTERLINEADO) + m.caja(l)[3] for i, l in enumerate(lineas)), default=0)
+    entra = all(a <= max_width for a in anchos) and "" not in lineas
+    if max_alto is not None:
+        entra = entra and alto <= max_alto
+    return MedidaTexto(tuple(lineas), tamano, max(anchos, default=0), alto, entra)
+
+
+def ajustar(texto, path, tamano, max_width, max_alto=None, tamano_minimo=10):
+    """Busca el mayor tamaño de fuente, desde `tamano` hasta `tamano_minimo`, con el que el texto entra.
+
+    Si no entra ni con el mínimo, devuelve la medida con `tamano_minimo`.
+    """
+    medida = None
+    for t in range(tamano, tamano_minimo - 1, -1):
+        medida = medir(texto, path, t, max_width, max_alto)
+        if medida.entra:
+            return medida
+    return medida
+
+
+def validar_textos(textos, path, tamano, max_width, max_alto=None):
+    """Devuelve (índice, MedidaTexto) de los textos que no entran, sin rasterizar nada."""
+    return [
+        (i, medida)
+        for i, medida in enumerate(medir(t, path, tamano, max_width, max_alto) for t in textos)
+        if not medida.entra
+    ]
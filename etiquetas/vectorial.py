@@ -0,0 +1,228 @@
+"""Etiquetas en PDF vectorial con reportlab.
+
+Dibuja el mismo diseño que `render.render_label` (franjas de fondo, nombre
+del producto, líneas de precio, código de barras, bordes y marca de agua)
+pero con texto y formas vectoriales: el archivo es chico y se imprime nítido
+a cualquier tamaño, sin pasar por `img.resize`.
+
+Las etiquetas con plantilla se dibujan a partir del mismo plan compilado que
+usa la versión PNG (`plantillas.PlanEtiqueta`).
+
+Las coordenadas del diseño están en píxeles de la etiqueta de 720x300 con el
+origen arriba a la izquierda; acá se convierten a puntos PDF (origen abajo a
+la izquierda). El corte de líneas usa las mismas medidas que la versión PNG,
+así que el nombre del producto se corta igual en los dos formatos.
+"""
+
+import io
+import os
+from functools import lru_cache
+
+from PIL import Image
+from reportlab.lib.colors import HexColor
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas as rl_canvas
+
+from .assets import BASE_DIR, get_font
+from .codigos import FUENTE_CODIGO, SEPARACION_TEXTO, TAMANO_TEXTO, simbolo
+from .render import (
+    ALTO,
+    ALTO_BARRAS,
+    ANCHO,
+    FUENTE,
+    MARCA_AGUA,
+    X_CODIGO,
+    Y_CODIGO,
+    _como_spec,
+    codigo_etiqueta,
+    texto_producto,
+    textos_precios,
+)
+from .plantillas import _resolver_color, cargar_plantilla, tamano_base
+from .texto import INTERLINEADO, medidor
+
+# Misma transparencia que la versión PNG (9 de 255)
+ALPHA_MARCA_AGUA = 9 / 255
+FORMA_MARCA_AGUA = "marca_agua"
+
+
+@lru_cache(maxsize=None)
+def registrar_fuente(path):
+    """Registra una fuente TrueType en reportlab una sola vez y devuelve su nombre.
+
+    reportlab incluye en el PDF solo los glifos usados (subconjunto).
+    """
+    nombre = os.path.splitext(os.path.basename(path))[0]
+    pdfmetrics.registerFont(TTFont(nombre, path))
+    return nombre
+
+
+@lru_cache(maxsize=8)
+def _marca_agua_jpeg(path=MARCA_AGUA):
+    """JPEG de la marca de agua sin metadatos.
+
+    El archivo original pesa casi 600 KB, casi todo en perfiles de color y
+    datos EXIF; la imagen en sí es de 300x112 y el visor PDF la escala.
+    """
+    with Image.open(path) as original:
+        buf = io.BytesIO()
+        original.convert("RGB").save(buf, format="JPEG", quality=90)
+    return buf.getvalue()
+
+
+def _forma_marca_agua(c, path=MARCA_AGUA, ancho=720, alto=270):
+    """Define una sola vez por documento la marca de agua como XObject reutilizable."""
+    nombre = FORMA_MARCA_AGUA
+    if (path, ancho, alto) != (MARCA_AGUA, 720, 270):
+        nombre = f"{FORMA_MARCA_AGUA}_{os.path.splitext(os.path.basename(path))[0]}_{ancho}x{alto}"
+    if not c.hasForm(nombre):
+        c.beginForm(nombre, 0, 0, ancho, alto)
+        c.drawImage(ImageReader(io.BytesIO(_marca_agua_jpeg(path))), 0, 0, width=ancho, height=alto)
+        c.endForm()
+    return nombre
+
+
+def _dibujar_simbolo(c, s, izquierda, arriba):
+    """Dibuja el símbolo `s` con rectángulos vectoriales desde su esquina superior izquierda."""
+    c.setFillColor(HexColor("#FFFFFF"))
+    c.rect(izquierda, arriba - s.alto, s.ancho, s.alto, stroke=0, fill=1)
+    c.setFillColor(HexColor("#000000"))
+    for x, ancho in s.barras():
+        c.rect(izquierda + x, arriba - s.alto_barras, ancho, s.alto_barras, stroke=0, fill=1)
+    if s.texto:
+        ascendente = get_font(FUENTE_CODIGO, TAMANO_TEXTO).getmetrics()[0]
+        c.setFont(registrar_fuente(FUENTE_CODIGO), TAMANO_TEXTO)
+        linea_base = arriba - (s.alto_barras + SEPARACION_TEXTO + ascendente)
+        c.drawCentredString(izquierda + s.ancho / 2, linea_base, s.texto)
+
+
+def _dibujar_codigo(c, spec):
+    """Código de barras con rectángulos vectoriales, en la misma posición que en el PNG."""
+    codigo = codigo_etiqueta(spec)
+    if codigo is None:
+        return
+    _dibujar_simbolo(c, simbolo(*codigo, ALTO_BARRAS), X_CODIGO, ALTO - Y_CODIGO)
+
+
+def _dibujar_plan(c, plan, spec):
+    """Etiqueta de una plantilla, en píxeles de su tamaño base con y hacia arriba."""
+    ancho, alto = plan.tamano
+    c.setFillColor(HexColor(_resolver_color(plan.fondo, spec)))
+    c.rect(0, 0, ancho, alto, stroke=0, fill=1)
+    for r in plan.rectangulos:
+        x0, y0, x1, y1 = r.caja
+        c.setFillColor(HexColor(_resolver_color(r.color, spec)))
+        # En PIL la caja incluye el último píxel
+        c.rect(x0, alto - (y1 + 1), x1 + 1 - x0, y1 + 1 - y0, stroke=0, fill=1)
+
+    valores = plan.valores(spec)
+    textos = [(t, t.contenido(valores), t.tamano) for t in plan.textos if t.fijo]
+    for t, contenido, tamano in textos + plan.textos_variables(spec):
+        c.setFillColor(HexColor(_resolver_color(t.color, spec)))
+        c.setFont(registrar_fuente(t.path), tamano)
+        ascendente = get_font(t.path, tamano).getmetrics()[0]
+        escribir = {"izquierda": c.drawString, "centro": c.drawCentredString, "derecha": c.drawRightString}[
+            t.alineacion
+        ]
+        for (x, y), linea in t.lineas(contenido, tamano):
+            escribir(x, alto - (y + ascendente), linea)
+
+    if plan.codigo is not None:
+        ubicacion = plan.codigo.ubicar(spec)
+        if ubicacion is not None:
+            simbologia, datos, modulo, x, y = ubicacion
+            _dibujar_simbolo(c, simbolo(simbologia, datos, modulo, plan.codigo.alto_barras, plan.codigo.texto), x, alto - y)
+
+    for b in plan.bordes:
+        x0, y0, x1, y1 = b.caja
+        c.setStrokeColor(HexColor(_resolver_color(b.color, spec)))
+        c.setLineWidth(b.ancho)
+        # PIL dibuja el borde hacia adentro de la caja; el trazo PDF queda centrado
+        c.rect(x0 + b.ancho / 2, alto - (y1 + 1) + b.ancho / 2, x1 + 1 - x0 - b.ancho, y1 + 1 - y0 - b.ancho, stroke=1, fill=0)
+
+    if plan.marca_agua is not None:
+        m = plan.marca_agua
+        forma = _forma_marca_agua(c, os.path.join(BASE_DIR, m.imagen), *m.tamano)
+        c.setFillAlpha(m.alpha / 255)
+        c.translate(ancho - m.tamano[0] - m.margen[0], m.margen[1])
+        c.doForm(forma)
+
+
+def dibujar_etiqueta(c, spec, x=0, y=0, ancho=None):
+    """Dibuja la etiqueta en el canvas `c` con su esquina inferior izquierda en (x, y).
+
+    `ancho` está en puntos (por defecto, 1 px = 1 pt); el alto sale de la
+    proporción de la etiqueta (720x300 o el tamaño de su plantilla).
+    """
+    spec = _como_spec(spec)
+    if spec.plantilla:
+        plan = cargar_plantilla(spec.plantilla)
+        c.saveState()
+        c.translate(x, y)
+        factor = (ancho or plan.ancho) / plan.ancho
+        c.scale(factor, factor)
+        _dibujar_plan(c, plan, spec)
+        c.restoreState()
+        return
+    ancho = ancho or ANCHO
+    nombre_fuente = registrar_fuente(FUENTE)
+
+    c.saveState()
+    c.translate(x, y)
+    factor = ancho / ANCHO
+    c.scale(factor, factor)
+    # A partir de acá se trabaja en píxeles de la etiqueta, con y hacia arriba
+
+    # Fondo superior y franja inferior (y de 190 a 300 en la imagen)
+    c.setFillColor(HexColor(spec.color_fondo_superior))
+    c.rect(0, 0, ANCHO, ALTO, stroke=0, fill=1)
+    c.setFillColor(HexColor(spec.color_fondo_inferior))
+    c.rect(0, 0, ANCHO, ALTO - 190, stroke=0, fill=1)
+
+    # Texto: en PIL (x, y) es la esquina superior del ascendente; en PDF, la línea de base
+    c.setFillColor(HexColor(spec.color_texto))
+
+    def texto(xy, contenido, tamano):
+        ascendente = get_font(FUENTE, tamano).getmetrics()[0]
+        c.setFont(nombre_fuente, tamano)
+        c.drawString(xy[0], ALTO - (xy[1] + ascendente), contenido)
+
+    producto, tamano = texto_producto(spec)
+    medidas = medidor(get_font(FUENTE, tamano))
+    for i, linea in enumerate(medidas.cortar(producto, 235)):
+        texto((30, 25 + 8 + i * (medidas.alto(linea) + INTERLINEADO)), linea, tamano)
+    for xy, contenido, tamano_precio in textos_precios(spec):
+        texto(xy, contenido, tamano_precio)
+    _dibujar_codigo(c, spec)
+
+    # Bordes: el trazo PDF queda centrado en el rectángulo, por eso el margen es la mitad del ancho
+    c.setStrokeColor(HexColor(spec.color_borde_exterior))
+    c.setLineWidth(10)
+    c.rect(5, 5, ANCHO - 10, ALTO - 10, stroke=1, fill=0)
+    c.setStrokeColor(HexColor(spec.color_borde_interior))
+    c.setLineWidth(2)
+    c.rect(11, 11, ANCHO - 22, ALTO - 22, stroke=1, fill=0)
+
+    # Marca de agua de 720x270, 10 px arriba del borde inferior y corrida 10 px a la izquierda
+    forma = _forma_marca_agua(c)
+    # La transparencia va en la página: la forma hereda el estado gráfico
+    c.setFillAlpha(ALPHA_MARCA_AGUA)
+    c.translate(-10, 10)
+    c.doForm(forma)
+    c.restoreState()
+
+
+def render_pdf(spec):
+    """PDF de una página con la etiqueta, del tamaño de la etiqueta escalada (1 px = 1 pt)."""
+    spec = _como_spec(spec)
+    ancho_base, alto_base = tamano_base(spec)
+    ancho, alto = ancho_base * spec.escala, alto_base * spec.escala
+    buf = io.BytesIO()
+    # invariant=1: el mismo spec produce siempre los mismos bytes (útil para cachés y ETag)
+    c = rl_canvas.Canvas(buf, pagesize=(ancho, alto), invariant=1, pageCompression=1)
+    dibujar_etiqueta(c, spec, 0, 0, ancho)
+    c.showPage()
+    c.save()
+    return buf.getvalue()
@@ -0,0 +1,570 @@
+"""Verificación de que los caminos rápidos dibujan y calculan lo mismo que el código original.
+
+Congela el comportamiento actual en tres niveles:
+
+- precios: `procesar_precio`, el cálculo de IVA y el formato es-AR se
+  comparan contra copias literales del código original de la app, con
+  entradas generadas al azar (textos con "$", puntos y comas, empates en
+  ,xx5, negativos, valores enormes, NaN);
+- lote: `precios_lote` (NumPy) contra `calcular_precios`/`formatear_precio`
+  fila por fila, con listas generadas de distintos tamaños;
+- dibujo: las etiquetas de `referencias/` (imágenes de referencia generadas
+  con el dibujo original) se comparan con una diferencia perceptual
+  tolerante al suavizado, y para etiquetas generadas al azar (incluidos
+  nombres largos que se cortan en varias líneas) `RenderCapas`, el
+  `Lienzo` de lotes, la plantilla "estandar" y la caché deben dar
+  exactamente los mismos píxeles que `render_label`;
+- PDF: `vectorial.render_pdf` y la hoja de `imposicion.imponer` se
+  rasterizan con PyMuPDF (si está instalado) y se comparan con las mismas
+  imágenes de referencia. PIL ajusta los glifos a la grilla de píxeles y
+  MuPDF no, así que las líneas largas se corren uno o dos píxeles: la
+  comparación es más gruesa (`TOLERANCIA_VECTORIAL`) y detecta elementos
+  faltantes, movidos o con otro color, no un dígito distinto (los textos
+  salen de las mismas funciones que el PNG, que sí se compara exacto).
+  También se controla la cantidad de páginas y de etiquetas de una hoja;
+- caché: dos etiquetas con el mismo `spec_hash` (el nombre en otras
+  mayúsculas o con otros espacios) tienen que dibujarse igual, también con
+  una plantilla que respeta el nombre tal cual.
+
+Uso:
+    python -m etiquetas.verificacion
+    python -m etiquetas.verificacion --casos 2000 --semilla 7
+    python -m etiquetas.verificacion --regenerar   # solo si el cambio de dibujo es intencional
+
+Termina con código 1 si alguna verificación falla; con --semilla se repite
+exactamente la misma corrida.
+"""
+
+import argparse
+import io
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field, replace
+
+from PIL import Image, ImageChops, ImageFilter
+
+from .assets import BASE_DIR
+from .cache import CacheRender, spec_hash
+from .capas import RenderCapas
+from .codigos import digito_verificador_ean13
+from .imposicion import Plancha, imponer
+from .lienzo import Lienzo
+from .precios import IVAS, UNIDADES, calcular_precios, formatear_precio, parsear_precio, procesar_precio
+from .render import LabelSpec, render_label, render_png
+from .vectorial import render_pdf
+
+REFERENCIAS_DIR = os.path.join(BASE_DIR, "referencias")
+ARCHIVO_CASOS = "casos.json"
+
+# Diferencia perceptual: los píxeles se comparan después de un desenfoque de
+# `RADIO_DESENFOQUE`; cuenta como distinto el que difiere en más de
+# `UMBRAL_PIXEL` (de 255) en algún canal. Se tolera hasta `TOLERANCIA` de la imagen.
+RADIO_DESENFOQUE = 1.0
+UMBRAL_PIXEL = 24
+TOLERANCIA = 0.001
+
+# Comparación de los PDF rasterizados: más desenfoque y un umbral más alto
+RADIO_VECTORIAL = 2.0
+UMBRAL_VECTORIAL = 64
+TOLERANCIA_VECTORIAL = 0.03
+
+CASOS = 500
+SEMILLA = 2025
+# Fallas a mostrar por verificación
+MAX_FALLAS = 10
+
+PALABRAS = (
+    "yerba", "mate", "aceite", "girasol", "queso", "cremoso", "leche", "entera", "fideos", "tirabuzón",
+    "arroz", "largo", "fino", "harina", "000", "azúcar", "café", "molido", "galletitas", "dulce",
+    "de", "leche", "pan", "lactal", "jabón", "en", "polvo", "ñoquis", "caseros", "vino", "tinto",
+    "malbec", "cerveza", "rubia", "lata", "agua", "mineral", "sin", "gas", "1kg", "500g", "1,5L", "x6",
+)
+PALETA = ("#000000", "#FFFFFF", "#F5F5F5", "#1F3A93", "#C0392B", "#FFEEDD", "#2E7D32", "#777777")
+
+
+# Copias literales del código original de streamlit_app.py: no modificar
+
+def _procesar_original(texto):
+    precio_final_procesado = texto.strip()
+    return precio_final_procesado.replace("$", "").replace(".","").replace(",,",",").replace(",",".")
+
+
+def _calcular_original(precio_final_float, iva, dividir_por_litro_o_kg, cantidad):
+    if iva == "21%":
+        precio_sin_iva = precio_final_float / 1.21
+    elif iva == "10.5%":
+        precio_sin_iva = precio_final_float / 1.105
+    else:
+        precio_sin_iva = precio_final_float
+    if dividir_por_litro_o_kg != "Sin unidades":
+        precio_cantidad = precio_final_float / cantidad
+    else: precio_cantidad = 0
+    return precio_final_float, precio_sin_iva, precio_cantidad
+
+
+def _formatear_original(valor):
+    texto = '{:,.2f}'.format(valor).replace(',', ' ')
+    texto = texto.replace(".",",")
+    return texto.replace(" ",".")
+
+
+@dataclass
+class Resultado:
+    nombre: str
+    casos: int = 0
+    fallas: list = field(default_factory=list)
+    omitida: str = ""
+
+    @property
+    def ok(self):
+        return not self.fallas
+
+    def fallar(self, mensaje):
+        self.fallas.append(mensaje)
+
+
+def _iguales(a, b):
+    """Igualdad exacta de floats, con NaN igual a NaN y distinguiendo -0.0."""
+    if isinstance(a, float) and isinstance(b, float):
+        if math.isnan(a) or math.isnan(b):
+            return math.isnan(a) and math.isnan(b)
+        return a == b and math.copysign(1, a) == math.copysign(1, b)
+    return a == b
+
+
+# Generadores de entradas
+
+def generar_valor(rnd):
+    """Precio al azar, cargado hacia los casos difíciles de redondear y formatear."""
+    tipo = rnd.random()
+    if tipo < 0.3:
+        return round(rnd.uniform(0, 10000), 2)
+    if tipo < 0.45:
+        # Empates en el tercer decimal
+        return rnd.randrange(0, 10**7) / 100 + 0.005
+    if tipo < 0.6:
+        return float(rnd.randrange(0, 10**6))
+    if tipo < 0.7:
+        return rnd.uniform(1e6, 1e12)
+    if tipo < 0.8:
+        return rnd.choice((0.0, -0.0, 0.004, 0.005, 0.995, 999.995, 999999.995, 1e13, 1e15))
+    if tipo < 0.9:
+        return -rnd.uniform(0, 10000)
+    return rnd.uniform(0, 1) * 10 ** rnd.randrange(-3, 9)
+
+
+def generar_texto_precio(rnd):
+    """Texto como lo escribiría alguien en el campo "Precio Final del Producto"."""
+    if rnd.random() < 0.5:
+        texto = formatear_precio(abs(round(generar_valor(rnd), 2)))
+        if rnd.random() < 0.3:
+            texto = texto.replace(".", "")
+        if rnd.random() < 0.2:
+            texto = texto.replace(",", ".")
+    else:
+        texto = "".join(rnd.choice("0123456789$.,, -") for _ in range(rnd.randrange(0, 12)))
+    prefijo = rnd.choice(("", "$", "$ ", " $", "  "))
+    return prefijo + texto + rnd.choice(("", " ", ",", ",,5"))
+
+
+def generar_producto(rnd):
+    """Nombre de producto; uno de cada cinco es largo y se corta en varias líneas."""
+    if rnd.random() < 0.2:
+        cantidad = rnd.randrange(6, 18)
+    else:
+        cantidad = rnd.randrange(1, 4)
+    palabras = [rnd.choice(PALABRAS) for _ in range(cantidad)]
+    if rnd.random() < 0.05:
+        # Una palabra más ancha que la columna
+        palabras.append("superextraordinariamente")
+    nombre = " ".join(palabras)
+    return nombre.capitalize() if rnd.random() < 0.5 else nombre
+
+
+def generar_ean13(rnd):
+    doce = "779" + "".join(rnd.choice("0123456789") for _ in range(9))
+    return doce + str(digito_verificador_ean13(doce))
+
+
+def generar_spec(rnd, codigos=True):
+    """LabelSpec al azar con datos válidos para la UI."""
+    unidad = rnd.choice(UNIDADES)
+    return LabelSpec(
+        producto=generar_producto(rnd),
+        precio_final=abs(round(generar_valor(rnd), 2)) % 1e10,
+        iva=rnd.choice(IVAS),
+        unidad=unidad,
+        cantidad=round(rnd.uniform(0.1, 20), 2) if unidad != "Sin unidades" else 1.0,
+        escala=rnd.choice((0.5, 1.0, 1.0, 1.5, 2.0)),
+        color_texto=rnd.choice(PALETA),
+        color_fondo_superior=rnd.choice(PALETA),
+        color_fondo_inferior=rnd.choice(PALETA),
+        color_borde_interior=rnd.choice(PALETA),
+        color_borde_exterior=rnd.choice(PALETA),
+        ajustar_texto=rnd.random() < 0.3,
+        codigo=generar_ean13(rnd) if codigos and rnd.random() < 0.2 else "",
+    )
+
+
+# Verificaciones de precios
+
+def verificar_parseo(rnd, casos):
+    r = Resultado("parseo", casos)
+    for _ in range(casos):
+        texto = generar_texto_precio(rnd)
+        esperado = _procesar_original(texto)
+        obtenido = procesar_precio(texto)
+        if obtenido != esperado:
+            r.fallar(f"procesar_precio({texto!r}) = {obtenido!r}, original {esperado!r}")
+            continue
+        try:
+            numero = float(esperado)
+        except ValueError:
+            numero = None
+        try:
+            parseado = parsear_precio(texto)
+        except ValueError:
+            parseado = None
+        if not _iguales(parseado, numero):
+            r.fallar(f"parsear_precio({texto!r}) = {parseado!r}, original {numero!r}")
+    return r
+
+
+def verificar_calculo(rnd, casos):
+    r = Resultado("calculo_iva", casos)
+    for _ in range(casos):
+        precio = generar_valor(rnd)
+        iva, unidad = rnd.choice(IVAS), rnd.choice(UNIDADES)
+        cantidad = rnd.choice((0.1, 0.25, 1.0, 3.0, rnd.uniform(0.1, 100)))
+        obtenido = calcular_precios(precio, iva, unidad, cantidad)
+        esperado = _calcular_original(precio, iva, unidad, cantidad)
+        if not all(_iguales(float(a), float(b)) for a, b in zip(obtenido, esperado)):
+            r.fallar(f"calcular_precios({precio!r}, {iva}, {unidad}, {cantidad!r}) = {obtenido}, original {esperado}")
+    return r
+
+
+def verificar_formato(rnd, casos):
+    r = Resultado("formato_es_ar", casos)
+    especiales = [float("nan"), float("inf"), -float("inf"), -0.0, 1e300]
+    for i in range(casos):
+        valor = especiales[i] if i < len(especiales) else generar_valor(rnd)
+        obtenido, esperado = formatear_precio(valor), _formatear_original(valor)
+        if obtenido != esperado:
+            r.fallar(f"formatear_precio({valor!r}) = {obtenido!r}, original {esperado!r}")
+    return r
+
+
+def verificar_lote(rnd, casos):
+    """Motor por columnas contra el escalar, en listas de 1 a 500 productos."""
+    r = Resultado("precios_lote", 0)
+    try:
+        import numpy as np
+
+        from .precios_lote import calcular_precios_lote, formatear_precios
+    except ImportError as e:
+        r.omitida = f"falta {e.name}"
+        return r
+
+    while r.casos < casos:
+        n = min(rnd.choice((1, 2, 7, 64, 500)), casos - r.casos)
+        precios = [generar_valor(rnd) for _ in range(n)]
+        ivas = [rnd.choice(IVAS) for _ in range(n)]
+        unidades = [rnd.choice(UNIDADES) for _ in range(n)]
+        cantidades = [rnd.choice((0.1, 1.0, rnd.uniform(0.1, 50))) for _ in range(n)]
+        # A veces con escalares repetidos para todas las filas, como en precios_lista
+        if rnd.random() < 0.2:
+            ivas, unidades, cantidades = ivas[0], unidades[0], cantidades[0]
+        columnas = calcular_precios_lote(np.array(precios), np.array(ivas), np.array(unidades), np.array(cantidades))
+        textos = [formatear_precios(c) for c in columnas]
+        for i, precio in enumerate(precios):
+            fila = (
+                ivas if isinstance(ivas, str) else ivas[i],
+                unidades if isinstance(unidades, str) else unidades[i],
+                cantidades if isinstance(cantidades, float) else cantidades[i],
+            )
+            esperado = calcular_precios(precio, *fila)
+            for j, valor in enumerate(esperado):
+                if not _iguales(float(columnas[j][i]), float(valor)):
+                    r.fallar(f"calcular_precios_lote[{j}] para {(precio,) + fila}: {columnas[j][i]!r} != {valor!r}")
+                elif textos[j][i] != formatear_precio(valor):
+                    r.fallar(f"formatear_precios({valor!r}) = {textos[j][i]!r}, escalar {formatear_precio(valor)!r}")
+        r.casos += n
+    return r
+
+
+# Verificaciones de dibujo
+
+# Plantilla que dibuja el nombre tal cual: sin mayúsculas y en una sola línea
+PLANTILLA_LITERAL = {"tamano": [300, 100], "textos": [{"texto": "{producto}", "pos": [10, 10], "tamano": 24}]}
+
+def diferencia_perceptual(a, b, radio=RADIO_DESENFOQUE, umbral=UMBRAL_PIXEL):
+    """Fracción de píxeles que difieren visiblemente (1.0 si los tamaños no coinciden)."""
+    if a.size != b.size:
+        return 1.0
+    filtro = ImageFilter.GaussianBlur(radio)
+    diferencia = ImageChops.difference(a.convert("RGB").filter(filtro), b.convert("RGB").filter(filtro))
+    # Máximo entre canales: un cambio de color con la misma luminancia también cuenta
+    canales = diferencia.split()
+    maximo = ImageChops.lighter(ImageChops.lighter(canales[0], canales[1]), canales[2])
+    distintos = sum(maximo.histogram()[umbral:])
+    return distintos / (a.width * a.height)
+
+
+def _caminos_rapidos():
+    """Renderers que deben dar exactamente lo mismo que `render_label`, como (nombre, función)."""
+    capas = RenderCapas()
+    cache = CacheRender()
+    lienzo = Lienzo()
+
+    def desde_cache(spec):
+        # Dos veces: la segunda sale de la caché
+        cache.render_png(spec)
+        return Image.open(io.BytesIO(cache.render_png(spec))).convert("RGB")
+
+    return [
+        ("capas", capas.render_label),
+        ("capas_cacheada", capas.render_label),
+        ("plantilla_estandar", lambda spec: render_label(replace(spec, plantilla="estandar"))),
+        ("cache_png", desde_cache),
+        # El lienzo se reutiliza: copiar antes de la siguiente etiqueta
+        ("lienzo", lambda spec: lienzo.render_label(spec).copy()),
+        ("lienzo_png", lambda spec: Image.open(io.BytesIO(lienzo.png(spec))).convert("RGB")),
+    ]
+
+
+def verificar_caminos(rnd, casos):
+    r = Resultado("caminos_rapidos", casos)
+    caminos = _caminos_rapidos()
+    for _ in range(casos):
+        spec = generar_spec(rnd)
+        esperado = render_label(spec)
+        for nombre, dibujar in caminos:
+            obtenido = dibujar(spec)
+            if obtenido.size != esperado.size or ImageChops.difference(obtenido, esperado).getbbox() is not None:
+                r.fallar(f"{nombre} difiere de render_label para {spec}")
+    return r
+
+
+def _variantes_producto(rnd, producto):
+    """El mismo nombre en otras mayúsculas o con otros espacios."""
+    palabras = producto.split()
+    return [
+        producto.upper(),
+        producto.lower(),
+        producto.title(),
+        "  ".join(palabras),
+        " " + " ".join(palabras) + " ",
+        "".join(c.upper() if rnd.random() < 0.5 else c.lower() for c in producto),
+    ]
+
+
+def verificar_cache(rnd, casos):
+    """Mismo `spec_hash` tiene que ser el mismo dibujo, y la caché devuelve lo que dibujaría `render_png`."""
+    r = Resultado("cache_hash", 0)
+    with tempfile.TemporaryDirectory() as directorio:
+        literal = os.path.join(directorio, "literal.json")
+        with open(literal, "w", encoding="utf-8") as f:
+            json.dump(PLANTILLA_LITERAL, f)
+        cache = CacheRender()
+        for i in range(casos):
+            plantilla = ("", "estandar", "gondola", literal)[i % 4]
+            spec = replace(generar_spec(rnd, codigos=False), plantilla=plantilla, escala=1.0)
+            png = render_png(spec)
+            for producto in _variantes_producto(rnd, spec.producto):
+                variante = replace(spec, producto=producto)
+                r.casos += 1
+                png_variante = render_png(variante)
+                if spec_hash(variante) == spec_hash(spec) and png_variante != png:
+                    r.fallar(f"mismo hash y distinto dibujo: {spec.producto!r} y {producto!r} (plantilla {plantilla!r})")
+                # Primero el original, así la variante puede salir de la caché
+                cache.render_png(spec)
+                if cache.render_png(variante) != png_variante:
+                    r.fallar(f"la caché devuelve otra imagen para {producto!r} (plantilla {plantilla!r})")
+    return r
+
+
+def casos_referencia():
+    """Etiquetas de referencia: bordes conocidos más un conjunto generado con semilla fija."""
+    casos = {
+        "clasica": LabelSpec(producto="Yerba mate 1kg", precio_final=4599.9),
+        "nombre_largo": LabelSpec(
+            producto="Aceite de girasol botella grande edición especial con nombre muy largo",
+            precio_final=1234567.5,
+            unidad="Litros",
+            cantidad=1.5,
+        ),
+        "nombre_largo_ajustado": LabelSpec(
+            producto="Nombre muy largo que no entra de ninguna manera en la columna del producto y hay que achicar",
+            precio_final=5,
+            ajustar_texto=True,
+        ),
+        "palabra_ancha": LabelSpec(producto="superextraordinariamente barato", precio_final=0.005, iva="Exento"),
+        "kilogramo_colores": LabelSpec(
+            producto="Queso cremoso",
+            precio_final=12000,
+            iva="10.5%",
+            unidad="Kilogramos",
+            cantidad=0.25,
+            color_texto="#1F3A93",
+            color_fondo_superior="#FFEEDD",
+            color_borde_exterior="#000000",
+        ),
+        "precio_enorme": LabelSpec(producto="Auto", precio_final=987654321.99, escala=0.5),
+        "codigo_ean13": LabelSpec(producto="Café molido", precio_final=3250, codigo="7790895000997"),
+        "escala_doble": LabelSpec(producto="Leche entera", precio_final=1299.99, escala=2.0),
+        "gondola": LabelSpec(producto="Fideos tirabuzón", precio_final=899.5, plantilla="gondola"),
+        "colgante": LabelSpec(
+            producto="Vino tinto malbec", precio_final=8900, unidad="Litros", cantidad=0.75, plantilla="colgante"
+        ),
+    }
+    rnd = random.Random(SEMILLA)
+    for i in range(6):
+        casos[f"generada_{i}"] = replace(generar_spec(rnd), escala=1.0)
+    return casos
+
+
+def leer_casos(directorio=REFERENCIAS_DIR):
+    with open(os.path.join(directorio, ARCHIVO_CASOS), encoding="utf-8") as f:
+        return {nombre: LabelSpec.from_dict(datos) for nombre, datos in json.load(f).items()}
+
+
+def regenerar_referencias(directorio=REFERENCIAS_DIR):
+    """Vuelve a dibujar las imágenes de referencia con el código actual."""
+    os.makedirs(directorio, exist_ok=True)
+    casos = casos_referencia()
+    with open(os.path.join(directorio, ARCHIVO_CASOS), "w", encoding="utf-8") as f:
+        json.dump({nombre: spec.to_dict() for nombre, spec in casos.items()}, f, indent=1, ensure_ascii=False)
+        f.write("\n")
+    for nombre, spec in casos.items():
+        render_label(spec).save(os.path.join(directorio, f"{nombre}.png"), optimize=True)
+    return len(casos)
+
+
+def verificar_referencias(tolerancia=TOLERANCIA, directorio=REFERENCIAS_DIR):
+    r = Resultado("referencias")
+    try:
+        casos = leer_casos(directorio)
+    except FileNotFoundError:
+        r.omitida = f"no hay referencias en {directorio} (generarlas con --regenerar)"
+        return r
+    caminos = [("render_label", render_label)] + _caminos_rapidos()
+    for nombre, spec in casos.items():
+        with Image.open(os.path.join(directorio, f"{nombre}.png")) as referencia:
+            referencia = referencia.convert("RGB")
+        for camino, dibujar in caminos:
+            if spec.plantilla and camino == "plantilla_estandar":
+                continue
+            r.casos += 1
+            diferencia = diferencia_perceptual(dibujar(spec), referencia)
+            if diferencia > tolerancia:
+                r.fallar(f"{nombre} ({camino}): {diferencia:.4%} de píxeles distintos (tolerancia {tolerancia:.4%})")
+    return r
+
+
+def _rasterizar(pymupdf, pdf):
+    """Páginas de `pdf` como imágenes RGB, a 1 px por punto (el tamaño del PNG)."""
+    with pymupdf.open(stream=pdf, filetype="pdf") as documento:
+        paginas = []
+        for pagina in documento:
+            pixmap = pagina.get_pixmap(dpi=72, alpha=False)
+            paginas.append(Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples))
+        return paginas
+
+
+def _imponer_sola(spec, ancho, alto):
+    """Hoja con una sola celda del tamaño de la etiqueta, para compararla con la referencia."""
+    salida = io.BytesIO()
+    imponer([spec], salida, Plancha(pagina=(ancho, alto), margen=0, ancho_etiqueta=ancho, alto_etiqueta=alto))
+    return salida.getvalue()
+
+
+def verificar_pdf(directorio=REFERENCIAS_DIR, tolerancia=TOLERANCIA_VECTORIAL):
+    r = Resultado("pdf_vectorial")
+    try:
+        import pymupdf
+    except ImportError:
+        r.omitida = "falta pymupdf"
+        return r
+    try:
+        casos = leer_casos(directorio)
+    except FileNotFoundError:
+        r.omitida = f"no hay referencias en {directorio} (generarlas con --regenerar)"
+        return r
+
+    for nombre, spec in casos.items():
+        with Image.open(os.path.join(directorio, f"{nombre}.png")) as referencia:
+            referencia = referencia.convert("RGB")
+        for camino, pdf in (
+            ("render_pdf", render_pdf(spec)),
+            ("imponer", _imponer_sola(spec, *referencia.size)),
+        ):
+            r.casos += 1
+            paginas = _rasterizar(pymupdf, pdf)
+            if len(paginas) != 1:
+                r.fallar(f"{nombre} ({camino}): {len(paginas)} páginas")
+                continue
+            diferencia = diferencia_perceptual(paginas[0], referencia, RADIO_VECTORIAL, UMBRAL_VECTORIAL)
+            if diferencia > tolerancia:
+                r.fallar(f"{nombre} ({camino}): {diferencia:.4%} de píxeles distintos (tolerancia {tolerancia:.4%})")
+
+    # Hoja completa: una página de más para una sola etiqueta sobrante
+    plancha = Plancha()
+    specs = list(casos.values())
+    specs = (specs * (plancha.por_pagina // len(specs) + 1))[: plancha.por_pagina + 1]
+    salida = io.BytesIO()
+    cantidad = imponer(specs, salida, plancha)
+    r.casos += 1
+    paginas = len(_rasterizar(pymupdf, salida.getvalue()))
+    if cantidad != len(specs) or paginas != 2:
+        r.fallar(f"imponer: {cantidad} etiquetas en {paginas} páginas, se esperaban {len(specs)} en 2")
+    return r
+
+
+def ejecutar(casos=CASOS, semilla=SEMILLA, tolerancia=TOLERANCIA):
+    """Corre todas las verificaciones y devuelve la lista de Resultado."""
+    # Cada verificación con su propio generador: agregar una no cambia las entradas de las otras
+    return [
+        verificar_parseo(random.Random(f"{semilla}-parseo"), casos * 10),
+        verificar_calculo(random.Random(f"{semilla}-calculo"), casos * 10),
+        verificar_formato(random.Random(f"{semilla}-formato"), casos * 10),
+        verificar_lote(random.Random(f"{semilla}-lote"), casos * 10),
+        verificar_caminos(random.Random(f"{semilla}-caminos"), max(1, casos // 10)),
+        verificar_cache(random.Random(f"{semilla}-cache"), max(1, casos // 25)),
+        verificar_referencias(tolerancia),
+        verificar_pdf(),
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--casos", type=int, default=CASOS, help="entradas generadas por verificación (x10 en precios)")
+    parser.add_argument("--semilla", type=int, default=SEMILLA)
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA, help="fracción de píxeles distintos tolerada")
+    parser.add_argument("--regenerar", action="store_true", help="volver a dibujar las imágenes de referencia")
+    args = parser.parse_args(argv)
+
+    if args.regenerar:
+        print(f"{regenerar_referencias()} imágenes de referencia en {REFERENCIAS_DIR}")
+        return 0
+
+    inicio = time.perf_counter()
+    resultados = ejecutar(args.casos, args.semilla, args.tolerancia)
+    for r in resultados:
+        if r.omitida:
+            print(f"OMITIDA {r.nombre:18} {r.omitida}")
+            continue
+        print(f"{'OK' if r.ok else 'FALLA':7} {r.nombre:18} {r.casos} casos" + (f", {len(r.fallas)} fallas" if r.fallas else ""))
+        for falla in r.fallas[:MAX_FALLAS]:
+            print(f"        {falla}")
+    fallidas = [r for r in resultados if not r.ok]
+    print(f"{len(resultados) - len(fallidas)}/{len(resultados)} verificaciones correctas en {time.perf_counter() - inicio:.1f} s")
+    return 1 if fallidas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
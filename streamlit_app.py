@@ -1,12 +1,25 @@
 import streamlit as st
-from PIL import Image, ImageDraw, ImageFont
-from io import BytesIO
-import io
 import datetime
-import time
-import pytz
-import pandas as pd
+import functools
+import io
 import os
+import tempfile
+import zipfile
+from dataclasses import replace
+
+from etiquetas import LabelSpec, metricas
+from etiquetas.assets import imagen_reducida, preload_fonts
+from etiquetas.cache import CacheRender
+from etiquetas.cambios import Comparacion, Manifiesto
+from etiquetas.capas import RenderCapas
+from etiquetas.estadisticas import COLUMNAS_CALIFICACIONES, COLUMNAS_PROVINCIAS, EscritorCSV
+from etiquetas.eventos_db import BaseEventos
+from etiquetas.exportar import exportar_zip
+from etiquetas.hoja_pdf import generar_pdf
+from etiquetas.imposicion import Plancha, imponer
+from etiquetas.plantillas import cargar_plantilla, listar_plantillas
+from etiquetas.precios import IVAS, UNIDADES, procesar_precio
+from etiquetas.render import codigo_etiqueta, tamano_escalado
 
 # Configuración para ocultar elementos de la UI
 st.set_page_config(
@@ -58,67 +71,72 @@ a:hover {
 """
 st.markdown(hide_streamlit_style, unsafe_allow_html=True)
 
+# Cargar las fuentes una sola vez por proceso (compartidas entre sesiones)
+@st.cache_resource
+def precargar_fuentes():
+    return preload_fonts()
+
+precargar_fuentes()
+
+# Métricas por etapa y descargas por provincia, solo si se configuró
+# ETIQUETAS_METRICAS_PUERTO (GET /metrics) o ETIQUETAS_METRICAS_ARCHIVO
+@st.cache_resource
+def configurar_metricas():
+    return metricas.configurar_desde_entorno()
+
+configurar_metricas()
+
+# Caché de etiquetas compartida entre sesiones (solo en memoria); en un fallo
+# la etiqueta se compone reutilizando las capas que no cambiaron
+@st.cache_resource
+def cache_etiquetas():
+    return CacheRender(dibujar=RenderCapas().render_label)
+
 # Configuración de rutas para archivos locales
 DATA_DIR = "data"
 CALIFICACIONES_FILE = os.path.join(DATA_DIR, "calificaciones.csv")
 PROVINCIAS_FILE = os.path.join(DATA_DIR, "provincias.csv")
 
-# Crear directorio de datos si no existe
-os.makedirs(DATA_DIR, exist_ok=True)
+# Backend de estadísticas: "csv" (por defecto) o "sqlite"
+EVENTOS_BACKEND = os.environ.get("ETIQUETAS_EVENTOS", "csv")
+EVENTOS_DB = os.path.join(DATA_DIR, "eventos.db")
+
+# Un escritor por archivo y por proceso: agrega filas sin reescribir el historial
+@st.cache_resource
+def escritores_csv():
+    # Crear directorio de datos si no existe (una vez por proceso, al guardar el primer dato)
+    os.makedirs(DATA_DIR, exist_ok=True)
+    if EVENTOS_BACKEND == "sqlite":
+        base = BaseEventos(EVENTOS_DB)
+        # Importar el historial de los CSV la primera vez que se usa la base
+        base.migrar_csv(DATA_DIR)
+        return {"calificaciones": base.escritor("calificaciones"), "provincias": base.escritor("provincias")}
+    return {
+        "calificaciones": EscritorCSV(CALIFICACIONES_FILE, COLUMNAS_CALIFICACIONES),
+        "provincias": EscritorCSV(PROVINCIAS_FILE, COLUMNAS_PROVINCIAS),
+    }
 
-# Inicializar archivos CSV si no existen
-def init_csv_files():
-    if not os.path.exists(CALIFICACIONES_FILE):
-        pd.DataFrame(columns=['Fecha', 'Hora', 'Evaluación']).to_csv(CALIFICACIONES_FILE, index=False)
-    if not os.path.exists(PROVINCIAS_FILE):
-        pd.DataFrame(columns=['Fecha', 'Hora', 'Provincia']).to_csv(PROVINCIAS_FILE, index=False)
+# Fecha y hora de Buenos Aires como (dd/mm/aa, hh:mm:ss)
+def fecha_hora_actual():
+    # pytz solo se importa cuando hay algo que guardar
+    import pytz
+    ahora = datetime.datetime.now(pytz.timezone('America/Argentina/Buenos_Aires'))
+    return ahora.strftime("%d/%m/%y"), ahora.strftime("%H:%M:%S")
 
-# Inicializar archivos
-init_csv_files()
+# Imagen fija reducida una vez por proceso; `ancho` es el tamaño en pantalla
+# y se guarda al doble para pantallas de alta densidad
+def imagen_fija(path, ancho):
+    return imagen_reducida(path, ancho * 2)
 
 # Creamos la función para agregar datos    
 def calificacion(fecha_actual, hora_actual, evaluation):
-    # Leer el CSV existente
-    df = pd.read_csv(CALIFICACIONES_FILE)
-    
-    # Create a DataFrame with the new data
-    new_data = pd.DataFrame({
-        'Fecha': [fecha_actual],
-        'Hora': [hora_actual],
-        'Evaluación': [evaluation],
-    })
-    
-    # Append the new DataFrame to the existing DataFrame
-    df = pd.concat([df, new_data], ignore_index=True)
-    
-    # Save the updated DataFrame
-    df.to_csv(CALIFICACIONES_FILE, index=False)
+    escritores_csv()["calificaciones"].agregar(fecha_actual, hora_actual, evaluation)
     
 # Creamos la función para agregar datos    
 def provincia(fecha_actual, hora_actual, provincia):
     try:
-        # Asegurarse de que el directorio existe
-        os.makedirs(DATA_DIR, exist_ok=True)
-        
-        # Leer el CSV existente o crear uno nuevo si no existe
-        if os.path.exists(PROVINCIAS_FILE):
-            df = pd.read_csv(PROVINCIAS_FILE)
-        else:
-            df = pd.DataFrame(columns=['Fecha', 'Hora', 'Provincia'])
-        
-        # Crear un DataFrame con los nuevos datos
-        new_data = pd.DataFrame({
-            'Fecha': [fecha_actual],
-            'Hora': [hora_actual],
-            'Provincia': [provincia],
-        })
-        
-        # Agregar los nuevos datos al DataFrame existente
-        df = pd.concat([df, new_data], ignore_index=True)
-        
-        # Guardar el DataFrame actualizado
-        df.to_csv(PROVINCIAS_FILE, index=False)
-        
+        escritores_csv()["provincias"].agregar(fecha_actual, hora_actual, provincia)
+        metricas.contar("descargas_total", provincia=provincia)
         return True
     except Exception as e:
         st.error(f"Error al guardar los datos: {str(e)}")
@@ -131,7 +149,7 @@ with columna_titulo:
 with columna_logo:
     st.write("")
     st.write("")
-    st.image("imgs/CAME-Transparente.png", use_container_width=True)
+    st.image(imagen_fija("imgs/CAME-Transparente.png", 240), use_container_width=True)
     
 st.write("#### De acuerdo a la [resolución 04/2025.](https://www.argentina.gob.ar/sites/default/files/exhibicion_de_precios_resolucion_4_2025.pdf)")
 
@@ -146,30 +164,6 @@ st.write("+ **10,5% =** Productos agropecuarios, carne, pan, frutas y verduras."
 st.write("+ **0% =** Libros, folletos, diarios.")
 
 st.write("---")
-def draw_wrapped_text(draw= None, text= None, font= None, max_width = 235, x = 30, y = 25+8, fill = None):
-    lines = []
-    words = text.split()
-    line = ""
-
-    for word in words:
-        test_line = line + " " + word if line else word
-        bbox = draw.textbbox((0, 0), test_line, font=font)
-        text_width = bbox[2] - bbox[0]
-
-        if text_width <= max_width:
-            line = test_line
-        else:
-            lines.append(line)
-            line = word
-    if line:
-        lines.append(line)
-
-    # Dibujar las líneas en la imagen
-    for i, l in enumerate(lines):
-        bbox = draw.textbbox((0, 0), l, font=font)
-        line_height = bbox[3] - bbox[1]
-        draw.text((x, y + i * (line_height + 9)), l, font=font, fill=fill)
-
 
 # Entrada de precio final y selección de IVA
 # listado de provincias
@@ -208,11 +202,11 @@ with col1:
     producto = st.text_input("Producto", "")
     precio_final = st.text_input("Precio Final del Producto", value="$")
     # Se formatea el valor ingresado
-    precio_final_procesado = precio_final.strip()
-    precio_final_procesado = precio_final_procesado.replace("$", "").replace(".","").replace(",,",",").replace(",",".")  
+    precio_final_procesado = procesar_precio(precio_final)
 with col2:
-    iva = st.selectbox("IVA", ["21%", "10.5%", "Exento"])
-    dividir_por_litro_o_kg = st.selectbox("Unidad", ["Sin unidades", "Kilogramos", "Litros"])
+    iva = st.selectbox("IVA", IVAS)
+    dividir_por_litro_o_kg = st.selectbox("Unidad", UNIDADES)
+    cantidad = 1.0
     if dividir_por_litro_o_kg != "Sin unidades":
         cantidad =st.number_input("Cantidad", min_value=0.1, value=1.00,  format="%.2f")
       
@@ -240,111 +234,58 @@ if precio_valido and provincia_seleccionada != "-":
     with color5:
         color_borde_exterior = st.color_picker("Borde Exterior", "#FFFFFF")
 
- 
-    # Calcular precio sin IVA y precio por litro
-    if iva == "21%":
-        precio_sin_iva = precio_final_float / 1.21
-    elif iva == "10.5%":
-        precio_sin_iva = precio_final_float / 1.105
-    else:  # Exento
-        precio_sin_iva = precio_final_float
-
-    # SI TIENE KG O L
-    if dividir_por_litro_o_kg != "Sin unidades":
-        precio_cantidad = precio_final_float / cantidad
-    else: precio_cantidad = 0
-
-    # Creamos lista de variables
-    lista_variables = [ precio_final_float, precio_sin_iva, precio_cantidad]
-        
-    # iteramos para el formato
-    for i in range (len(lista_variables)) :
-        lista_variables[i] = '{:,.2f}'.format(lista_variables[i]).replace(',', ' ')
-        lista_variables[i] = lista_variables[i].replace(".",",")
-        lista_variables[i] = lista_variables[i].replace(" ",".")
-
-    # Crear imagen
-    img = Image.new("RGB", (720, 300), color=color_fondo_superior)
-    draw = ImageDraw.Draw(img)
-
-    # Dibujar fondo inferior
-    draw.rectangle([0, 190, 720, 300], fill=color_fondo_inferior)
-
-    # Fuentes
-    font_large = ImageFont.truetype("Fuentes/Inter/Inter-Medium.ttf", 45)
-    font_medium = ImageFont.truetype("Fuentes/Inter/Inter-Medium.ttf", 24)
-    font_small = ImageFont.truetype("Fuentes/Inter/Inter-Medium.ttf", 16)
-    
-    # Dibujar texto
-    producto = producto.upper()
-
-    draw_wrapped_text(draw, producto, font_medium, fill=color_texto)
-
-    draw.text((320, 25 + 8), "Precio final al consumidor", fill=color_texto, font=font_small)
-    draw.text((320,   48 + 8), f"${lista_variables[0]}", fill=color_texto, font=font_large)
-    draw.text((320,  109 + 8), f"Precio sin impuestos nacionales (IVA) ${lista_variables[1]}", fill=color_texto, font=font_small)
-
-    if dividir_por_litro_o_kg == "Kilogramos":
-        draw.text((320,  130 + 8), f"Precio al consumidor por kilogramo ${lista_variables[2]}", fill=color_texto, font=font_small)
-    elif dividir_por_litro_o_kg == "Litros":
-        draw.text((320,  130 + 8), f"Precio al consumidor por litro ${lista_variables[2]}", fill=color_texto, font=font_small)    
-
-    # Dibujar borde negro
-    draw.rectangle([0, 0, 719, 299], outline=color_borde_exterior, width=10)
-    # Dibujar borde negro
-    draw.rectangle([10, 10, 709, 289], outline=color_borde_interior, width=2)
-
-    # Cargar imagen de marca de agua (asegurate de que el PNG tenga fondo transparente)
-    marca_agua = Image.open("imgs/CAME_baja-solo.jpg").convert("RGBA")
-    # Redimensionar si hace falta
-    marca_agua = marca_agua.resize((720, 270))  # Ajustá tamaño según prefieras
-
-    # Cambiar transparencia (más baja = más transparente)
-    alpha = 9  # de 0 (invisible) a 255 (opaco)
-    # Separar canales y aplicar nuevo alpha
-    r, g, b, a = marca_agua.split()
-    marca_agua.putalpha(alpha)
-
-    # Posición de la marca de agua (abajo a la derecha, por ejemplo)
-    pos_x = img.width - marca_agua.width - 10
-    pos_y = img.height - marca_agua.height - 10
-
-    # Pegar la marca de agua sobre la imagen principal
-    img.paste(marca_agua, (pos_x, pos_y), marca_agua)
- 
     escala = st.slider("Tamaño de la etiqueta", min_value=0.1, max_value=3.0, value=1.0, step=0.1)
-
-    # Redimensionar imagen
-    nuevo_ancho = int(img.width * escala)
-    nuevo_alto = int(img.height * escala)
-    img_redimensionada = img.resize((nuevo_ancho, nuevo_alto))
+    ajustar_texto = st.checkbox("Achicar el nombre del producto si no entra en la etiqueta", value=False)
+    codigo = st.text_input("Código de barras (EAN-13 o SKU, opcional)", "")
+
+    # Etiqueta ya redimensionada
+    spec = LabelSpec(
+        producto=producto,
+        precio_final=precio_final_float,
+        iva=iva,
+        unidad=dividir_por_litro_o_kg,
+        cantidad=cantidad,
+        color_texto=color_texto,
+        color_fondo_superior=color_fondo_superior,
+        color_fondo_inferior=color_fondo_inferior,
+        color_borde_interior=color_borde_interior,
+        color_borde_exterior=color_borde_exterior,
+        escala=escala,
+        ajustar_texto=ajustar_texto,
+        codigo=codigo,
+    )
+    # Un código inválido no impide generar la etiqueta: se avisa y se dibuja sin código
+    try:
+        codigo_etiqueta(spec)
+    except ValueError as e:
+        st.warning(str(e))
+        spec = replace(spec, codigo="")
+    # La caché evita redibujar y recodificar etiquetas idénticas
+    png_etiqueta = cache_etiquetas().render_png(spec)
+    nuevo_ancho, nuevo_alto = tamano_escalado(escala)
 
     # Mostrar imagen redimensionada
-    st.image(img_redimensionada, caption=f"Tamaño: {nuevo_ancho} x {nuevo_alto}")
-
-    # Botón para descargar la imagen
-    buf = io.BytesIO()
-    img_redimensionada.save(buf, format="PNG")
-    buf.seek(0)
-     
-    if st.download_button(
-        label="Descargar Etiqueta",
-        data=buf,
-        file_name="etiqueta.png",
-        mime="image/png"
-        ):
-        # Establecer la zona horaria a Buenos Aires
-        zona_horaria = pytz.timezone('America/Argentina/Buenos_Aires')
-    
-        # Obtener la fecha y hora actual en la zona horaria especificada
-        fecha_hora_actual = datetime.datetime.now(zona_horaria)
-    
-        # Obtener la fecha en formato dd/mm/aa
-        fecha_actual = fecha_hora_actual.strftime("%d/%m/%y")
-    
-        # Obtener la hora en formato hh:mm:ss
-        hora_actual = fecha_hora_actual.strftime("%H:%M:%S")
-        
+    st.image(png_etiqueta, caption=f"Tamaño: {nuevo_ancho} x {nuevo_alto}")
+
+    # Botones para descargar la imagen o el PDF vectorial (nítido a cualquier tamaño de impresión)
+    col_png, col_pdf = st.columns(2)
+    with col_png:
+        descarga_png = st.download_button(
+            label="Descargar Etiqueta",
+            data=png_etiqueta,
+            file_name="etiqueta.png",
+            mime="image/png"
+        )
+    with col_pdf:
+        descarga_pdf = st.download_button(
+            label="Descargar Etiqueta (PDF para imprimir)",
+            data=cache_etiquetas().render_pdf(spec),
+            file_name="etiqueta.pdf",
+            mime="application/pdf"
+        )
+    if descarga_png or descarga_pdf:
+        fecha_actual, hora_actual = fecha_hora_actual()
+
         # Guardar la provincia seleccionada
         if provincia(fecha_actual, hora_actual, provincia_seleccionada):
             st.success("Datos guardados correctamente")
@@ -361,33 +302,130 @@ if precio_valido and provincia_seleccionada != "-":
         submit_button = st.form_submit_button(label='Enviar')
         # Verificar si el formulario se ha enviado
         if submit_button:
-             # Establecer la zona horaria a Buenos Aires
-            zona_horaria = pytz.timezone('America/Argentina/Buenos_Aires')
-        
-            # Obtener la fecha y hora actual en la zona horaria especificada
-            fecha_hora_actual = datetime.datetime.now(zona_horaria)
-        
-            # Obtener la fecha en formato dd/mm/aa
-            fecha_actual = fecha_hora_actual.strftime("%d/%m/%y")
-        
-            # Obtener la hora en formato hh:mm:ss
-            hora_actual = fecha_hora_actual.strftime("%H:%M:%S")
-            # Agregar st.write para verificar el valor de evaluation
-        
+            fecha_actual, hora_actual = fecha_hora_actual()
+
             try:
                 calificacion(fecha_actual, hora_actual, evaluation)
                 st.success("Calificación enviada exitosamente!")
-            # Si salta error, esperar dos segundos y volver a cargar    
-            except Exception:
-                try:
-                    time.sleep(2)
-                    calificacion(fecha_actual, hora_actual, evaluation)
-                    st.success("Calificación enviada exitosamente!")
-                except Exception:
-                    pass
+            except Exception as e:
+                st.error(f"Error al guardar la calificación: {str(e)}")
 else:
     st.warning("Por favor, seleccione su provincia y ingrese un número válido en el campo de Precio Final.")
 
+# CARGA MASIVA DESDE UNA LISTA DE PRECIOS
+# Formato -> (función que escribe las etiquetas en un archivo, nombre, tipo MIME)
+FORMATOS_LOTE = {
+    "Hoja PDF para imprimir (A4, etiquetas de 9 cm)": (imponer, "etiquetas.pdf", "application/pdf"),
+    "Hoja PDF de imágenes (A4)": (generar_pdf, "etiquetas.pdf", "application/pdf"),
+    "ZIP con una imagen PNG por etiqueta": (exportar_zip, "etiquetas.zip", "application/zip"),
+}
+
+with st.expander("Generar muchas etiquetas desde una lista de precios (CSV o Excel)"):
+    st.write("La planilla debe tener las columnas **producto** y **precio_final**. Opcionalmente puede incluir **iva** (21%, 10.5% o Exento), **unidad** (kg o litros) y **cantidad**.")
+    lista_precios = st.file_uploader("Lista de precios", type=["csv", "xlsx"])
+    formato_lote = st.radio("Formato", list(FORMATOS_LOTE), horizontal=True)
+    # "" es el diseño clásico de la etiqueta individual
+    plantilla_lote = st.selectbox(
+        "Diseño de etiqueta",
+        [""] + listar_plantillas(),
+        format_func=lambda nombre: cargar_plantilla(nombre).titulo if nombre else "Clásico (720 x 300)",
+    )
+    manifiesto_anterior = st.file_uploader(
+        "Manifiesto de la tanda anterior (opcional: solo se generan las etiquetas que cambiaron)", type=["json"]
+    )
+    if lista_precios is not None:
+        # Identifica el lote generado con estas entradas (ver st.session_state["lote"])
+        clave_lote = (
+            lista_precios.name,
+            lista_precios.size,
+            formato_lote,
+            plantilla_lote,
+            (manifiesto_anterior.name, manifiesto_anterior.size) if manifiesto_anterior else None,
+        )
+        if provincia_seleccionada == "-":
+            st.warning("Por favor, seleccione su provincia.")
+        elif st.button("Generar etiquetas"):
+            # pandas se importa solo al procesar una planilla
+            from etiquetas.importacion import leer_specs, revisar_lista
+
+            generar, nombre_lote, mime_lote = FORMATOS_LOTE[formato_lote]
+            if generar is imponer and plantilla_lote:
+                # Celdas en la proporción de la plantilla
+                plancha = Plancha.para_plantilla(plantilla_lote)
+                generar = functools.partial(imponer, plancha=plancha)
+            # El archivo se escribe a disco a medida que se dibuja cada etiqueta
+            with tempfile.TemporaryFile() as archivo_lote:
+                try:
+                    manifiesto = Manifiesto.desde_bytes(manifiesto_anterior.getvalue()) if manifiesto_anterior else None
+                except ValueError as e:
+                    st.warning(f"{str(e)}: se generan todas las etiquetas.")
+                    manifiesto = None
+                # La hoja de imágenes lleva los mismos PNG que el ZIP; la imposición es vectorial
+                comparacion = Comparacion(manifiesto, "pdf" if FORMATOS_LOTE[formato_lote][0] is imponer else "png")
+                try:
+                    # Primero se revisa la lista entera: los errores se ven antes de empezar a dibujar
+                    errores = revisar_lista(lista_precios, plantilla=plantilla_lote)
+                    if errores:
+                        st.warning(f"Se omiten {len(errores)} filas con datos inválidos:")
+                        st.dataframe([{"Fila": e.fila, "Error": e.mensaje} for e in errores], hide_index=True)
+                    lista_precios.seek(0)
+                    specs_lote = comparacion.filtrar(leer_specs(lista_precios, plantilla=plantilla_lote))
+                    cantidad_etiquetas = generar(specs_lote, archivo_lote)
+                except ValueError as e:
+                    st.error(f"No se pudo leer la lista de precios: {str(e)}")
+                    comparacion = None
+                    errores = []
+                    cantidad_etiquetas = 0
+
+                # Cada descarga vuelve a ejecutar el script: el resultado queda en la sesión
+                # para poder bajar las etiquetas y el reporte sin volver a generar
+                lote = {"clave": clave_lote, "errores": errores}
+                if comparacion is not None and manifiesto is not None:
+                    resumen = comparacion.resumen()
+                    lote["resumen"] = (
+                        f"Cambiaron {resumen['modificado']} precios, hay {resumen['nuevo']} productos nuevos y "
+                        f"{resumen['sin_cambios']} sin cambios."
+                    )
+                if cantidad_etiquetas:
+                    archivo_lote.seek(0)
+                    lote["etiquetas"] = (cantidad_etiquetas, archivo_lote.read(), nombre_lote, mime_lote)
+                    # Guardar la provincia al generar el lote, no en cada descarga
+                    provincia(*fecha_hora_actual(), provincia_seleccionada)
+                if comparacion is not None and comparacion.cambios:
+                    # Reporte de cambios y manifiesto para la próxima tanda, en un solo archivo
+                    archivo_cambios = io.BytesIO()
+                    with zipfile.ZipFile(archivo_cambios, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+                        zf.writestr("reporte_cambios.csv", comparacion.reporte_bytes())
+                        zf.writestr("manifiesto.json", comparacion.manifiesto_nuevo().a_bytes())
+                    lote["cambios"] = archivo_cambios.getvalue()
+                st.session_state["lote"] = lote
+        else:
+            lote = st.session_state.get("lote")
+            # Solo si es el resultado de las entradas actuales
+            if lote is not None and lote["clave"] == clave_lote and lote["errores"]:
+                st.warning(f"Se omitieron {len(lote['errores'])} filas con datos inválidos:")
+                st.dataframe([{"Fila": e.fila, "Error": e.mensaje} for e in lote["errores"]], hide_index=True)
+
+        lote = st.session_state.get("lote")
+        if lote is not None and lote["clave"] == clave_lote:
+            if "resumen" in lote:
+                st.info(lote["resumen"])
+            if "etiquetas" in lote:
+                cantidad_etiquetas, datos_lote, nombre_lote, mime_lote = lote["etiquetas"]
+                st.download_button(
+                    label=f"Descargar {cantidad_etiquetas} etiquetas",
+                    data=datos_lote,
+                    file_name=nombre_lote,
+                    mime=mime_lote
+                )
+            if "cambios" in lote:
+                st.download_button(
+                    label="Descargar reporte de cambios y manifiesto",
+                    data=lote["cambios"],
+                    file_name="cambios.zip",
+                    mime="application/zip"
+                )
+
 st.write("---")
 st.write("**Aclaración**")
 st.write("El usuario reconoce y acepta que los datos generados son a título meramente informativo y orientativo. La herramienta no apunta a establecer precios finales para ninguna operación sino brindar, de manera detallada, la información que un comercio puede necesitar para definir, por decisión propia, los precios de los productos y servicios que comercializa. Asimismo, CAME no se responsabiliza por la información brindada por el sistema, su actualización o su falta de disponibilidad.")
@@ -401,7 +439,7 @@ with col1 :
     st.write("")
 
 with col2 : 
-    st.image("imgs/LOGO. ESTADÍSTICAS.png", use_container_width=True)
+    st.image(imagen_fija("imgs/LOGO. ESTADÍSTICAS.png", 240), use_container_width=True)
     
 with col3 :
     st.write("")
@@ -432,56 +470,20 @@ with col_izq :
     st.write("")
 
 with col_centro:
-    colFc, colIg, colTw, colLk, colYt = st.columns(5)
-    with colFc:
-        # URL de tu perfil de Instagram
-        facebook_url = "https://www.facebook.com/redcame"
-        # Cargar la imagen del logotipo de Instagram
-        logo_image = "imgs/facebook.png"  # Reemplaza con la ruta de tu imagen
-        # Mostrar el logotipo de Instagram
-        st.image(logo_image, width=32)
-        # Crear un enlace clickeable
-        st.markdown(f"[Facebook]({facebook_url})", unsafe_allow_html=True)
-
-    with colIg:
-        # URL de tu perfil de Instagram
-        instagram_url = "https://www.instagram.com/redcame/"
-        # Cargar la imagen del logotipo de Instagram
-        logo_image = "imgs/ig.png"  # Reemplaza con la ruta de tu imagen
-        # Mostrar el logotipo de Instagram
-        st.image(logo_image, width=32)
-        # Crear un enlace clickeable
-        st.markdown(f"[Instagram]({instagram_url})", unsafe_allow_html=True)
-
-    with colTw:
-        # URL de tu perfil de Instagram
-        twiter_url = "https://twitter.com/redcame"
-        # Cargar la imagen del logotipo de Instagram
-        logo_image = "imgs/twiter.png"  # Reemplaza con la ruta de tu imagen
-        # Mostrar el logotipo de Instagram
-        st.image(logo_image, width=32)
-        # Crear un enlace clickeable
-        st.markdown(f"[Twitter]({twiter_url})", unsafe_allow_html=True)
-
-    with colLk:
-        # URL de tu perfil de Instagram
-        linkedin_url = "https://ar.linkedin.com/company/redcame"
-        # Cargar la imagen del logotipo de Instagram
-        logo_image = "imgs/linkedin.png"  # Reemplaza con la ruta de tu imagen
-        # Mostrar el logotipo de Instagram
-        st.image(logo_image, width=32)
-        # Crear un enlace clickeable
-        st.markdown(f"[LinkedIn]({linkedin_url})", unsafe_allow_html=True) 
-
-    with colYt:
-        # URL de tu perfil de Instagram
-        youtube_url = "https://www.youtube.com/c/CAMEar"
-        # Cargar la imagen del logotipo de Instagram
-        logo_image = "imgs/yutu.png"  # Reemplaza con la ruta de tu imagen
-        # Mostrar el logotipo de Instagram
-        st.image(logo_image, width = 40)
-        # Crear un enlace clickeable
-        st.markdown(f"[Youtube]({youtube_url})", unsafe_allow_html=True)               
+    # (nombre, enlace, ícono, ancho en pantalla)
+    redes = [
+        ("Facebook", "https://www.facebook.com/redcame", "imgs/facebook.png", 32),
+        ("Instagram", "https://www.instagram.com/redcame/", "imgs/ig.png", 32),
+        ("Twitter", "https://twitter.com/redcame", "imgs/twiter.png", 32),
+        ("LinkedIn", "https://ar.linkedin.com/company/redcame", "imgs/linkedin.png", 32),
+        ("Youtube", "https://www.youtube.com/c/CAMEar", "imgs/yutu.png", 40),
+    ]
+    for columna, (nombre, url, icono, ancho) in zip(st.columns(len(redes)), redes):
+        with columna:
+            # Mostrar el logotipo (reducido una sola vez por proceso)
+            st.image(imagen_fija(icono, ancho), width=ancho)
+            # Crear un enlace clickeable
+            st.markdown(f"[{nombre}]({url})", unsafe_allow_html=True)
 
 with colder :
     st.write("")